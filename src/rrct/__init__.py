@@ -0,0 +1,5 @@
+"""Robot Result Consolidation Tool: consolidate, query and merge Robot Framework results
+
+Every command lives in its own module, e.g. rrct.merge_results, and the
+`rrct` command line is rrct.cli. Importing the package loads nothing else.
+"""
@@ -0,0 +1,186 @@
+import io
+import os
+import shutil
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from fnmatch import fnmatch
+
+# Output files may be compressed (output.xml.gz) or members of a zip archive,
+# addressed as "<archive>.zip!/<member>", e.g. "results/run7.zip!/output.xml".
+# gzip, zipfile and zstandard are only imported where archives are opened.
+COMPRESSIONS = ("gz", "zst")
+ZIP_MARKER = ".zip!"
+# Same fields as the os.stat_result attributes read by the caches and indexes.
+OutputStat = namedtuple("OutputStat", ["st_size", "st_mtime_ns"])
+
+
+def split_member(path):
+    """(archive path, member name) of a zip member path, (path, None) otherwise"""
+    path = os.fspath(path)
+    index = path.find(ZIP_MARKER)
+    if index < 0:
+        return path, None
+    archive = path[:index + len(ZIP_MARKER) - 1]
+    return archive, path[index + len(ZIP_MARKER):].lstrip("/\\").replace(os.sep, "/")
+
+
+def member_path(archive, member):
+    return f"{os.fspath(archive)}!/{member}"
+
+
+def compression_of(path):
+    """"gz", "zst" or None, from the file name"""
+    suffix = os.fspath(path).rsplit(".", 1)[-1]
+    return suffix if suffix in COMPRESSIONS else None
+
+
+def is_archived(path):
+    """Whether the file is compressed or inside a zip, so it cannot be read in place"""
+    return compression_of(path) is not None or split_member(path)[1] is not None
+
+
+def matches_output(name, pattern):
+    """fnmatch of a file name, also matching compressed names: output.xml.gz matches *.xml"""
+    if fnmatch(name, pattern):
+        return True
+    compression = compression_of(name)
+    return compression is not None and fnmatch(name[:-len(compression) - 1], pattern)
+
+
+def is_zip(name):
+    return os.fspath(name).lower().endswith(".zip")
+
+
+def zip_entries(archive, pattern, entry_type):
+    """Members of a zip archive matching `pattern` (see matches_output)
+
+    Args:
+        archive (str): zip file
+        pattern (str): glob pattern matched against member file names
+        entry_type (callable): called with (path, size, mtime_ns), e.g. scanner.ScanEntry
+    Returns:
+        list: one entry per member, sized uncompressed and dated like the archive
+    """
+    import zipfile
+
+    try:
+        mtime_ns = os.stat(archive).st_mtime_ns
+        with zipfile.ZipFile(archive) as zip_file:
+            return [entry_type(member_path(archive, info.filename), info.file_size, mtime_ns)
+                    for info in zip_file.infolist()
+                    if not info.is_dir() and matches_output(info.filename.rsplit("/", 1)[-1], pattern)]
+    except (OSError, zipfile.BadZipFile):
+        return []
+
+
+def output_stat(path):
+    """Size and mtime of an output file, a zip member gets its archive's mtime"""
+    archive, member = split_member(path)
+    stat = os.stat(archive)
+    if member is None:
+        return OutputStat(stat.st_size, stat.st_mtime_ns)
+    import zipfile
+
+    with zipfile.ZipFile(archive) as zip_file:
+        return OutputStat(zip_file.getinfo(member).file_size, stat.st_mtime_ns)
+
+
+def output_exists(path):
+    archive, member = split_member(path)
+    if member is None:
+        return os.path.exists(archive)
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(archive) as zip_file:
+            zip_file.getinfo(member)
+        return True
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:  # zstandard is optional, only needed for .zst files
+        raise ImportError("reading or writing .zst files needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+@contextmanager
+def open_output(path):
+    """Open an output file for binary reading, decompressing while it is read
+
+    Plain, .gz and .zst files and zip members (also compressed ones) are
+    streamed, nothing is extracted to disk.
+    """
+    archive, member = split_member(path)
+    with ExitStack() as stack:
+        if member is None:
+            raw = stack.enter_context(open(archive, "rb"))
+        else:
+            import zipfile
+
+            zip_file = stack.enter_context(zipfile.ZipFile(archive))
+            raw = stack.enter_context(zip_file.open(member))
+        compression = compression_of(member or archive)
+        if compression == "gz":
+            import gzip
+
+            raw = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="rb"))
+        elif compression == "zst":
+            raw = stack.enter_context(_zstandard().ZstdDecompressor().stream_reader(raw, closefd=False))
+        yield raw
+
+
+@contextmanager
+def open_output_writer(path, encoding=None):
+    """Open a file for writing, compressed according to its suffix
+
+    Binary, or text when an encoding is given (robot's Result.save needs text).
+    """
+    with ExitStack() as stack:
+        out = stack.enter_context(open(path, "wb"))
+        compression = compression_of(path)
+        if compression == "gz":
+            import gzip
+
+            out = stack.enter_context(gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6))
+        elif compression == "zst":
+            out = stack.enter_context(_zstandard().ZstdCompressor().stream_writer(out, closefd=False))
+        if encoding is not None:
+            out = stack.enter_context(io.TextIOWrapper(out, encoding=encoding))
+        yield out
+
+
+def compress_file(src, compression, remove_source=True):
+    """Write `src` compressed next to it (src + ".gz" / ".zst"), streaming
+
+    Returns:
+        str: path of the compressed file
+    """
+    target = f"{os.fspath(src)}.{compression}"
+    with open(src, "rb") as source, open_output_writer(target) as out:
+        shutil.copyfileobj(source, out, 1024 * 1024)
+    if remove_source:
+        os.remove(src)
+    return target
+
+
+def save_result(result, path):
+    """Result.save to a plain, .gz or .zst output file"""
+    if compression_of(path) is None:
+        result.save(path)
+        return
+    with open_output_writer(path, encoding="UTF-8") as out:
+        result.save(out)
+
+
+def load_result(path):
+    """robot ExecutionResult of any output file, compressed ones read as a stream"""
+    from robot.api import ExecutionResult
+
+    if not is_archived(path):
+        return ExecutionResult(path)
+    with open_output(path) as stream:
+        return ExecutionResult(stream)
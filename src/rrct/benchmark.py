@@ -0,0 +1,226 @@
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from .synthetic_output import generate_results_folder, test_count
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak RSS is then not reported
+    resource = None
+
+
+def _list(files, folder, work_dir):
+    from .scanner import scan_files
+    scan_files(folder, "*output.xml")
+
+
+def _match(files, folder, work_dir):
+    from .stream_parser import iter_tests
+    from .tag_query import TagQuery
+    from .parser_result import find_matching_records_with_tags
+    query = TagQuery("tag-1.*")
+    for file in files:
+        find_matching_records_with_tags(iter_tests(file), query)
+
+
+def _tag_stats(files, folder, work_dir):
+    from .stream_parser import iter_tests, tag_statistics
+    for file in files:
+        tag_statistics(iter_tests(file))
+
+
+def _tag_stats_robot(files, folder, work_dir):
+    from robot.api import ExecutionResult
+    for file in files:
+        ExecutionResult(file).statistics.tags
+
+
+def _tag_totals(files, folder, work_dir):
+    from .tag_totals import TagTotals, file_tag_statistics
+    totals = TagTotals()
+    for file in files:
+        totals.add(file_tag_statistics(file))
+
+
+def _probe(files, folder, work_dir):
+    from .stream_parser import probe_status
+    for file in files:
+        probe_status(file)
+
+
+def _copy(files, folder, work_dir):
+    from .transfer import transfer_tree
+    transfer_tree(folder, os.path.join(work_dir, "copy"), "copy")
+
+
+def _merge(files, folder, work_dir):
+    from .merge_results import merge_in_process
+    merge_in_process(files, os.path.join(work_dir, "merged.xml"))
+
+
+def _tree_merge(files, folder, work_dir):
+    from .tree_merge import tree_merge
+    tree_merge(files, os.path.join(work_dir, "tree_merged.xml"), fan_in=max(2, len(files) // 4))
+
+
+SCENARIOS = {
+    "list": _list,
+    "match": _match,
+    "tag_stats": _tag_stats,
+    "tag_stats_robot": _tag_stats_robot,
+    "tag_totals": _tag_totals,
+    "probe": _probe,
+    "copy": _copy,
+    "merge": _merge,
+    "tree_merge": _tree_merge,
+}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_scenario(task):
+    """Worker of a fresh process: run one scenario, return (wall seconds, peak RSS MB)"""
+    name, files, folder = task
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        SCENARIOS[name](files, folder, work_dir)
+        wall = time.perf_counter() - start
+    return wall, _peak_rss_mb()
+
+
+def run_scenario(name, files, folder, repeat=1):
+    """Time a scenario in a new process per repetition, keeping the fastest
+
+    A new (spawned) process per run keeps the peak RSS of one scenario
+    separate from the others.
+
+    Returns:
+        tuple: (wall seconds, peak RSS in MB or None)
+    """
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            runs.append(executor.submit(_run_scenario, (name, files, folder)).result())
+    return min(runs, key=lambda run: run[0])
+
+
+def run_benchmarks(folder, files, shape, scenarios=None, repeat=1):
+    """Run the scenarios on the given output files
+
+    Args:
+        folder (str): results folder holding the files
+        files (list[str]): output.xml files, all written with `shape`
+        shape (OutputShape): shape of the files, used for the test count
+        scenarios (list[str]): names from SCENARIOS, default all
+        repeat (int): runs per scenario, the fastest is kept
+    Returns:
+        dict: the benchmark report, see save_report
+    """
+    size = sum(os.path.getsize(file) for file in files)
+    tests = test_count(shape) * len(files)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dataset": {"files": len(files), "megabytes": round(size / 1e6, 3), "tests": tests,
+                    "shape": shape._asdict()},
+        "scenarios": {},
+    }
+    for name in scenarios or SCENARIOS:
+        wall, peak_rss_mb = run_scenario(name, files, folder, repeat)
+        report["scenarios"][name] = {
+            "wall_s": round(wall, 4),
+            "peak_rss_mb": round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+            "mb_per_s": round(size / 1e6 / wall, 2),
+            "tests_per_s": round(tests / wall, 1),
+        }
+        print(f"{name:<16} {wall:8.3f}s  {report['scenarios'][name]['peak_rss_mb'] or '-':>8} MB  "
+              f"{size / 1e6 / wall:8.1f} MB/s  {tests / wall:10.0f} tests/s")
+    return report
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_reports(baseline, current, threshold=0.1):
+    """Print the wall time of each scenario against a baseline report
+
+    Returns:
+        list[str]: scenarios slower than the baseline by more than `threshold`
+    """
+    from .color_coding import colour_print, GREEN, RED, BOLD_UNDERLINE
+
+    colour_print(f"Compared with baseline of {baseline.get('created')}:", BOLD_UNDERLINE)
+    regressions = []
+    for name, result in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            print(f"{name:<16} new scenario")
+            continue
+        ratio = result["wall_s"] / old["wall_s"] if old["wall_s"] else float("inf")
+        line = f"{name:<16} {old['wall_s']:8.3f}s -> {result['wall_s']:8.3f}s  ({ratio:.2f}x)"
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            colour_print(line, RED)
+        else:
+            colour_print(line, GREEN)
+    if baseline.get("dataset") != current.get("dataset"):
+        print("Note: the datasets differ, compare with the same generator options.")
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point of the bench command"""
+    import argparse
+    from .synthetic_output import add_shape_arguments, shape_from_args
+
+    parser = argparse.ArgumentParser(description="Benchmark the tool on synthetic output.xml files")
+    parser.add_argument("--files", type=int, default=10, help="Number of output files generated")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated files")
+    parser.add_argument("--data", help="Keep the generated files in this folder (default: temporary folder)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="Scenarios to run, default all")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario, the fastest is kept")
+    parser.add_argument("--output", default="benchmark.json", help="JSON report written")
+    parser.add_argument("--compare", help="Baseline JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Slow down reported as a regression by --compare, 0.1 = 10%%")
+    add_shape_arguments(parser)
+
+    args = parser.parse_args(argv)
+    shape = shape_from_args(args)
+
+    folder = args.data or tempfile.mkdtemp(prefix="rrct_bench_")
+    try:
+        files = generate_results_folder(folder, args.files, shape, args.seed)
+        report = run_benchmarks(folder, files, shape, args.scenarios, args.repeat)
+    finally:
+        if not args.data:
+            shutil.rmtree(folder, ignore_errors=True)
+    save_report(report, args.output)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare_reports(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""rrct - Robot Result Consolidation Tool
+
+Single entry point for all commands. Only the module of the chosen command
+is imported, so e.g. `rrct list` never loads Robot Framework.
+Also run as `python -m rrct`.
+"""
+import sys
+from importlib import import_module
+
+# command: (module of the rrct package, arguments put before the user's, description)
+COMMANDS = {
+    "list": ("list_result", [], "List the result files of a folder"),
+    "tests": ("parser_result", ["tests"], "Print all test results"),
+    "match": ("parser_result", ["match"], "List tests matching a tag pattern or expression"),
+    "tags": ("parser_result", ["tags"], "Tag statistics of every result file"),
+    "check": ("parser_result", ["check"], "Check given tags are present"),
+    "index": ("result_index", [], "Build and query the test index of a folder"),
+    "history": ("history", [], "Record runs, report flaky, slow and regressed tests"),
+    "generate": ("synthetic_output", [], "Write synthetic output.xml files"),
+    "bench": ("benchmark", [], "Benchmark the tool on synthetic output.xml files"),
+    "merge": ("merge_results", [], "Merge result files"),
+    "listen": ("listener", [], "Merge new results as they arrive"),
+    "serve": ("query_server", [], "Answer queries on a folder from an index kept in memory"),
+}
+
+
+# Options accepted before the command, for every command.
+GLOBAL_OPTIONS = {"--profile": 0, "--trace": 0, "--profile-output": 1}
+
+
+def usage():
+    lines = ["usage: rrct [--profile] [--trace] [--profile-output PREFIX] <command> [options]", "", "commands:"]
+    lines += [f"  {name:<8}{description}" for name, (_, _, description) in COMMANDS.items()]
+    lines += ["", "Run 'rrct <command> --help' for the options of a command.",
+              "--profile prints the time spent per stage and writes PREFIX.pstats (default rrct_profile),",
+              "--trace also writes PREFIX.trace.json for chrome://tracing or Perfetto (implies --profile)."]
+    return "\n".join(lines)
+
+
+def split_global_options(argv):
+    """Split argv into the leading global options and the command with its arguments"""
+    index = 0
+    while index < len(argv) and argv[index] in GLOBAL_OPTIONS:
+        index += 1 + GLOBAL_OPTIONS[argv[index]]
+    return argv[:index], argv[index:]
+
+
+def main(argv=None):
+    """Dispatch to the `main` of the module implementing the command"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    global_args, argv = split_global_options(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"rrct: unknown command '{argv[0]}'\n\n{usage()}", file=sys.stderr)
+        return 2
+    module_name, fixed_args, _ = COMMANDS[argv[0]]
+    sys.argv[0] = f"rrct {argv[0]}"
+    if not global_args:
+        import_module(f".{module_name}", __package__).main(fixed_args + argv[1:])
+        return 0
+
+    import argparse
+    from .instrumentation import add_profile_arguments, profiling_from_args
+
+    parser = argparse.ArgumentParser(prog="rrct")
+    add_profile_arguments(parser)
+    with profiling_from_args(parser.parse_args(global_args)):
+        import_module(f".{module_name}", __package__).main(fixed_args + argv[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
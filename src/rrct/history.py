@@ -0,0 +1,254 @@
+import os
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+from .archive import output_stat
+from .parallel_runner import summarize_files
+
+HISTORY_FILE_NAME = ".rrct_history.sqlite"
+NS_PER_DAY = 86400 * 10**9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, status TEXT);
+CREATE TABLE IF NOT EXISTS tests (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER, test_id INTEGER, run_time INTEGER, status TEXT, elapsed REAL, flipped INTEGER);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (mtime_ns);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_time ON results (run_time);
+CREATE INDEX IF NOT EXISTS results_test ON results (test_id, run_time, run_id, status, elapsed, flipped);
+"""
+
+# Outcome statistics of one test over the runs of the report window.
+TestTrend = namedtuple("TestTrend", ["name", "runs", "passed", "failed", "skipped", "pass_rate", "flips",
+                                     "avg_elapsed"])
+DurationRegression = namedtuple("DurationRegression", ["name", "recent_elapsed", "baseline_elapsed", "ratio"])
+
+
+class HistoryStore:
+    """SQLite history of per-test outcomes and durations over many runs
+
+    Every recorded output.xml is a run, ordered by the file's mtime. A test
+    is identified by its suite longname and name. Whether a result differs
+    from the previous result of the same test is stored when runs are
+    recorded, so every report is a single aggregate query over a covering
+    index instead of a window function or a loop over rows in Python.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.executescript(SCHEMA)
+        self._test_ids = dict(self.connection.execute("SELECT name, id FROM tests"))
+
+    @classmethod
+    def for_folder(cls, folder_path):
+        """Open the history stored in the given folder"""
+        return cls(Path(folder_path) / HISTORY_FILE_NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def _test_id(self, name):
+        test_id = self._test_ids.get(name)
+        if test_id is None:
+            test_id = self.connection.execute("INSERT INTO tests (name) VALUES (?)", (name,)).lastrowid
+            self._test_ids[name] = test_id
+        return test_id
+
+    def record_files(self, output_files, jobs=1):
+        """Add the runs of the given files, skipping the ones already recorded
+
+        A file rewritten since it was recorded (other size or mtime) replaces
+        its previous run.
+
+        Args:
+            output_files (list): robot output.xml files
+            jobs (int): number of worker processes used to parse new files
+        Returns:
+            dict: error message of each file that failed to parse, by absolute path
+        """
+        recorded = {path: (run_id, size, mtime_ns) for run_id, path, size, mtime_ns
+                    in self.connection.execute("SELECT id, path, size, mtime_ns FROM runs")}
+        stats = {}
+        new_files = []
+        # Results from this time on need their flip flag computed again.
+        changed_since = None
+        for file in output_files:
+            path = os.path.abspath(file)
+            stats[path] = output_stat(path)
+            entry = recorded.get(path)
+            if entry and entry[1:] == (stats[path].st_size, stats[path].st_mtime_ns):
+                continue
+            if entry:
+                self.connection.execute("DELETE FROM results WHERE run_id = ?", (entry[0],))
+                self.connection.execute("DELETE FROM runs WHERE id = ?", (entry[0],))
+                changed_since = min(entry[2], changed_since if changed_since is not None else entry[2])
+            new_files.append(path)
+
+        errors = {}
+        for summary in summarize_files(new_files, jobs):
+            if summary.error is not None:
+                errors[summary.path] = summary.error
+                continue
+            stat = stats[summary.path]
+            run_id = self.connection.execute(
+                "INSERT INTO runs (path, size, mtime_ns, status) VALUES (?, ?, ?, ?)",
+                (summary.path, stat.st_size, stat.st_mtime_ns, summary.status)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO results (run_id, test_id, run_time, status, elapsed) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, self._test_id(f"{test.suite}.{test.name}"), stat.st_mtime_ns, test.status, test.elapsed)
+                 for test in summary.tests])
+            changed_since = min(stat.st_mtime_ns, changed_since if changed_since is not None else stat.st_mtime_ns)
+        if changed_since is not None:
+            self._update_flips(changed_since)
+        self.connection.commit()
+        return errors
+
+    def _update_flips(self, since):
+        """Set the flip flag of every result recorded at or after `since`
+
+        When runs are recorded in time order only the new results are read.
+        """
+        previous = dict(self.connection.execute(
+            "SELECT tests.id, (SELECT status FROM results WHERE test_id = tests.id AND run_time < ?"
+            " ORDER BY run_time DESC, run_id DESC LIMIT 1) FROM tests", (since,)))
+        updates = []
+        for rowid, test_id, status in self.connection.execute(
+                "SELECT rowid, test_id, status FROM results WHERE run_time >= ? ORDER BY test_id, run_time, run_id",
+                (since,)).fetchall():
+            last = previous.get(test_id)
+            updates.append((int(last is not None and last != status), rowid))
+            previous[test_id] = status
+        self.connection.executemany("UPDATE results SET flipped = ? WHERE rowid = ?", updates)
+
+    def run_count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def _window_start(self, days):
+        """Oldest run time included in a report covering the last `days` of history"""
+        if days is None:
+            return 0
+        latest = self.connection.execute("SELECT MAX(mtime_ns) FROM runs").fetchone()[0] or 0
+        return latest - days * NS_PER_DAY
+
+    def trends(self, days=None, order_by="name", min_flips=0, limit=None):
+        """Pass rate, flip count and mean duration of every test
+
+        A flip is a status different from the one of the previous run of
+        the same test.
+
+        Args:
+            days (int): only runs of the last `days` days of history, None for all
+            order_by (str): "name", "flips" (most flaky first) or "elapsed" (slowest first)
+            min_flips (int): only tests that flipped at least this often
+            limit (int): at most this many tests
+        Returns:
+            list[TestTrend]
+        """
+        order = {"name": "tests.name", "flips": "flips DESC, pass_rate, tests.name",
+                 "elapsed": "avg_elapsed DESC, tests.name"}[order_by]
+        rows = self.connection.execute(
+            "WITH totals AS ("
+            " SELECT test_id, COUNT(*) AS run_count, SUM(status = 'PASS') AS passed, SUM(status = 'FAIL') AS failed,"
+            "  SUM(status = 'SKIP') AS skipped, SUM(flipped) AS flips, AVG(elapsed) AS avg_elapsed"
+            " FROM results WHERE run_time >= ? GROUP BY test_id)"
+            " SELECT tests.name, run_count, passed, failed, skipped, CAST(passed AS REAL) / run_count AS pass_rate,"
+            "  flips, avg_elapsed"
+            f" FROM totals JOIN tests ON tests.id = totals.test_id WHERE flips >= ? ORDER BY {order} LIMIT ?",
+            (self._window_start(days), min_flips, -1 if limit is None else limit))
+        return [TestTrend(*row) for row in rows]
+
+    def flaky_tests(self, days=None, limit=None):
+        """Tests whose status changed between runs, most flips first"""
+        return self.trends(days, "flips", 1, limit)
+
+    def slowest_tests(self, days=None, limit=10):
+        """Tests with the highest mean duration"""
+        return self.trends(days, "elapsed", 0, limit)
+
+    def duration_regressions(self, days=None, recent_runs=3, threshold=0.2, limit=None):
+        """Tests slower in the latest runs than in the earlier ones
+
+        Only passing results are compared, failures often stop early.
+
+        Args:
+            days (int): only runs of the last `days` days of history, None for all
+            recent_runs (int): number of latest recorded runs averaged as "recent"
+            threshold (float): minimum slow down, 0.2 means 20% slower than the baseline
+            limit (int): at most this many tests
+        Returns:
+            list[DurationRegression]: largest slow down first
+        """
+        recent_start = self.connection.execute(
+            "SELECT MIN(mtime_ns) FROM (SELECT mtime_ns FROM runs ORDER BY mtime_ns DESC LIMIT ?)",
+            (recent_runs,)).fetchone()[0]
+        if recent_start is None:
+            return []
+        rows = self.connection.execute(
+            "WITH averages AS ("
+            " SELECT test_id, AVG(CASE WHEN run_time >= ? THEN elapsed END) AS recent,"
+            "  AVG(CASE WHEN run_time < ? THEN elapsed END) AS baseline"
+            " FROM results WHERE run_time >= ? AND status = 'PASS' GROUP BY test_id)"
+            " SELECT tests.name, recent, baseline, recent / baseline AS ratio"
+            " FROM averages JOIN tests ON tests.id = averages.test_id"
+            " WHERE baseline > 0 AND recent > baseline * (1 + ?) ORDER BY ratio DESC, tests.name LIMIT ?",
+            (recent_start, recent_start, self._window_start(days), threshold, -1 if limit is None else limit))
+        return [DurationRegression(*row) for row in rows]
+
+
+def _seconds(elapsed):
+    """Duration for the report, results without times have a NULL elapsed"""
+    return "n/a" if elapsed is None else f"{elapsed:.3f}s"
+
+
+def print_trend_report(history, days=90, top=10, recent_runs=3, threshold=0.2):
+    """Print the flaky, slowest and regressed tests of a history store"""
+    from .color_coding import colour_print, BOLD_UNDERLINE
+
+    colour_print(f"Flaky tests (last {days} days, {history.run_count()} run(s) recorded):", BOLD_UNDERLINE)
+    for trend in history.flaky_tests(days, top):
+        print(f"{trend.name} | Runs: {trend.runs}, Pass rate: {trend.pass_rate:.0%}, Flips: {trend.flips}")
+    colour_print("\nSlowest tests:", BOLD_UNDERLINE)
+    for trend in history.slowest_tests(days, top):
+        print(f"{trend.name} | Mean duration: {_seconds(trend.avg_elapsed)}, Runs: {trend.runs}")
+    colour_print(f"\nDuration regressions (last {recent_runs} runs vs. before):", BOLD_UNDERLINE)
+    for regression in history.duration_regressions(days, recent_runs, threshold, top):
+        print(f"{regression.name} | {_seconds(regression.baseline_elapsed)} -> {_seconds(regression.recent_elapsed)} "
+              f"({regression.ratio:.2f}x)")
+
+
+def main(argv=None):
+    """Command line entry point of the history command"""
+    import argparse
+    from .list_result import list_files
+
+    parser = argparse.ArgumentParser(description="Record runs and report flaky, slow and regressed tests")
+    parser.add_argument("--folder", required=True, help="Folder holding the history (e.g. the merge directory)")
+    parser.add_argument("--record", nargs="+", default=[], help="Result folders whose output files are recorded first")
+    parser.add_argument("--days", type=int, default=90, help="Report on this many days of history")
+    parser.add_argument("--top", type=int, default=10, help="Number of tests listed per section")
+    parser.add_argument("--recent-runs", type=int, default=3, help="Runs compared against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Minimum slow down reported, 0.2 = 20%%")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes used to parse files")
+
+    args = parser.parse_args(argv)
+
+    with HistoryStore.for_folder(args.folder) as history:
+        for folder in args.record:
+            output_files = list_files(folder, "*output.xml", verbose=False) or []
+            for path, error in history.record_files(output_files, args.jobs).items():
+                print(f"Something wrong with file {path}: {error}")
+        print_trend_report(history, args.days, args.top, args.recent_runs, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
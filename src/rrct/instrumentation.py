@@ -0,0 +1,164 @@
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+# Trace events kept for --trace, the oldest are dropped beyond this, so a
+# long running listener keeps a bounded amount of memory.
+MAX_TRACE_EVENTS = 100_000
+
+# Off by default: span() then returns a shared no-op context manager and
+# count() returns after one check, so instrumented code pays almost nothing.
+_enabled = False
+# Per stage [calls, total ns, max ns], the same size however long it runs.
+_stages = defaultdict(lambda: [0, 0, 0])
+_counters = defaultdict(int)
+_lock = threading.Lock()
+# (name, start ns, duration ns, thread) of the latest spans, None without --trace.
+_trace_events = None
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter_ns() - self.start
+        with _lock:
+            stage = _stages[self.name]
+            stage[0] += 1
+            stage[1] += duration
+            stage[2] = max(stage[2], duration)
+        if _trace_events is not None:
+            _trace_events.append((self.name, self.start, duration, threading.get_ident()))
+
+
+def span(name):
+    """Time the enclosed block as a stage, e.g. `with span("copy"): ...`"""
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def count(name, value=1):
+    """Add `value` to a counter, e.g. count("bytes.read", size)"""
+    if _enabled:
+        with _lock:
+            _counters[name] += value
+
+
+def is_enabled():
+    """Whether spans and counters are recorded, to skip work done only for them"""
+    return _enabled
+
+
+def enable(trace=False):
+    """Start recording spans and counters, dropping earlier ones
+
+    Spans are added up per stage. With `trace` the latest MAX_TRACE_EVENTS
+    spans are also kept one by one for write_chrome_trace.
+    """
+    global _enabled, _trace_events
+    _stages.clear()
+    _counters.clear()
+    _trace_events = deque(maxlen=MAX_TRACE_EVENTS) if trace else None
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def stage_totals():
+    """Per stage: (calls, total seconds, max seconds), by decreasing total"""
+    with _lock:
+        totals = sorted(_stages.items(), key=lambda item: -item[1][1])
+    return {name: (calls, total / 1e9, longest / 1e9) for name, (calls, total, longest) in totals}
+
+
+def format_summary(wall_seconds):
+    """Table of the time spent per stage and of the counters"""
+    lines = [f"{'stage':<20}{'calls':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}{'% wall':>8}"]
+    for name, (calls, total, longest) in stage_totals().items():
+        lines.append(f"{name:<20}{calls:>8}{total:>10.3f}{total / calls * 1000:>10.2f}{longest * 1000:>10.2f}"
+                     f"{total / wall_seconds * 100 if wall_seconds else 0:>7.1f}%")
+    lines.append(f"{'wall':<20}{'':>8}{wall_seconds:>10.3f}")
+    for name in sorted(_counters):
+        lines.append(f"{name:<20}{_counters[name]:>18}")
+    return "\n".join(lines)
+
+
+def write_chrome_trace(path):
+    """Write the recorded spans as Chrome trace events (chrome://tracing, Perfetto)
+
+    Only spans recorded with enable(trace=True) are written, at most the
+    latest MAX_TRACE_EVENTS of them.
+    """
+    import json
+
+    pid = os.getpid()
+    spans = list(_trace_events or ())
+    origin = min((start for _, start, _, _ in spans), default=0)
+    events = [{"name": name, "cat": "rrct", "ph": "X", "ts": (start - origin) / 1000, "dur": duration / 1000,
+               "pid": pid, "tid": thread} for name, start, duration, thread in spans]
+    events.append({"name": "counters", "ph": "C", "ts": 0, "pid": pid, "args": dict(_counters)})
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+@contextmanager
+def profiling(stats_path=None, trace_path=None, out=None):
+    """Record spans, counters and a cProfile of the enclosed block
+
+    On exit (also on Ctrl+C) the summary table is printed to `out`
+    (default stderr, so machine readable stdout stays clean), the pstats
+    dump is written to `stats_path` and the Chrome trace to `trace_path`.
+    """
+    import cProfile
+
+    out = out or sys.stderr
+    profiler = cProfile.Profile() if stats_path else None
+    enable(trace=trace_path is not None)
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        disable()
+        print("\n" + format_summary(wall), file=out)
+        if profiler is not None:
+            profiler.dump_stats(stats_path)
+            print(f"cProfile stats written to {stats_path} (python -m pstats {stats_path})", file=out)
+        if trace_path:
+            write_chrome_trace(trace_path)
+            print(f"Chrome trace written to {trace_path}", file=out)
+
+
+def add_profile_arguments(parser):
+    """Add --profile, --profile-output and --trace to an argparse parser"""
+    parser.add_argument("--profile", action="store_true",
+                        help="Print time per stage and write a cProfile dump when done")
+    parser.add_argument("--profile-output", default="rrct_profile",
+                        help="Path prefix of the profile files (.pstats, .trace.json)")
+    parser.add_argument("--trace", action="store_true",
+                        help=f"Also write Chrome trace-event JSON of the last {MAX_TRACE_EVENTS} spans, "
+                             "implies --profile")
+
+
+def profiling_from_args(args):
+    """profiling() context for parsed add_profile_arguments options, no-op without --profile or --trace"""
+    if not (args.profile or args.trace):
+        return nullcontext()
+    return profiling(f"{args.profile_output}.pstats", f"{args.profile_output}.trace.json" if args.trace else None)
@@ -0,0 +1,115 @@
+from pathlib import Path
+import os
+import sys
+from .color_coding import colour_print, BOLD, BOLD_UNDERLINE
+from .output_format import FORMATS, open_writer
+from .parallel_runner import summarize_files
+from .scanner import scan_files
+
+# Columns of the file records, the same for the list command and the query server.
+LIST_FIELDS = ["type", "file", "status", "tests", "error"]
+
+def list_files(file_path, pattern:str ="*.xml", verbose=True, max_depth=None, exclude_dirs=(), jobs=1):
+    """List the robot files present in the current folder
+
+    Compressed files (output.xml.gz matches *.xml) and the matching members
+    of zip files (run7.zip!/output.xml) are listed too, see archive.py.
+
+    Args:
+        file_path (str): Folder path with robot output files present
+        pattern (str): Name/Pattern of file to search in the folder
+        verbose (bool): print the files found, if False problems go to stderr
+        max_depth (int): how deep to search below the folder, None for no limit
+        exclude_dirs (iterable): directory names/patterns or paths not to search
+        jobs (int): scan the top level subfolders in this many threads
+    Returns:
+        list[str]: list of output files present in the given folder
+    """
+    # Keep stdout clean for machine readable output.
+    out = sys.stdout if verbose else sys.stderr
+    try:
+            if not os.path.exists(file_path):
+                print(f"Path does not exist: {file_path}", file=out)
+                return
+            
+            if not os.path.isdir(file_path):
+                print(f"Provided path is not a directory: {file_path}", file=out)
+                return
+           # Root directory 
+            root_dir = Path(file_path)
+            
+            # Match all relevant Robot Framework output files recursively
+            output_files = [Path(entry.path) for entry in scan_files(root_dir, pattern, max_depth, exclude_dirs, jobs, archives=True)]
+            # + list(root_dir.rglob('*.html')) + list(root_dir.rglob('*.log'))
+            
+            if output_files and not verbose:
+                pass
+            elif output_files:
+                print_file = f"📂 Files present in the directory ({file_path}) -: " + str(len(output_files))
+                colour_print(print_file, BOLD_UNDERLINE)
+                for file in output_files:
+                    resultfilepath = "- " + str(file.relative_to(root_dir))  # cleaner path
+                    colour_print(resultfilepath,BOLD)
+            else:
+                print("No files found in the directory.", file=out)
+                            
+    except Exception as e:
+        print(f"An error occurred: {e}", file=out)
+    
+    return output_files
+
+def iter_file_records(output_files, summaries):
+    """Records of the list query, one per result file
+
+    Args:
+        output_files (list): robot output files
+        summaries (iterable): stream_parser.FileSummary for each file, in the same order
+    Yields:
+        dict: {"type": "file", "file", "status", "tests"}, or
+              {"type": "error", "file", "error"} for a file that could not be read
+    """
+    for output_file, summary in zip(output_files, summaries):
+        if summary.error is not None:
+            yield {"type": "error", "file": str(output_file), "error": summary.error}
+        else:
+            yield {"type": "file", "file": str(output_file), "status": summary.status,
+                   "tests": len(summary.tests)}
+
+def write_file_records(file_path, output_format, pattern="*.xml", max_depth=None, exclude_dirs=(), jobs=1):
+    """Write the files of a folder to stdout in a machine readable format
+
+    Args:
+        file_path (str): Folder path with robot output files present
+        output_format (str): "jsonl" or "csv"
+        pattern (str): Name/Pattern of file to search in the folder
+        max_depth (int): how deep to search below the folder, None for no limit
+        exclude_dirs (iterable): directory names/patterns or paths not to search
+        jobs (int): number of worker processes reading the files
+    """
+    output_files = list_files(file_path, pattern, False, max_depth, exclude_dirs, jobs) or []
+    with open_writer(output_format, LIST_FIELDS) as writer:
+        writer.write_all(iter_file_records(output_files, summarize_files(output_files, jobs)))
+
+def main(argv=None):
+    """Command line entry point of the list command"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List Robot Framework result files of a folder")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--pattern", default="*.xml", help="Name/Pattern of the files to list")
+    parser.add_argument("--max-depth", type=int, help="How deep to search below the folder")
+    parser.add_argument("--exclude-dir", action="append", default=[], help="Directory name/pattern not to search")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Threads scanning the top level subfolders, and processes reading the files for jsonl/csv")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="Output format, jsonl and csv write one record per file with its status and number of tests")
+
+    args = parser.parse_args(argv)
+    if args.format != "text":
+        write_file_records(args.folder, args.format, args.pattern, args.max_depth, args.exclude_dir, args.jobs)
+        return
+    list_files(args.folder, args.pattern, True, args.max_depth, args.exclude_dir, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
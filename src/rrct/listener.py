@@ -0,0 +1,496 @@
+import os
+import json
+import threading
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from .merge_results import merge_robot_results, append_robot_results
+from .summary_cache import SummaryCache
+from .watcher import OutputFileWatcher
+from .stream_parser import probe_status
+from .transfer import transfer_file, transfer_tree, OUTPUT_PATTERNS, STRATEGIES
+from .scanner import scan_files, latest_entry, entries_by_folder
+from .history import HistoryStore
+from .instrumentation import add_profile_arguments, count, profiling_from_args, span
+from .pipeline import DEFAULT_QUEUE_SIZE, Stage, run_pipeline
+from .archive import COMPRESSIONS, is_zip, output_stat
+from .result_filter import add_filter_arguments, test_filter_from_args
+from .query_client import notify_refresh
+
+# ==================================================
+# Utility Functions
+# ==================================================
+
+# Probe and copy threads print through log(), one whole line at a time.
+_print_lock = threading.Lock()
+
+
+def log(message):
+    """Print a line, also safe from the worker threads of a cycle."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+@dataclass
+class ListenerOptions:
+    """Optional behaviour of a listener cycle, see the CLI flags below."""
+    use_cache: bool = False
+    incremental: bool = False
+    transfer: str = "copy"
+    only_outputs: bool = False
+    exclude_dirs: tuple = ()
+    scan_jobs: int = 1
+    history: bool = False
+    probe_jobs: int = 4
+    copy_jobs: int = 4
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    compression: str = None
+    test_filter: object = None  # result_filter.TestFilter
+    notify_url: str = None
+    html: bool = False  # incremental log/report, rebuilt from the whole history each cycle
+
+
+def scan_output_files(src_dir, merge_dir=None, options=None):
+    """
+    Scan src_dir once for '*output.xml' files (see scanner.scan_files),
+    compressed ones and zip members included (see archive.py),
+    skipping the merge directory and the excluded directories.
+    The entries are shared by every step of a cycle.
+    """
+    options = options or ListenerOptions()
+    exclude_dirs = tuple(options.exclude_dirs) + ((str(merge_dir),) if merge_dir is not None else ())
+    with span("scan"):
+        scan = scan_files(src_dir, "*output.xml", exclude_dirs=exclude_dirs, jobs=options.scan_jobs,
+                          archives=True)
+    count("files.scanned", len(scan))
+    return scan
+
+
+def get_latest_output_file(folder_path, scan=None):
+    """
+    Return the latest Robot output XML file in the given folder.
+    Looks for files ending with '_output.xml' or exactly 'output.xml'.
+    scan: entries of scan_output_files, to avoid scanning the folder again.
+    """
+    latest = latest_entry(scan if scan is not None else scan_files(folder_path, "*output.xml", archives=True))
+    if latest is None:
+        return None
+    return Path(latest.path)
+
+def is_test_passed(output_xml, cache=None):
+    """
+    Check if the root suite result of a Robot Framework output.xml is PASS.
+    Only the status block at the end of the file is read (see probe_status).
+    Returns True if overall suite status == 'PASS', else False.
+    When a SummaryCache is given, unchanged files are answered from it and
+    the probed status of new ones is stored there.
+    """
+    try:
+        with span("filter"):
+            status = cache.status(output_xml) if cache is not None else probe_status(output_xml).status
+            return (status or "").upper() == "PASS"
+    except Exception as e:
+        log(f"[ERROR] Failed to read {output_xml}: {e}")
+        return False
+
+def copy_result_folder(folder, target_path, transfer="copy", only_outputs=False):
+    """
+    Copy one result folder with the given transfer strategy (see transfer.py).
+    With only_outputs only the output.xml files needed by the merge are copied,
+    screenshots and HTML files stay behind.
+    A zip archive of results is transferred as one file, never extracted.
+    """
+    with span("copy"):
+        if is_zip(folder) and os.path.isfile(folder):
+            transfer_file(folder, target_path, transfer)
+        else:
+            transfer_tree(folder, target_path, transfer, OUTPUT_PATTERNS if only_outputs else None)
+    count("folders.copied")
+
+
+def copy_passed_folders(candidates, dest_dir, cache=None, transfer="copy", only_outputs=False, options=None):
+    """
+    Probe the output file of every (folder, output_file) candidate and copy
+    the folders whose tests passed to dest_dir.
+    Probing and copying run as a pipeline (see pipeline.py): options.probe_jobs
+    threads probe while options.copy_jobs threads copy, connected by queues
+    of options.queue_size items, so copies start with the first passed folder
+    and a burst of folders never runs far ahead of the copies.
+    Returns the status of every probed output file and the copied targets.
+    """
+    options = options or ListenerOptions()
+    passed = {}
+    claimed = set()
+    claimed_lock = threading.Lock()
+
+    def probe(candidate):
+        folder, output_file = candidate
+        passed[output_file] = is_test_passed(output_file, cache)
+        if not passed[output_file]:
+            log(f"[SKIP] {folder.name} failed tests, not copying.")
+            return None
+        return candidate
+
+    def copy(candidate):
+        folder, _ = candidate
+        target_path = dest_dir / folder.name
+        with claimed_lock:
+            # Two source folders may share a name, the first one wins.
+            if target_path.exists() or folder.name in claimed:
+                log(f"[SKIP] {folder} already exists in merge directory.")
+                return None
+            claimed.add(folder.name)
+        copy_result_folder(folder, target_path, transfer, only_outputs)
+        log(f"[INFO] Copied {folder} -> {target_path}")
+        return target_path
+
+    copied = run_pipeline(candidates, [Stage("probe", probe, options.probe_jobs),
+                                       Stage("copy", copy, options.copy_jobs)], options.queue_size)
+    return passed, copied
+
+
+def copy_result_folders(src_dir, dest_dir, exclude_file, cache=None, transfer="copy", only_outputs=False,
+                        scan=None, options=None):
+    """
+    Copy Robot result folders from src_dir to dest_dir excluding the one
+    containing the exclude_file (usually the latest output.xml).
+    scan: entries of scan_output_files, to avoid scanning src_dir again.
+    options: concurrency of the probe/copy pipeline, see copy_passed_folders.
+    """
+    src_dir = Path(src_dir)
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    if scan is None:
+        scan = scan_files(src_dir, "*output.xml", max_depth=1, archives=True)
+
+    candidates = []
+    for folder, xml_files in entries_by_folder(src_dir, scan).items():
+        output_file = Path(xml_files[0].path)
+        if output_file != exclude_file:
+            candidates.append((Path(folder), output_file))
+    copy_passed_folders(candidates, dest_dir, cache, transfer, only_outputs, options)
+
+
+# Files the listener writes in the merge directory, whatever the compression.
+MERGED_OUTPUTS = ("merge.xml", "merge_log.html", "merge_report.html") + tuple(
+    f"merge.xml.{compression}" for compression in COMPRESSIONS)
+
+
+def remove_merged_outputs(merge_dir):
+    """Remove the merged output of a previous cycle from the merge directory."""
+    for name in MERGED_OUTPUTS:
+        (Path(merge_dir) / name).unlink(missing_ok=True)
+
+
+def read_last_merged_time(state_file):
+    """Read last merge timestamp from a state file."""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, "r") as f:
+        timestamp = f.read().strip()
+        return datetime.fromisoformat(timestamp) if timestamp else None
+
+
+def write_last_merged_time(state_file, timestamp):
+    """Store the last merged timestamp."""
+    with open(state_file, "w") as f:
+        f.write(timestamp.isoformat())
+
+
+def run_merge_process(src_dir, merge_dir, state_file, options=None, exclude_latest=True, scan=None):
+    """Perform the merge process once."""
+    options = options or ListenerOptions()
+    if scan is None:
+        scan = scan_output_files(src_dir, merge_dir, options)
+    latest_output = get_latest_output_file(src_dir, scan)
+    if not latest_output:
+        print("[WARN] No output.xml found in source directory.")
+        return
+
+    last_merge_time = read_last_merged_time(state_file)
+    latest_time = datetime.fromtimestamp(output_stat(latest_output).st_mtime_ns / 1e9)
+
+    if last_merge_time and latest_time <= last_merge_time:
+        print("[INFO] No new results since last merge.")
+        return
+
+    print(f"[INFO] New results found. Last output.xml: {latest_output}")
+
+    # Copy result folders except the latest one
+    exclude_file = latest_output if exclude_latest else None
+    if options.use_cache:
+        Path(merge_dir).mkdir(parents=True, exist_ok=True)
+        with SummaryCache.for_folder(merge_dir) as cache:
+            copy_result_folders(src_dir, merge_dir, exclude_file, cache, options.transfer, options.only_outputs, scan,
+                                options)
+            cache.evict_missing()
+    else:
+        copy_result_folders(src_dir, merge_dir, exclude_file, None, options.transfer, options.only_outputs, scan,
+                            options)
+
+    # The previous merged output is in merge_dir too, it must not be merged again.
+    remove_merged_outputs(merge_dir)
+
+    # Merge results using your existing merge function
+    print("[INFO] Merging results...")
+    merge_robot_results(merge_dir,"merge", compression=options.compression,
+                        test_filter=options.test_filter)  # your merge logic
+
+    # Update last merged time
+    write_last_merged_time(state_file, latest_time)
+    print(f"[INFO] Merge complete at {latest_time.isoformat()}")
+
+
+# ==================================================
+# Incremental Merge
+# ==================================================
+
+MANIFEST_FILE = ".merge_manifest.json"
+
+
+def read_manifest(manifest_file):
+    """
+    Read the incremental merge manifest.
+    'files' maps every evaluated source output.xml to its size, mtime and
+    result, 'merged' lists the merge-dir XML files already in the merged output.
+    """
+    if not os.path.exists(manifest_file):
+        return {"files": {}, "merged": []}
+    with open(manifest_file, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest_file, manifest):
+    """Store the manifest atomically so an interrupted cycle keeps the old one."""
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_file, manifest_file)
+
+
+def copy_new_result_folders(src_dir, dest_dir, exclude_file, manifest, cache=None, transfer="copy",
+                            only_outputs=False, scan=None, options=None):
+    """
+    Like copy_result_folders, but only evaluates output.xml files that are
+    not in the manifest yet or changed since they were recorded there.
+    Returns True if any folder was copied.
+    """
+    src_dir = Path(src_dir)
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    if scan is None:
+        scan = scan_files(src_dir, "*output.xml", max_depth=1, archives=True)
+
+    candidates = []
+    entries = {}
+    for folder, xml_files in entries_by_folder(src_dir, scan).items():
+        output_file = Path(xml_files[0].path)
+        if output_file == exclude_file:
+            continue
+        key = str(output_file.resolve())
+        entry = manifest["files"].get(key)
+        if entry and entry["size"] == xml_files[0].size and entry["mtime_ns"] == xml_files[0].mtime_ns:
+            continue
+        candidates.append((Path(folder), output_file))
+        entries[output_file] = (key, xml_files[0])
+
+    passed, copied = copy_passed_folders(candidates, dest_dir, cache, transfer, only_outputs, options)
+    for output_file, (key, entry) in entries.items():
+        if output_file in passed:
+            manifest["files"][key] = {"size": entry.size, "mtime_ns": entry.mtime_ns,
+                                      "passed": passed[output_file]}
+    return bool(copied)
+
+
+def unmerged_outputs(merge_dir, manifest):
+    """Return output.xml files of copied folders that are not merged yet."""
+    merged = set(manifest["merged"])
+    pending = []
+    folders = entries_by_folder(merge_dir, scan_files(merge_dir, "*output.xml", max_depth=1, archives=True))
+    for folder in sorted(folders):
+        for output_file in sorted(entry.path for entry in folders[folder]):
+            relative = Path(output_file).relative_to(merge_dir).as_posix()
+            if relative not in merged:
+                pending.append(relative)
+    return pending
+
+
+def run_incremental_merge_process(src_dir, merge_dir, options=None, exclude_latest=True, scan=None):
+    """
+    Perform one incremental merge cycle: only new or changed output.xml
+    files are evaluated and only newly copied results are appended to the
+    previous merged output.
+    """
+    options = options or ListenerOptions()
+    if scan is None:
+        scan = scan_output_files(src_dir, merge_dir, options)
+    latest_output = get_latest_output_file(src_dir, scan)
+    if not latest_output:
+        print("[WARN] No output.xml found in source directory.")
+        return
+
+    manifest_file = Path(merge_dir) / MANIFEST_FILE
+    manifest = read_manifest(manifest_file)
+    Path(merge_dir).mkdir(parents=True, exist_ok=True)
+
+    exclude_file = latest_output if exclude_latest else None
+    if options.use_cache:
+        with SummaryCache.for_folder(merge_dir) as cache:
+            copy_new_result_folders(src_dir, merge_dir, exclude_file, manifest, cache,
+                                    options.transfer, options.only_outputs, scan, options)
+    else:
+        copy_new_result_folders(src_dir, merge_dir, exclude_file, manifest, None,
+                                options.transfer, options.only_outputs, scan, options)
+
+    pending = unmerged_outputs(merge_dir, manifest)
+    if pending:
+        if not manifest["merged"]:
+            # Nothing merged by this manifest yet, do not build on an old merge.
+            remove_merged_outputs(merge_dir)
+        print(f"[INFO] Merging {len(pending)} new result file(s)...")
+        append_robot_results(str(merge_dir), "merge", [str(Path(merge_dir) / name) for name in pending],
+                             options.compression, options.test_filter, options.html)
+        manifest["merged"].extend(pending)
+    else:
+        print("[INFO] No new results since last merge.")
+
+    write_manifest(manifest_file, manifest)
+    write_last_merged_time(Path(merge_dir) / ".last_merge_time",
+                           datetime.fromtimestamp(output_stat(latest_output).st_mtime_ns / 1e9))
+
+
+# ==================================================
+# Main Listener Logic
+# ==================================================
+
+def record_history(merge_dir, scan, exclude_file=None):
+    """
+    Record the outcome of every test of the scanned output files in the
+    history kept in merge_dir (see history.py). Runs already recorded are
+    skipped, failed runs are recorded too.
+    """
+    Path(merge_dir).mkdir(parents=True, exist_ok=True)
+    output_files = [entry.path for entry in scan if Path(entry.path) != exclude_file]
+    with span("history"), HistoryStore.for_folder(merge_dir) as history:
+        for path, error in history.record_files(output_files).items():
+            print(f"[ERROR] Failed to record {path}: {error}")
+
+
+def run_cycle(src_dir, merge_dir, options=None, exclude_latest=True):
+    """Run one classic or incremental merge cycle depending on the options."""
+    options = options or ListenerOptions()
+    with span("cycle"):
+        _run_cycle(src_dir, merge_dir, options, exclude_latest)
+    if options.notify_url:
+        # Queries on the merge directory see the new results without waiting for a scan.
+        notify_refresh(options.notify_url)
+
+
+def _run_cycle(src_dir, merge_dir, options, exclude_latest):
+    scan = scan_output_files(src_dir, merge_dir, options)
+    if options.history and scan:
+        # The latest output may still be written, it is recorded next cycle.
+        record_history(merge_dir, scan, get_latest_output_file(src_dir, scan) if exclude_latest else None)
+    if options.incremental:
+        run_incremental_merge_process(src_dir, merge_dir, options, exclude_latest, scan)
+    else:
+        run_merge_process(src_dir, merge_dir, Path(merge_dir) / ".last_merge_time", options, exclude_latest, scan)
+
+
+def start_listener(src_dir, merge_dir, wait_minutes, run_once=False, options=None):
+    while True:
+        print("\n[LISTENER] Checking for new Robot results...")
+        run_cycle(src_dir, merge_dir, options)
+        if run_once:
+            break
+        print(f"[WAIT] Sleeping for {wait_minutes} minutes...")
+        time.sleep(wait_minutes * 60)
+
+
+def watch_listener(src_dir, merge_dir, settle_seconds=5.0, options=None, max_batch_seconds=60.0):
+    """
+    Merge as soon as new output.xml files are closed instead of polling on
+    a fixed interval. Files reported by the watcher have stopped changing,
+    so the latest output does not need to be held back. The merge directory
+    is not watched, the files a cycle writes there do not start another one.
+    """
+    options = options or ListenerOptions()
+    exclude_dirs = tuple(options.exclude_dirs) + (str(merge_dir),)
+    with OutputFileWatcher(src_dir, settle_seconds=settle_seconds, exclude_dirs=exclude_dirs,
+                           max_batch_seconds=max_batch_seconds) as watcher:
+        print("\n[LISTENER] Checking for new Robot results...")
+        run_cycle(src_dir, merge_dir, options, exclude_latest=True)
+        while True:
+            batch = watcher.wait_for_batch()
+            print(f"\n[LISTENER] {len(batch)} new result file(s) detected")
+            run_cycle(src_dir, merge_dir, options, exclude_latest=False)
+
+
+
+# ==================================================
+# CLI Entry Point
+# ==================================================
+
+def main(argv=None):
+    """Command line entry point of the listener"""
+    parser = argparse.ArgumentParser(description="Robot Result Consolidation Listener")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--merge-dir", required=True, help="Directory where merged results will be stored")
+    parser.add_argument("--wait", type=int, default=10, help="Minutes to wait before next check")
+    parser.add_argument("--once", action="store_true", help="Run only once instead of continuous listening")
+    parser.add_argument("--cache", action="store_true", help="Cache per-file results in the merge directory")
+    parser.add_argument("--watch", action="store_true",
+                        help="React to new output files using filesystem notifications instead of --wait polling")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="Seconds an output file must stay unchanged before --watch merges it")
+    parser.add_argument("--max-batch-wait", type=float, default=60.0,
+                        help="Seconds --watch holds back settled files while others keep arriving")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process new or changed results and append them to the previous merge")
+    parser.add_argument("--transfer", choices=STRATEGIES, default="copy",
+                        help="How result files reach the merge directory, falls back to copy when unsupported")
+    parser.add_argument("--only-outputs", action="store_true",
+                        help="Only transfer the output.xml files needed by the merge (no screenshots or HTML)")
+    parser.add_argument("--exclude-dir", action="append", default=[],
+                        help="Directory name/pattern or path not to scan for results, e.g. screenshots")
+    parser.add_argument("--scan-jobs", type=int, default=1,
+                        help="Threads scanning the top level result folders")
+    parser.add_argument("--history", action="store_true",
+                        help="Record every test outcome in the merge directory for 'rrct history' reports")
+    parser.add_argument("--probe-jobs", type=int, default=4,
+                        help="Threads reading the status of new output files")
+    parser.add_argument("--copy-jobs", type=int, default=4,
+                        help="Threads copying passed result folders while others are still probed")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Folders waiting between probing and copying before probing pauses")
+    parser.add_argument("--compress", choices=COMPRESSIONS,
+                        help="Write the merged XML compressed (zst needs the zstandard package)")
+    parser.add_argument("--notify", metavar="URL",
+                        help="Refresh the 'rrct serve' query server at this URL after every cycle")
+    parser.add_argument("--html", action="store_true",
+                        help="With --incremental, also rewrite log/report every cycle; it loads the whole "
+                             "merged history in memory (by default write them when needed with rebot)")
+    add_filter_arguments(parser)
+    add_profile_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    options = ListenerOptions(use_cache=args.cache, incremental=args.incremental, transfer=args.transfer,
+                              only_outputs=args.only_outputs, exclude_dirs=tuple(args.exclude_dir),
+                              scan_jobs=args.scan_jobs, history=args.history, probe_jobs=args.probe_jobs,
+                              copy_jobs=args.copy_jobs, queue_size=args.queue_size, compression=args.compress,
+                              test_filter=test_filter_from_args(args), notify_url=args.notify,
+                              html=args.html)
+
+    print("[START] Robot Results Listener started")
+    with profiling_from_args(args):
+        if args.watch and not args.once:
+            watch_listener(args.folder, args.merge_dir, args.settle, options, args.max_batch_wait)
+        else:
+            start_listener(args.folder, args.merge_dir, args.wait, args.once, options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import os
+import json
+import subprocess
+import tempfile
+from .list_result import list_files
+from .transfer import transfer_file, STRATEGIES
+from .archive import COMPRESSIONS, compress_file, is_archived, load_result, save_result, split_member
+from .instrumentation import count, span
+from .result_filter import add_filter_arguments, filtered_outputs, test_filter_from_args
+
+# Outputs a merge can produce, rebot always produces the first three.
+ALL_OUTPUTS = ("xml", "log", "report")
+SUMMARY_OUTPUT = "summary"
+# Default of a hierarchical merge: the other outputs need the whole result in memory.
+TREE_OUTPUTS = ("xml",)
+OUTPUT_KINDS = ALL_OUTPUTS + (SUMMARY_OUTPUT,)
+
+
+def merge_in_process(sources, merged_xml_path=None, log_html_path=None, report_html_path=None,
+                     summary_json_path=None):
+    """Merge robot results inside the current process instead of running rebot
+
+    Only the outputs whose path is given are written, so e.g. a merged XML
+    can be produced without paying for log and report generation.
+
+    Args:
+        sources (list): output.xml paths (also compressed or zipped, see archive.py)
+            or already parsed robot Result objects
+        merged_xml_path (str): where to write the merged output.xml, compressed
+            if it ends in .gz or .zst
+        log_html_path (str): where to write log.html
+        report_html_path (str): where to write report.html
+        summary_json_path (str): where to write a small JSON summary
+    Returns:
+        robot.result.Result: the merged result
+    """
+    from robot.result.executionresult import CombinedResult
+
+    with span("merge.read"):
+        results = [load_result(source) if isinstance(source, (str, os.PathLike)) else source
+                   for source in sources]
+        merged = CombinedResult(results)
+    count("files.merged", len(results))
+    if merged_xml_path:
+        with span("merge.write"):
+            save_result(merged, merged_xml_path)
+    write_html(merged, log_html_path, report_html_path)
+    if summary_json_path:
+        write_summary_json(merged, summary_json_path)
+    return merged
+
+
+def write_html(result, log_html_path=None, report_html_path=None):
+    """Write log and/or report for a result object or merged output.xml
+
+    Lets HTML generation be deferred: merge to XML first, call this later.
+    """
+    from robot.api import ResultWriter
+
+    if log_html_path or report_html_path:
+        if isinstance(result, (str, os.PathLike)) and is_archived(result):
+            result = load_result(result)
+        with span("report"):
+            ResultWriter(result).write_results(output=None, log=log_html_path, report=report_html_path)
+
+
+def write_summary_json(result, summary_json_path):
+    """Write suite status, totals and tag statistics of a result as JSON"""
+    statistics = result.statistics
+    summary = {
+        "name": result.suite.name,
+        "status": result.suite.status,
+        "total": {"passed": statistics.total.passed, "failed": statistics.total.failed,
+                  "skipped": statistics.total.skipped},
+        "tags": [{"name": stat.name, "passed": stat.passed, "failed": stat.failed, "skipped": stat.skipped}
+                 for stat in statistics.tags],
+        "suites": [{"name": suite.name, "status": suite.status} for suite in result.suite.suites],
+    }
+    with open(summary_json_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+def _merge_output_paths(folder, merged_name, outputs, compression=None):
+    """Paths of the requested merge outputs, None for the ones not wanted"""
+    xml_name = f"{merged_name}.xml.{compression}" if compression else f"{merged_name}.xml"
+    names = {"xml": xml_name, "log": f"{merged_name}_log.html",
+             "report": f"{merged_name}_report.html", SUMMARY_OUTPUT: f"{merged_name}_summary.json"}
+    return [os.path.join(folder, names[kind]) if kind in outputs else None
+            for kind in ("xml", "log", "report", SUMMARY_OUTPUT)]
+
+
+def _merge_in_process_and_report(xml_paths, folder, merged_name, outputs, compression=None):
+    merged_xml_path, log_html_path, report_html_path, summary_json_path = \
+        _merge_output_paths(folder, merged_name, outputs, compression)
+    merged = merge_in_process(xml_paths, merged_xml_path, log_html_path, report_html_path, summary_json_path)
+    if merged.return_code == 0:
+        print("✅ Merge completed successfully.")
+    else:
+        print(f"⚠️ Merge completed, but {merged.return_code} test(s) failed.")
+    for label, path in (("Merged XML", merged_xml_path), ("Log file", log_html_path),
+                        ("Report file", report_html_path), ("Summary", summary_json_path)):
+        if path:
+            print(f"✅ {label}: {path}")
+
+
+def _tree_merge_and_report(xml_paths, folder, merged_name, outputs, fan_in, memory_budget_mb, jobs,
+                           compression=None):
+    """Merge hierarchically, memory only stays bounded when the XML is the only output"""
+    from .tree_merge import tree_merge
+    from .stream_parser import probe_status
+
+    outputs = TREE_OUTPUTS if outputs is None else outputs
+    merged_xml_path, log_html_path, report_html_path, summary_json_path = \
+        _merge_output_paths(folder, merged_name, outputs, compression)
+    unbounded = [kind for kind in ("log", "report", SUMMARY_OUTPUT) if kind in outputs]
+    if unbounded:
+        print(f"⚠️ Writing {', '.join(unbounded)} loads the whole merged result in memory, "
+              "peak memory is no longer bounded by the group size.")
+    # Log, report and summary are written from the merged XML, kept aside when not wanted.
+    with tempfile.TemporaryDirectory(prefix=".rrct_merge_", dir=folder) as merge_dir:
+        xml_path = merged_xml_path or os.path.join(merge_dir, f"{merged_name}.xml")
+        tree_merge(xml_paths, xml_path, fan_in or 16, memory_budget_mb, jobs)
+        probe = probe_status(xml_path)
+        if unbounded:
+            merged = load_result(xml_path)
+            write_html(merged, log_html_path, report_html_path)
+            if summary_json_path:
+                write_summary_json(merged, summary_json_path)
+    if probe.failed == 0:
+        print("✅ Merge completed successfully.")
+    else:
+        print(f"⚠️ Merge completed, but {probe.failed} test(s) failed.")
+    for label, path in (("Merged XML", merged_xml_path), ("Log file", log_html_path),
+                        ("Report file", report_html_path), ("Summary", summary_json_path)):
+        if path:
+            print(f"✅ {label}: {path}")
+
+
+def _rebot_and_report(xml_paths, folder, merged_name, compression=None):
+    """Merge with a rebot subprocess, writing xml, log and report to folder"""
+    merged_xml_path = os.path.join(folder, f"{merged_name}.xml")
+    log_html_path = os.path.join(folder, f"{merged_name}_log.html")
+    report_html_path = os.path.join(folder, f"{merged_name}_report.html")
+
+    # Run rebot merge via subprocess
+    with span("merge.rebot"):
+        result = subprocess.run([
+            "rebot",
+            "--output", merged_xml_path,
+            "--log", log_html_path,
+            "--report", report_html_path
+        ] + xml_paths, check=False)
+    count("files.merged", len(xml_paths))
+    if compression:
+        merged_xml_path = compress_file(merged_xml_path, compression)
+
+    # Check exit code
+    if result.returncode == 0:
+        print("✅ Merge completed successfully.")
+    else:
+        print(f"⚠️ Merge completed, but rebot returned exit code {result.returncode}.")
+        print("   (This usually means some tests failed.)")
+
+    print(f"\n✅ All original files copied to: {folder}")
+    print(f"✅ Merged XML: {merged_xml_path}")
+    print(f"✅ Log file: {log_html_path}")
+    print(f"✅ Report file: {report_html_path}")
+
+
+def merge_robot_results(src_folder, merged_name, in_process=False, outputs=None,
+                        fan_in=None, memory_budget_mb=None, jobs=1, compression=None, test_filter=None):
+    """Merge all robot output files found in src_folder
+
+    Args:
+        src_folder (str): folder with robot output files, results are written there
+        merged_name (str): base name of the merged xml, log and report
+        in_process (bool): merge with the robot API instead of a rebot subprocess
+        outputs (tuple): in process or hierarchically, any of "xml", "log", "report" and
+            "summary"; by default all but summary, only xml when merging hierarchically
+        fan_in (int): merge hierarchically, at most this many files per group
+        memory_budget_mb (int): merge hierarchically, groups limited to about this much memory
+        jobs (int): number of processes merging groups in hierarchical mode or filtering
+        compression (str): write the merged XML compressed, "gz" or "zst"
+        test_filter (result_filter.TestFilter): only merge the selected tests, the
+            others are pruned from streamed copies of the files first
+    """
+    # # src_folder = os.path.abspath(src_folder)
+    # new_folder = os.path.abspath(new_folder_path)
+    # os.makedirs(new_folder, exist_ok=True)
+
+    # # Find all XML files in source folder
+    # xml_files = [f for f in os.listdir(src_folder) if f.endswith(".xml")]
+    xml_files = list_files(src_folder)
+    xml_paths = [str(f) for f in xml_files]# type: ignore  # list_files already returns paths under src_folder
+
+    # for f in xml_files:# type: ignore
+    #     shutil.copy(os.path.join(src_folder, f), new_folder)  # Copy originals
+
+    with filtered_outputs(xml_paths, src_folder, test_filter, jobs) as xml_paths:
+        if not xml_paths:
+            print("⚠️ No test selected by the filter, nothing merged.")
+            return
+        if fan_in or memory_budget_mb:
+            _tree_merge_and_report(xml_paths, src_folder, merged_name, outputs, fan_in, memory_budget_mb, jobs,
+                                   compression)
+            return
+        # rebot only reads plain files, compressed and zipped ones are read as streams in process.
+        if in_process or any(is_archived(path) for path in xml_paths):
+            _merge_in_process_and_report(xml_paths, src_folder, merged_name, outputs or ALL_OUTPUTS, compression)
+            return
+
+        _rebot_and_report(xml_paths, src_folder, merged_name, compression)
+
+
+def merge_robot_results_to_new_folder(src_folder, new_folder_path, merged_name, in_process=False,
+                                      outputs=None, transfer="copy", compression=None, test_filter=None,
+                                      jobs=1, fan_in=None, memory_budget_mb=None):
+    """Copy the robot output files of src_folder to a new folder and merge them there
+
+    Args:
+        src_folder (str): folder with robot output files
+        new_folder_path (str): folder receiving the copies and merged results
+        merged_name (str): base name of the merged xml, log and report
+        in_process (bool): merge with the robot API instead of a rebot subprocess
+        outputs (tuple): in process or hierarchically, any of "xml", "log", "report" and
+            "summary"; by default all but summary, only xml when merging hierarchically
+        transfer (str): how the files are copied, one of transfer.STRATEGIES
+        compression (str): write the merged XML compressed, "gz" or "zst"
+        test_filter (result_filter.TestFilter): only merge the selected tests, the
+            originals are still copied whole
+        jobs (int): number of processes filtering the files or merging groups
+        fan_in (int): merge hierarchically, at most this many files per group
+        memory_budget_mb (int): merge hierarchically, groups limited to about this much memory
+    """
+    # src_folder = os.path.abspath(src_folder)
+    new_folder = os.path.abspath(new_folder_path)
+    os.makedirs(new_folder, exist_ok=True)
+
+    # # Find all XML files in source folder
+    # xml_files = [f for f in os.listdir(src_folder) if f.endswith(".xml")]
+    xml_files = list_files(src_folder)
+    xml_paths = [str(f) for f in xml_files]# type: ignore  # list_files already returns paths under src_folder
+
+    # Zip members are copied as their whole archive, once.
+    originals = dict.fromkeys(split_member(path)[0] for path in xml_paths)
+    for f in originals:# type: ignore
+        transfer_file(f, new_folder, transfer)  # Copy originals
+
+    with filtered_outputs(xml_paths, new_folder, test_filter, jobs) as xml_paths:
+        if not xml_paths:
+            print("⚠️ No test selected by the filter, nothing merged.")
+            return
+        if fan_in or memory_budget_mb:
+            _tree_merge_and_report(xml_paths, new_folder, merged_name, outputs, fan_in, memory_budget_mb, jobs,
+                                   compression)
+            return
+        if in_process or any(is_archived(path) for path in xml_paths):
+            _merge_in_process_and_report(xml_paths, new_folder, merged_name, outputs or ALL_OUTPUTS, compression)
+            return
+
+        _rebot_and_report(xml_paths, new_folder, merged_name, compression)
+
+
+def _previous_merged_output(src_folder, merged_name):
+    """The merged output kept in src_folder, plain or compressed, None if there is none"""
+    for suffix in ("",) + tuple(f".{compression}" for compression in COMPRESSIONS):
+        path = os.path.join(src_folder, f"{merged_name}.xml{suffix}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def append_robot_results(src_folder, merged_name, xml_paths, compression=None, test_filter=None, html=True):
+    """Add new result files to the merged output kept in src_folder
+
+    Only the new files are merged in process, the result is then spliced
+    after the child suites of the previous `{merged_name}.xml` by streaming
+    (see tree_merge.splice_merged_outputs), so history is neither re-merged
+    nor loaded in memory. Without a previous merged output a new one is
+    created from `xml_paths`. Log and report need the whole result in
+    memory, with `html=False` they are left for later (see write_html) and
+    the ones of a previous merge are removed, they no longer match the XML.
+
+    Args:
+        src_folder (str): folder holding the merged output
+        merged_name (str): base name of the merged xml, log and report
+        xml_paths (list[str]): new robot output files to add
+        compression (str): write the merged XML compressed, "gz" or "zst"; a
+            previous merged output is found whatever its compression
+        test_filter (result_filter.TestFilter): only add the selected tests of the
+            new files, `latest` then applies among the new files
+        html (bool): also rewrite log and report from the merged output
+    """
+    from .tree_merge import splice_merged_outputs
+
+    merged_xml_path, log_html_path, report_html_path, _ = \
+        _merge_output_paths(src_folder, merged_name, ALL_OUTPUTS, compression)
+    previous_xml_path = _previous_merged_output(src_folder, merged_name)
+
+    with filtered_outputs(xml_paths, src_folder, test_filter) as filtered_paths:
+        if not filtered_paths:
+            print("⚠️ No test selected by the filter, nothing added.")
+            return
+        if previous_xml_path is None:
+            merge_in_process(filtered_paths, merged_xml_path)
+        else:
+            with tempfile.TemporaryDirectory(prefix=".rrct_append_", dir=src_folder) as append_dir:
+                new_xml_path = os.path.join(append_dir, "new.xml")
+                spliced_xml_path = os.path.join(append_dir, os.path.basename(merged_xml_path))
+                merge_in_process(filtered_paths, new_xml_path)
+                with span("merge.splice"):
+                    splice_merged_outputs([previous_xml_path, new_xml_path], spliced_xml_path)
+                os.replace(spliced_xml_path, merged_xml_path)
+            if previous_xml_path != merged_xml_path:
+                os.remove(previous_xml_path)
+    if html:
+        write_html(merged_xml_path, log_html_path, report_html_path)
+    else:
+        for stale_path in (log_html_path, report_html_path):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+                print(f"ℹ️ Removed outdated {stale_path}, write it again with rebot.")
+
+    print(f"✅ Added {len(xml_paths)} result file(s) to merged output.")
+    print(f"✅ Merged XML: {merged_xml_path}")
+    if html:
+        print(f"✅ Log file: {log_html_path}")
+        print(f"✅ Report file: {report_html_path}")
+
+
+def main(argv=None):
+    """Command line entry point of the merge command"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge Robot Framework result files")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--name", default="merged", help="Base name of the merged files")
+    parser.add_argument("--new-folder", help="Copy the results to this folder and merge them there")
+    parser.add_argument("--in-process", action="store_true", help="Merge with the robot API instead of rebot")
+    parser.add_argument("--outputs",
+                        help="Comma separated outputs of --in-process and hierarchical merges: xml, log, report, "
+                             "summary (default: xml,log,report; only xml with --fan-in/--memory-budget, "
+                             "the others load the whole merged result in memory)")
+    parser.add_argument("--transfer", choices=STRATEGIES, default="copy",
+                        help="How files are copied to --new-folder, falls back to copy when unsupported")
+    parser.add_argument("--fan-in", type=int, help="Merge hierarchically, at most this many files per group")
+    parser.add_argument("--memory-budget", type=int, help="Merge hierarchically, approximate MB per group")
+    parser.add_argument("--jobs", type=int, default=1, help="Processes merging groups in hierarchical mode or filtering files")
+    parser.add_argument("--compress", choices=COMPRESSIONS,
+                        help="Write the merged XML compressed (zst needs the zstandard package)")
+    add_filter_arguments(parser)
+
+    args = parser.parse_args(argv)
+    outputs = tuple(output.strip() for output in args.outputs.split(",")) if args.outputs else None
+    unknown = set(outputs or ()) - set(OUTPUT_KINDS)
+    if unknown:
+        parser.error(f"unknown --outputs {', '.join(sorted(unknown))}, use {', '.join(OUTPUT_KINDS)}")
+    test_filter = test_filter_from_args(args)
+
+    if args.new_folder:
+        merge_robot_results_to_new_folder(args.folder, args.new_folder, args.name, args.in_process, outputs,
+                                          args.transfer, args.compress, test_filter, args.jobs,
+                                          args.fan_in, args.memory_budget)
+    else:
+        merge_robot_results(args.folder, args.name, args.in_process, outputs,
+                            args.fan_in, args.memory_budget, args.jobs, args.compress, test_filter)
+
+
+if __name__ == "__main__":
+    main()
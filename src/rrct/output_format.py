@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import sys
+from abc import ABC, abstractmethod
+
+FORMATS = ("text", "jsonl", "csv")
+# Buffered output is written to the stream in chunks of about this size.
+FLUSH_SIZE = 64 * 1024
+
+
+class RecordWriter(ABC):
+    """Buffered writer of structured records (dicts) to a text stream
+
+    Records are serialized into an in-memory buffer and written to the
+    stream in large chunks, instead of one write per line. Use it as a
+    context manager, or call flush() when done.
+    """
+
+    def __init__(self, fields, stream=None, flush_size=FLUSH_SIZE):
+        self.fields = list(fields)
+        self.stream = stream if stream is not None else sys.stdout
+        self.flush_size = flush_size
+        self._buffer = io.StringIO()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def write(self, record):
+        self._serialize(record)
+        if self._buffer.tell() >= self.flush_size:
+            self.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        self.stream.write(self._buffer.getvalue())
+        self.stream.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    @abstractmethod
+    def _serialize(self, record):
+        """Append one record to the buffer, in the format of the subclass"""
+
+
+class JsonLinesWriter(RecordWriter):
+    """One JSON object per line, keys not set on a record are left out"""
+
+    def _serialize(self, record):
+        self._buffer.write(json.dumps(record, ensure_ascii=False))
+        self._buffer.write("\n")
+
+
+class CsvWriter(RecordWriter):
+    """CSV with a header row of `fields`, lists are joined with ';'"""
+
+    def __init__(self, fields, stream=None, flush_size=FLUSH_SIZE):
+        super().__init__(fields, stream, flush_size)
+        self._csv = csv.DictWriter(self._buffer, self.fields, extrasaction="ignore", lineterminator="\n")
+        self._csv.writeheader()
+
+    def _serialize(self, record):
+        self._csv.writerow({key: ";".join(value) if isinstance(value, list) else value
+                            for key, value in record.items()})
+
+
+def open_writer(output_format, fields, stream=None):
+    """Writer for a machine readable format
+
+    Args:
+        output_format (str): "jsonl" or "csv"
+        fields (list[str]): record keys, in column order (used by csv)
+        stream (TextIO): where to write, default sys.stdout
+    Returns:
+        RecordWriter
+    """
+    if output_format == "jsonl":
+        return JsonLinesWriter(fields, stream)
+    if output_format == "csv":
+        return CsvWriter(fields, stream)
+    raise ValueError(f"Unsupported output format: {output_format}, expected one of {FORMATS[1:]}")
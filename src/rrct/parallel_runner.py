@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .stream_parser import count_summary, summarize
+
+
+def map_in_pool(func, items, jobs=1):
+    """Apply `func` to every item, optionally in a process pool
+
+    Results are yielded in the same order as `items`, so the output is the
+    same as a serial run whatever the number of jobs.
+
+    Args:
+        func (callable): module level function, it must be picklable
+        items (list): arguments for `func`
+        jobs (int): number of worker processes, 0 means one per CPU
+    Yields:
+        result of `func` for each item
+    """
+    items = list(items)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        yield from map(func, items)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(func, items)
+
+
+def summarize_files(output_files, jobs=1):
+    """Summarize output.xml files in parallel
+
+    Args:
+        output_files (list): robot output.xml files
+        jobs (int): number of worker processes
+    Yields:
+        stream_parser.FileSummary for each file, in the given order
+    """
+    for summary in map_in_pool(summarize, output_files, jobs):
+        count_summary(summary)
+        yield summary
@@ -0,0 +1,519 @@
+import argparse
+from .color_coding import colour_print, BOLD, GREEN, RED, BOLD_UNDERLINE
+from .list_result import list_files
+from .stream_parser import iter_tests, tag_statistics, FileSummary
+from .parallel_runner import map_in_pool, summarize_files
+from .summary_cache import SummaryCache
+from .result_index import ResultIndex
+from .tag_query import TagQuery, iter_suite_tests, iter_matching_tests
+from .output_format import FORMATS, open_writer
+from .archive import load_result
+from .result_model import tag_key
+from .tag_totals import FileTagStats, TagTotals, file_tag_statistics, robot_tag_statistics, summary_tag_statistics
+from pathlib import Path
+import os
+
+# Columns of the machine readable records of each command.
+RECORD_FIELDS = {
+    "tests": ["type", "file", "suite", "name", "tags", "status", "starttime", "endtime", "elapsed", "message", "error"],
+    "match": ["type", "file", "name", "tags", "error"],
+    "tags": ["type", "file", "tag", "passed", "failed", "skipped", "error"],
+    "check": ["type", "file", "tag", "found", "passed", "failed", "skipped", "error"],
+}
+
+def list_test_results_in_folder(folder_path, tag_pattern=".*", streaming=False, jobs=1, cache=False, index=False, output_format="text"):
+    """list test present in the result folder matching with the given pattern
+
+    Args:
+        folder_path (Path | str): path to your robot output folder
+        streaming (bool): read files with the streaming parser instead of ExecutionResult
+        jobs (int): parse files in a pool of this many processes (implies streaming)
+        cache (bool): reuse summaries stored in the folder's summary cache (implies streaming)
+        index (bool): answer from the folder's test index, updated first (implies streaming)
+        output_format (str): "text" (default), or "jsonl"/"csv" records written to stdout
+    """
+    if output_format != "text":
+        return write_result_records("match", folder_path, output_format, tag_pattern, jobs=jobs, cache=cache, index=index)
+    output_files = list_files(folder_path)
+    problem_files = []
+    print_file = "\n\n✅ Matching tag found -: "
+    colour_print(print_file, GREEN)    
+    if index:
+        with ResultIndex.for_folder(folder_path) as result_index:
+            errors = result_index.update(output_files, jobs)
+            matches = {}
+            for path, test_name, tags in result_index.find_tests(tag_pattern):
+                matches.setdefault(path, []).append((test_name, tags))
+        for file in output_files: # type: ignore
+            if os.path.abspath(file) in errors:
+                problem_files.append(file)
+            else:
+                print_matching_tests(file, matches.get(os.path.abspath(file), []))
+    elif jobs != 1 or cache:
+        tag_query = TagQuery(tag_pattern)
+        for file, summary in zip(output_files, load_summaries(folder_path, output_files, jobs, cache)): # type: ignore
+            if summary.error is not None:
+                problem_files.append(file)
+                continue
+            print_matching_tests(file, find_matching_records_with_tags(summary.tests, tag_query))
+    else:
+        for file in output_files: # type: ignore
+            Flag = list_test(file, tag_pattern, streaming)
+            if Flag != True :
+                problem_files.append(file)
+    if(len(problem_files)!=0):  
+        str_to_print = "\n\n❌ Probelm with files given below:"  
+        colour_print(str_to_print, RED)    
+        for file in problem_files:
+            print("File-name -: ",file)
+                            
+
+def load_summaries(folder_path, output_files, jobs=1, cache=False, index=False):
+    """Summaries of the given result files, in order
+
+    Args:
+        folder_path (Path | str): robot output folder, the cache is stored there
+        output_files (list): robot output.xml files inside folder_path
+        jobs (int): number of worker processes used to parse files
+        cache (bool): serve unchanged files from the folder's summary cache
+        index (bool): serve files from the folder's test index, updated first
+    Yields:
+        stream_parser.FileSummary for each file
+    """
+    if index:
+        with ResultIndex.for_folder(folder_path) as result_index:
+            errors = result_index.update(output_files, jobs)
+            for file in output_files:
+                path = os.path.abspath(file)
+                if path in errors:
+                    yield FileSummary(path, None, [], [], errors[path])
+                else:
+                    yield result_index.summary(path)
+    elif cache:
+        with SummaryCache.for_folder(folder_path) as summary_cache:
+            yield from summary_cache.summaries(output_files, jobs)
+    else:
+        yield from summarize_files(output_files, jobs)
+
+def iter_result_records(command, output_files, summaries, tag_pattern=".*", tags_to_check=()):
+    """Machine readable records of a query command, produced file by file
+
+    Args:
+        command (str): "tests", "match", "tags" or "check", see RECORD_FIELDS
+        output_files (list): robot output.xml files
+        summaries (iterable): stream_parser.FileSummary of each file, in order; "check"
+            only reads `tag_stats` and `error`, tag_totals.FileTagStats do as well
+        tag_pattern (str): tag pattern or expression used by "match"
+        tags_to_check (list): tags used by "check"
+    Yields:
+        dict: one record per test, match, tag or checked tag, or an error record per unreadable file
+    """
+    if command == "tags":
+        yield from iter_tag_records(output_files, map(summary_tag_statistics, summaries))
+        return
+    tag_query = TagQuery(tag_pattern)
+    for file, summary in zip(output_files, summaries):
+        file = str(file)
+        if summary.error is not None:
+            yield {"type": "error", "file": file, "error": summary.error}
+        elif command == "tests":
+            for test in summary.tests:
+                yield {"type": "test", "file": file, "suite": test.suite, "name": test.name, "tags": list(test.tags),
+                       "status": test.status, "starttime": test.starttime, "endtime": test.endtime,
+                       "elapsed": test.elapsed, "message": test.message}
+        elif command == "match":
+            for test_name, tags in find_matching_records_with_tags(summary.tests, tag_query):
+                yield {"type": "match", "file": file, "name": test_name, "tags": tags}
+        else:
+            tag_stats_map = find_tag_stats(summary.tag_stats, tags_to_check)
+            for tag in tags_to_check:
+                t = tag_stats_map.get(tag)
+                yield {"type": "check", "file": file, "tag": tag, "found": t is not None,
+                       "passed": t.passed if t else 0, "failed": t.failed if t else 0,
+                       "skipped": t.skipped if t else 0}
+
+def iter_tag_records(output_files, file_tag_stats, total_only=False):
+    """Tag statistics records of every file, then of all files together
+
+    Args:
+        output_files (list): robot output.xml files
+        file_tag_stats (iterable): tag_totals.FileTagStats of each file, in order
+        total_only (bool): only the consolidated records
+    Yields:
+        dict: "tag" records per file, "total" records per tag over all files,
+        then a "failed_file" record per file with failed tests
+    """
+    totals = TagTotals()
+    failed_files = []
+    for file, file_stats in zip(output_files, file_tag_stats):
+        file = str(file)
+        totals.add(file_stats)
+        if file_stats.error is not None:
+            yield {"type": "error", "file": file, "error": file_stats.error}
+            continue
+        if file_stats.total.failed:
+            failed_files.append(file)
+        if total_only:
+            continue
+        for tag_stat in file_stats.tag_stats:
+            yield {"type": "tag", "file": file, "tag": tag_stat.name, "passed": tag_stat.passed,
+                   "failed": tag_stat.failed, "skipped": tag_stat.skipped}
+    for tag_stat in totals.tag_stats() + [totals.total_stat()]:
+        yield {"type": "total", "file": "", "tag": tag_stat.name, "passed": tag_stat.passed,
+               "failed": tag_stat.failed, "skipped": tag_stat.skipped}
+    for file in failed_files:
+        yield {"type": "failed_file", "file": file}
+
+def write_result_records(command, folder_path, output_format, tag_pattern=".*", tags_to_check=(),
+                         jobs=1, cache=False, index=False, total_only=False):
+    """Write the records of a query command to stdout in a machine readable format
+
+    Files are read with the streaming parser, records are written as each
+    file is done, in buffered chunks.
+
+    Args:
+        command (str): "tests", "match", "tags" or "check"
+        folder_path (Path | str): path to your robot output folder
+        output_format (str): "jsonl" or "csv"
+        tag_pattern (str): tag pattern or expression used by "match"
+        tags_to_check (list): tags used by "check"
+        jobs (int): number of worker processes used to parse files
+        cache (bool): reuse summaries stored in the folder's summary cache
+        index (bool): answer from the folder's test index, updated first
+        total_only (bool): "tags" only writes the statistics over all files
+    """
+    output_files = list_files(folder_path, verbose=False) or []
+    with open_writer(output_format, RECORD_FIELDS[command]) as writer:
+        if command in ("tags", "check"):
+            file_tag_stats = load_tag_statistics(folder_path, output_files, True, jobs, cache, index)
+            if command == "tags":
+                writer.write_all(iter_tag_records(output_files, file_tag_stats, total_only))
+            else:
+                writer.write_all(iter_result_records(command, output_files, file_tag_stats,
+                                                     tags_to_check=tags_to_check))
+            return
+        summaries = load_summaries(folder_path, output_files, jobs, cache, index)
+        writer.write_all(iter_result_records(command, output_files, summaries, tag_pattern, tags_to_check))
+
+def list_test(result_file_to_parse, tag_pattern=".*", streaming=False):
+    """list test present in the result file matching with the given pattern
+
+    Args:
+        result_file (str): robot output.xml file   
+        tag_pattern (str | TagQuery): tag pattern or AND/OR/NOT expression, Default = everything   
+        streaming (bool): read the file with the streaming parser instead of ExecutionResult
+    """
+
+    # Path to Robot Framework's output XML.
+    try:
+        tag_pattern = TagQuery.coerce(tag_pattern)  # e.g., "Smoke.*" or "smoke AND NOT slow"
+        if streaming:
+            match_test = find_matching_records_with_tags(iter_tests(result_file_to_parse), tag_pattern)
+        else:
+            result_file = load_result(result_file_to_parse)
+            match_test = find_matching_tests_with_tags(result_file.suite,tag_pattern)
+        print_matching_tests(result_file_to_parse, match_test)
+        return True
+    except Exception as e:
+        # error_print = "Something Went Wrong" + str(e)
+        # colour_print(error_print,RED)
+        return e
+
+def print_matching_tests(result_file, match_test):
+    """Print the tests matched in one result file
+
+    Args:
+        result_file (str): robot output.xml file the matches come from
+        match_test (list): (test name, matched tags) tuples
+    """
+    if(len(match_test)!=0):
+        print_file = "File-name -: " + str(result_file)
+        colour_print(print_file, BOLD_UNDERLINE)
+    # Output matched test names and their tags
+    for test_name, tags in match_test:
+        print(f"Test: {test_name} | Matched Tag(s): {tags}")
+
+def find_matching_tests_with_tags(suite,tag_pattern, statuses=None):
+    """_summary_
+    find matching suite for you robot result
+    
+    Args:
+        suite(Object): suite is a robot.model.testsuite.TestSuite object 
+        tag_pattern(TagQuery | str | re.Pattern): tag pattern or AND/OR/NOT expression
+        statuses(iterable): only tests with one of these statuses, e.g. ["FAIL"]
+    Returns:
+        matches(list): list of test matching with the given tags
+    """    
+    return list(iter_matching_tests((test for test, _ in iter_suite_tests(suite)), tag_pattern, statuses))
+
+def find_matching_records_with_tags(tests, tag_pattern, statuses=None):
+    """Streaming counterpart of find_matching_tests_with_tags
+
+    Args:
+        tests(iterable): result_model.TestRecord objects, e.g. from stream_parser.iter_tests
+        tag_pattern(TagQuery | str | re.Pattern): tag pattern or AND/OR/NOT expression
+        statuses(iterable): only tests with one of these statuses, e.g. ["FAIL"]
+    Returns:
+        matches(list): list of test matching with the given tags
+    """
+    return list(iter_matching_tests(tests, tag_pattern, statuses))
+
+def print_test(test, suite_name):
+    """Print a single test result
+
+    Args:
+        test(Object): robot.result.TestCase or result_model.TestRecord
+        suite_name(str): long name of the suite the test belongs to, e.g. "Root.Child"
+    """
+    print(f"Test: {test.name}")
+    print(f"Test tag - : {[tag for tag in test.tags]}")
+    print(f"  Status    : ",end="")
+    colour_print('PASS', GREEN) if(test.status == 'PASS') else colour_print('FAIL', RED)
+    print(f"  Start Time: {test.starttime}")
+    print(f"  End Time  : {test.endtime}")
+    print(f"  Suite name  : {suite_name}")
+    if test.message:
+        print(f"  Message   : {test.message}")
+    print()
+
+# Loop through all suites and tests
+def print_test_results(suite):
+    """Print test results from your robot output file
+
+    Args:
+        suite(Object): suite is a robot.model.testsuite.TestSuite object 
+    """
+    for test, parent in iter_suite_tests(suite):
+        # The long name, like TestRecord.suite of the streaming parser.
+        print_test(test, parent.full_name)
+
+def print_test_results_in_folder(folder_path, streaming=False, jobs=1, cache=False, index=False, output_format="text"):
+    """Print all test results from your robot output folder
+
+    Args:
+        folder_path (Path | str): path to your robot output folder
+        streaming (bool): read files with the streaming parser instead of ExecutionResult
+        jobs (int): parse files in a pool of this many processes (implies streaming)
+        cache (bool): reuse summaries stored in the folder's summary cache (implies streaming)
+        index (bool): answer from the folder's test index, updated first (implies streaming)
+        output_format (str): "text" (default), or "jsonl"/"csv" records written to stdout
+    """
+    if output_format != "text":
+        return write_result_records("tests", folder_path, output_format, jobs=jobs, cache=cache, index=index)
+    output_files = list_files(folder_path)
+    if jobs != 1 or cache or index:
+        for file, summary in zip(output_files, load_summaries(folder_path, output_files, jobs, cache, index)): # type: ignore
+            print_file = "File-name -: " + str(file)
+            colour_print(print_file, BOLD_UNDERLINE)
+            if summary.error is not None:
+                print("\nSomething wrong with file",summary.error,end="\n\n")
+                continue
+            for test in summary.tests:
+                print_test(test, test.suite)
+        return
+    for file in output_files: # type: ignore
+        print_file = "File-name -: " + str(file)
+        colour_print(print_file, BOLD_UNDERLINE)
+        try:
+            if streaming:
+                for test in iter_tests(file):
+                    print_test(test, test.suite)
+                continue
+            result = load_result(file)
+            print_test_results(result.suite)
+        except Exception as e:
+            print("\nSomething wrong with file",e,end="\n\n")
+
+def load_tag_statistics(folder_path, output_files, streaming=False, jobs=1, cache=False, index=False):
+    """Tag statistics of the given result files, in order
+
+    Streamed files are counted as they are read (in `jobs` worker processes),
+    only the counters are kept and sent back, never the tests.
+
+    Args:
+        folder_path (Path | str): robot output folder, the cache and index are stored there
+        output_files (list): robot output.xml files inside folder_path
+        streaming (bool): read files with the streaming parser instead of ExecutionResult
+        jobs (int): number of worker processes (implies streaming)
+        cache (bool): serve unchanged files from the folder's summary cache
+        index (bool): serve files from the folder's test index, updated first
+    Yields:
+        tag_totals.FileTagStats for each file
+    """
+    if index:
+        # Counted by the index itself, no test record is rebuilt.
+        with ResultIndex.for_folder(folder_path) as result_index:
+            errors = result_index.update(output_files, jobs)
+            for file_stats in result_index.file_tag_statistics(output_files):
+                if file_stats.path in errors:
+                    yield FileTagStats(file_stats.path, [], None, errors[file_stats.path])
+                else:
+                    yield file_stats
+    elif cache:
+        yield from map(summary_tag_statistics, load_summaries(folder_path, output_files, jobs, cache))
+    elif streaming or jobs != 1:
+        yield from map_in_pool(file_tag_statistics, output_files, jobs)
+    else:
+        yield from map(robot_tag_statistics, output_files)
+
+def print_tag_stats(tag_stats):
+    for tag_stat in tag_stats:
+        print(f"Tag: {tag_stat.name}, "
+            f"Passed: {tag_stat.passed}, "
+            f"Failed: {tag_stat.failed}, "
+            f"Skipped: {tag_stat.skipped}")
+
+def list_tags_from_result_files(folder_path, streaming=False, jobs=1, cache=False, index=False, output_format="text", total_only=False):
+    """List statistics for each tag, per file and over all files
+
+    Args:
+        folder_path (Path | str): path to your robot output folder
+        streaming (bool): read files with the streaming parser instead of ExecutionResult
+        jobs (int): parse files in a pool of this many processes (implies streaming)
+        cache (bool): reuse summaries stored in the folder's summary cache (implies streaming)
+        index (bool): answer from the folder's test index, updated first (implies streaming)
+        output_format (str): "text" (default), or "jsonl"/"csv" records written to stdout
+        total_only (bool): only print the statistics over all files
+    """
+    if output_format != "text":
+        return write_result_records("tags", folder_path, output_format, jobs=jobs, cache=cache, index=index,
+                                    total_only=total_only)
+    output_files = list_files(folder_path) or []
+    totals = TagTotals()
+    problem_files = []
+    for file, file_stats in zip(output_files, load_tag_statistics(folder_path, output_files, streaming, jobs, cache, index)):
+        totals.add(file_stats)
+        if file_stats.error is None and file_stats.total.failed:
+            problem_files.append(file)
+        if total_only and file_stats.error is None:
+            continue
+        print_file = "File-name -: " + str(file)
+        colour_print(print_file, BOLD_UNDERLINE)
+        if file_stats.error is not None:
+            print("Something Went Wrong", file_stats.error)
+            continue
+        print_tag_stats(file_stats.tag_stats)
+    colour_print(f"\nAll files ({totals.files}) -: ", BOLD_UNDERLINE)
+    print_tag_stats(totals.tag_stats())
+    total = totals.total_stat()
+    print(f"Total: Passed: {total.passed}, Failed: {total.failed}, Skipped: {total.skipped}")
+    if(len(problem_files)!=0):  
+        str_to_print = "Following files have failed:"  
+        colour_print(str_to_print, BOLD_UNDERLINE)    
+        for file in problem_files:
+            print("File-name -: ", end="")
+            print_file = str(file)
+            colour_print(print_file, RED)        
+        
+
+def check_tags(tags_to_check, output_file, streaming=False):
+    """Check if given tags exist in Robot output.xml and print their stats."""
+    try:
+        if streaming:
+            tag_stats = tag_statistics(iter_tests(output_file))
+        else:
+            tag_stats = load_result(output_file).statistics.tags
+        return check_tag_stats(tags_to_check, tag_stats)
+    except Exception as e:
+        print("Something went wrong", e)
+    return False
+
+def find_tag_stats(tag_stats, tags):
+    """The statistics of the given tags only, by the tag names looked for
+
+    Names are compared like robot compares tags, ignoring case, spaces and
+    underscores (see result_model.tag_key).
+
+    Args:
+        tag_stats (iterable): TagStat or robot TagStat objects of one file
+        tags (list): tag names looked for
+    """
+    by_key = {tag_key(tag_stat.name): tag_stat for tag_stat in tag_stats}
+    return {tag: by_key[tag_key(tag)] for tag in tags if tag_key(tag) in by_key}
+
+def check_tag_stats(tags_to_check, tag_stats):
+    """Print the stats of the given tags, return True if any tag is missing."""
+    flag = False
+    tag_stats_map = find_tag_stats(tag_stats, tags_to_check)
+
+    # Check each user-specified tag
+    for tag in tags_to_check:
+        if tag in tag_stats_map:
+            t = tag_stats_map[tag]
+            print(f"✅ Tag found: {t.name}, Passed: {t.passed}, Failed: {t.failed}, Skipped: {t.skipped}")
+        else:
+            flag = True
+            print(f"❌ Tag not found: {tag}")
+    return flag
+
+def check_tags_in_results_folder(folder_path, tags_to_check, streaming=False, jobs=1, cache=False, index=False, output_format="text"):
+    """Check tags for all test results from your robot output folder
+
+    Args:
+        folder_path (Path | str): path to your robot output folder
+        tags_to_check: List of tags to check in your robot output folder
+        streaming (bool): read files with the streaming parser instead of ExecutionResult
+        jobs (int): parse files in a pool of this many processes (implies streaming)
+        cache (bool): reuse summaries stored in the folder's summary cache (implies streaming)
+        index (bool): answer from the folder's test index, updated first (implies streaming)
+        output_format (str): "text" (default), or "jsonl"/"csv" records written to stdout
+    """
+    if output_format != "text":
+        return write_result_records("check", folder_path, output_format, tags_to_check=tags_to_check, jobs=jobs, cache=cache, index=index)
+    output_files = list_files(folder_path)
+    file_tag_stats = load_tag_statistics(folder_path, output_files, True, jobs, cache, index) if jobs != 1 or cache or index else None
+    problem_files = []
+    for file in output_files: # type: ignore
+        print_file = "File-name -: " + str(file)
+        colour_print(print_file, BOLD_UNDERLINE)
+        if file_tag_stats is not None:
+            file_stats = next(file_tag_stats)
+            if file_stats.error is not None:
+                print("Something went wrong", file_stats.error)
+                missing = False
+            else:
+                missing = check_tag_stats(tags_to_check, file_stats.tag_stats)
+        else:
+            missing = check_tags(tags_to_check, file, streaming)
+        if(missing):
+            problem_files.append(file)
+    if(len(problem_files)!=0):  
+        str_to_print = "Probelm with files given below:"  
+        colour_print(str_to_print, BOLD_UNDERLINE)    
+        for file in problem_files:
+            print("File-name -: ", end="")
+            print_file = str(file)
+            colour_print(print_file, RED)
+            
+            
+
+def main(argv=None):
+    """Command line entry point of the query commands (tests, match, tags, check)"""
+    parser = argparse.ArgumentParser(description="Query Robot Framework result files")
+    parser.add_argument("command", choices=["tests", "match", "tags", "check"],
+                        help="tests: print all results, match: list tests matching --pattern, "
+                             "tags: tag statistics, check: check --tags are present")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--pattern", default=".*", help="Tag pattern or expression (e.g. 'smoke AND NOT slow') used by the match command")
+    parser.add_argument("--tags", nargs="+", default=[], help="Tags used by the check command")
+    parser.add_argument("--streaming", action="store_true", help="Use the streaming parser instead of ExecutionResult")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes, 0 for one per CPU")
+    parser.add_argument("--cache", action="store_true", help="Reuse per-file summaries cached in the results folder")
+    parser.add_argument("--index", action="store_true", help="Answer from the test index kept in the results folder")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="Output format, jsonl and csv write one record per line")
+    parser.add_argument("--total", action="store_true", help="tags: only the statistics over all files and the files with failures")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "tests":
+        print_test_results_in_folder(args.folder, args.streaming, args.jobs, args.cache, args.index, args.format)
+    elif args.command == "match":
+        list_test_results_in_folder(args.folder, args.pattern, args.streaming, args.jobs, args.cache, args.index, args.format)
+    elif args.command == "tags":
+        list_tags_from_result_files(args.folder, args.streaming, args.jobs, args.cache, args.index, args.format, args.total)
+    else:
+        check_tags_in_results_folder(args.folder, args.tags, args.streaming, args.jobs, args.cache, args.index, args.format)
+
+
+if __name__ == "__main__":
+    main()
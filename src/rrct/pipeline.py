@@ -0,0 +1,102 @@
+import queue
+import threading
+from collections import namedtuple
+
+# One step of a pipeline: `func` is called with each item from the previous
+# stage by `workers` threads, it returns the item passed on or None to drop it.
+Stage = namedtuple("Stage", ["name", "func", "workers"])
+
+DEFAULT_QUEUE_SIZE = 32
+_DONE = object()
+
+
+class _StageRunner:
+    """Worker threads of one stage, reading `inbox` and writing `outbox`"""
+
+    def __init__(self, stage, inbox, outbox, next_workers, failed):
+        self.stage = stage
+        self.inbox = inbox
+        self.outbox = outbox
+        self.next_workers = next_workers
+        self.failed = failed
+        self.running = max(1, stage.workers)
+        self.lock = threading.Lock()
+        self.errors = []
+        self.threads = [threading.Thread(target=self._work, name=f"{stage.name}-{index}", daemon=True)
+                        for index in range(self.running)]
+
+    def _work(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            if self.failed.is_set():
+                continue  # keep draining so upstream puts never block
+            try:
+                result = self.stage.func(item)
+            except BaseException as e:
+                self.errors.append(e)
+                self.failed.set()
+                continue
+            if result is not None:
+                self.outbox.put(result)
+        with self.lock:
+            self.running -= 1
+            last = self.running == 0
+        if last:
+            for _ in range(self.next_workers):
+                self.outbox.put(_DONE)
+
+
+def run_pipeline(items, stages, queue_size=DEFAULT_QUEUE_SIZE):
+    """Pass items through stages of worker threads connected by bounded queues
+
+    Every stage works on the items as soon as the previous stage hands them
+    over, so e.g. copies start while later files are still being probed.
+    A queue holds at most `queue_size` items: a fast stage blocks instead of
+    running ahead of a slow one, which bounds the memory used by a burst.
+    Threads suit stages waiting on files, the network or subprocesses.
+
+    Args:
+        items (iterable): inputs of the first stage, read lazily
+        stages (list[Stage]): stages in order
+        queue_size (int): capacity of every queue between two stages
+    Returns:
+        list: results of the last stage, in completion order
+    Raises:
+        the first exception raised by a stage, after all threads stopped
+    """
+    failed = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results = queue.Queue()
+    runners = []
+    for index, stage in enumerate(stages):
+        last = index == len(stages) - 1
+        outbox = results if last else queues[index + 1]
+        next_workers = 1 if last else max(1, stages[index + 1].workers)
+        runners.append(_StageRunner(stage, queues[index], outbox, next_workers, failed))
+    for runner in runners:
+        for thread in runner.threads:
+            thread.start()
+
+    try:
+        for item in items:
+            if failed.is_set():
+                break
+            queues[0].put(item)
+    finally:
+        for _ in range(len(runners[0].threads)):
+            queues[0].put(_DONE)
+
+    collected = []
+    while True:
+        result = results.get()
+        if result is _DONE:
+            break
+        collected.append(result)
+    for runner in runners:
+        for thread in runner.threads:
+            thread.join()
+        if runner.errors:
+            raise runner.errors[0]
+    return collected
@@ -0,0 +1,22 @@
+import urllib.request
+
+
+def notify_refresh(url):
+    """Ask a running query server to refresh now, e.g. after a merge
+
+    Kept apart from query_server so the listener does not import the
+    server and the parsing modules behind it.
+
+    Args:
+        url (str): base URL of the server, e.g. http://127.0.0.1:8765
+    Returns:
+        bool: whether the server answered
+    """
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"{url.rstrip('/')}/refresh", data=b"",
+                                                           method="POST"), timeout=30) as response:
+            response.read()
+        return True
+    except OSError as e:
+        print(f"[WARN] Query server {url} not refreshed: {e}")
+        return False
@@ -0,0 +1,290 @@
+import io
+import os
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+from fnmatch import fnmatch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from .instrumentation import count, span
+from .list_result import LIST_FIELDS, iter_file_records
+from .output_format import open_writer
+from .parallel_runner import summarize_files
+from .parser_result import RECORD_FIELDS, iter_result_records, iter_tag_records
+from .scanner import scan_files
+from .summary_cache import SummaryCache
+from .tag_totals import summary_tag_statistics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_REFRESH_SECONDS = 2.0
+# Merged outputs of the listener, their tests are already in the merged files.
+DEFAULT_EXCLUDE_FILES = ("merge.xml", "merge.xml.*")
+# Temporary folders of merges and filters, see merge_results and result_filter.
+WORK_DIRS = (".rrct_*",)
+# Queries served, like the commands of parser_result plus the file list.
+QUERIES = ("list", "tests", "match", "tags", "check")
+CONTENT_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+# One result file of the index: its signature when it was read, its summary
+# and its tag statistics, computed once instead of per query.
+IndexedFile = namedtuple("IndexedFile", ["path", "size", "mtime_ns", "summary", "tag_stats"])
+
+
+class WarmIndex:
+    """Summaries of every result file of a folder, kept in memory
+
+    A refresh scans the folder and only parses new or changed files (same
+    size and mtime means unchanged, like the summary cache), then replaces
+    the list of files in one assignment. Queries read that list without
+    locking, so any number of readers see a consistent snapshot while a
+    refresh runs.
+    """
+
+    def __init__(self, folder, pattern="*.xml", jobs=1, use_cache=False, exclude_dirs=(),
+                 exclude_files=DEFAULT_EXCLUDE_FILES):
+        """
+        Args:
+            folder (str): results folder, e.g. the listener's merge directory
+            pattern (str): result file name pattern, as for list_result.list_files
+            jobs (int): number of processes parsing changed files
+            use_cache (bool): also keep summaries in the folder's summary cache,
+                so a restarted server does not parse everything again
+            exclude_dirs (iterable): directory names/patterns or paths not to scan
+            exclude_files (iterable): file name patterns not to index, by default
+                the listener's merged output, which repeats the merged files
+        """
+        self.folder = folder
+        self.pattern = pattern
+        self.jobs = jobs
+        self.exclude_dirs = tuple(exclude_dirs) + WORK_DIRS
+        self.exclude_files = tuple(exclude_files)
+        self.files = []
+        self.generation = 0
+        self.refreshed_at = None
+        self._refresh_lock = threading.Lock()
+        self._cache = SummaryCache.for_folder(folder) if use_cache else None
+
+    def close(self):
+        if self._cache is not None:
+            self._cache.close()
+
+    def _summarize(self, paths):
+        if self._cache is not None:
+            return list(self._cache.summaries(paths, self.jobs))
+        return list(summarize_files(paths, self.jobs))
+
+    def refresh(self):
+        """Bring the index up to date with the folder
+
+        Returns:
+            int: number of files parsed, new or changed since the last refresh
+        """
+        with self._refresh_lock, span("index.refresh"):
+            entries = [entry for entry in scan_files(self.folder, self.pattern, exclude_dirs=self.exclude_dirs,
+                                                     archives=True)
+                       if not any(fnmatch(os.path.basename(entry.path), exclude) for exclude in self.exclude_files)]
+            known = {indexed.path: indexed for indexed in self.files}
+            changed = []
+            for entry in entries:
+                path = str(Path(entry.path))
+                indexed = known.get(path)
+                if indexed is None or indexed.size != entry.size or indexed.mtime_ns != entry.mtime_ns:
+                    changed.append(path)
+            summaries = dict(zip(changed, self._summarize(changed)))
+            files = []
+            for entry in entries:
+                path = str(Path(entry.path))
+                summary = summaries.get(path)
+                if summary is None:
+                    files.append(known[path])
+                else:
+                    files.append(IndexedFile(path, entry.size, entry.mtime_ns, summary,
+                                             summary_tag_statistics(summary)))
+            if changed or len(files) != len(self.files):
+                self.files = files
+                self.generation += 1
+            self.refreshed_at = time.time()
+        count("index.refreshed")
+        return len(changed)
+
+    def status(self):
+        files = self.files
+        return {"folder": str(self.folder), "files": len(files),
+                "tests": sum(len(indexed.summary.tests) for indexed in files),
+                "errors": sum(indexed.summary.error is not None for indexed in files),
+                "generation": self.generation, "refreshed_at": self.refreshed_at}
+
+    def records(self, query, tag_pattern=".*", tags_to_check=(), total_only=False):
+        """Records of a query, the same as the jsonl/csv output of the commands
+
+        Args:
+            query (str): one of QUERIES
+            tag_pattern (str): tag pattern or expression used by "match"
+            tags_to_check (list): tags used by "check"
+            total_only (bool): "tags" only returns the statistics over all files
+        Returns:
+            iterable[dict]
+        """
+        files = self.files  # one snapshot for the whole answer
+        output_files = [indexed.path for indexed in files]
+        if query == "list":
+            return iter_file_records(output_files, [indexed.summary for indexed in files])
+        if query == "tags":
+            return iter_tag_records(output_files, [indexed.tag_stats for indexed in files], total_only)
+        return iter_result_records(query, output_files, [indexed.summary for indexed in files],
+                                   tag_pattern, tags_to_check)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /<query>?format=jsonl|csv, GET /status and POST /refresh
+
+    Query parameters: `pattern` for match, `tags` (repeated or comma
+    separated) for check and `total=1` for tags.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = url.path.strip("/")
+        params = parse_qs(url.query)
+        index = self.server.index
+        if query == "status":
+            self._send_json(200, index.status())
+            return
+        output_format = params.get("format", ["jsonl"])[0]
+        if query not in QUERIES or output_format not in CONTENT_TYPES:
+            self._send_json(404 if query not in QUERIES else 400,
+                            {"error": f"unknown query or format: {url.path} {output_format}"})
+            return
+        tags = [tag for value in params.get("tags", []) for tag in value.split(",") if tag]
+        with span("query"):
+            body = io.StringIO()
+            try:
+                # Records are built lazily, a bad pattern only fails while writing them.
+                with open_writer(output_format, LIST_FIELDS if query == "list" else RECORD_FIELDS[query],
+                                 body) as writer:
+                    writer.write_all(index.records(query, params.get("pattern", [".*"])[0], tags,
+                                                   params.get("total", ["0"])[0] not in ("0", "")))
+            except (re.error, ValueError) as e:
+                self._send_json(400, {"error": f"invalid query: {e}"})
+                return
+        count("queries.served")
+        self._send(200, CONTENT_TYPES[output_format], body.getvalue())
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip("/") != "refresh":
+            self._send_json(404, {"error": f"unknown action: {self.path}"})
+            return
+        parsed = self.server.index.refresh()
+        self._send_json(200, dict(self.server.index.status(), parsed=parsed))
+
+    def _send_json(self, code, data):
+        self._send(code, "application/json", json.dumps(data) + "\n")
+
+    def _send(self, code, content_type, text):
+        body = text.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """HTTP server answering queries from a WarmIndex, one thread per request"""
+
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of dashboard queries wait for SYN retries.
+    request_queue_size = 128
+
+    def __init__(self, index, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+        super().__init__((host, port), QueryHandler)
+        self.index = index
+        self.verbose = verbose
+
+
+def _refresh_periodically(index, interval, stopped):
+    while not stopped.wait(interval):
+        try:
+            index.refresh()
+        except Exception as e:
+            print(f"[ERROR] Refresh of {index.folder} failed: {e}")
+
+
+def serve(folder, host=DEFAULT_HOST, port=DEFAULT_PORT, refresh_seconds=DEFAULT_REFRESH_SECONDS, jobs=1,
+          use_cache=False, exclude_dirs=(), verbose=False, exclude_files=DEFAULT_EXCLUDE_FILES):
+    """Serve queries on a results folder until interrupted
+
+    The index is built once at start, then refreshed every `refresh_seconds`
+    and on POST /refresh (see query_client.notify_refresh), so runs ingested
+    by the listener are answered within one interval.
+
+    Args:
+        folder (str): results folder to index
+        host (str): address to listen on, local only by default
+        port (int): port to listen on, 0 for any free port
+        refresh_seconds (float): interval between two refreshes, 0 to only refresh on request
+        jobs (int): number of processes parsing changed files
+        use_cache (bool): keep summaries in the folder's summary cache too
+        exclude_dirs (iterable): directory names/patterns or paths not to scan
+        verbose (bool): log every request
+        exclude_files (iterable): file name patterns not to index, see WarmIndex
+    """
+    index = WarmIndex(folder, jobs=jobs, use_cache=use_cache, exclude_dirs=exclude_dirs,
+                      exclude_files=exclude_files)
+    stopped = threading.Event()
+    try:
+        index.refresh()
+        server = QueryServer(index, host, port, verbose)
+        if refresh_seconds:
+            threading.Thread(target=_refresh_periodically, args=(index, refresh_seconds, stopped),
+                             name="refresh", daemon=True).start()
+        status = index.status()
+        print(f"[START] Serving {status['files']} file(s), {status['tests']} test(s) of {folder} "
+              f"on http://{server.server_address[0]}:{server.server_address[1]}")
+        with server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                print("[STOP] Query server stopped")
+    finally:
+        stopped.set()
+        index.close()
+
+
+def main(argv=None):
+    """Command line entry point of the query server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve list/tests/match/tags/check queries on a results "
+                                                 "folder from an index kept in memory")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on, 0 for any free port")
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH_SECONDS,
+                        help="Seconds between two scans for new or changed files, 0 for POST /refresh only")
+    parser.add_argument("--jobs", type=int, default=1, help="Processes parsing new or changed files")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep summaries in the folder's summary cache too, for fast restarts")
+    parser.add_argument("--exclude-dir", action="append", default=[], help="Directory name/pattern not to scan")
+    parser.add_argument("--exclude-file", action="append",
+                        help="File name pattern not to index, can be repeated "
+                             f"(default: {', '.join(DEFAULT_EXCLUDE_FILES)}, the listener's merged output)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args(argv)
+    serve(args.folder, args.host, args.port, args.refresh, args.jobs, args.cache, args.exclude_dir, args.verbose,
+          DEFAULT_EXCLUDE_FILES if args.exclude_file is None else args.exclude_file)
+
+
+if __name__ == "__main__":
+    main()
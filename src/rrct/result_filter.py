@@ -0,0 +1,212 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from .archive import open_output, open_output_writer
+from .instrumentation import count, span
+from .parallel_runner import map_in_pool
+from .result_model import STATUSES
+from .stream_parser import iter_tests
+from .tag_query import TagQuery
+from .tree_merge import start_tag, to_xml
+
+
+class TestFilter:
+    """Tests kept by a filtered merge
+
+    The same selection as parser_result.find_matching_tests_with_tags: a
+    tag pattern or expression and/or a set of statuses. With `latest` only
+    the most recent run of every test (same suite and name, latest start
+    time) is kept across all merged files, e.g. the last retry of each test
+    over several shards or reruns.
+    """
+
+    def __init__(self, include=None, statuses=None, latest=False):
+        """
+        Args:
+            include (str | list): tag pattern or expression, e.g. "smoke AND NOT slow"
+            statuses (iterable): only keep tests with one of these statuses, e.g. ["FAIL"]
+            latest (bool): only keep the latest run of every test
+        """
+        self.query = TagQuery.coerce(include) if include else None
+        self.statuses = frozenset(status.upper() for status in statuses) if statuses else None
+        self.latest = latest
+
+    def selects(self, tags, status):
+        """Whether a test with these tags and status is kept, `latest` aside"""
+        if self.statuses is not None and status not in self.statuses:
+            return False
+        return self.query is None or self.query.matched_tags(tags) is not None
+
+
+def _test_keys(output_xml):
+    """Pool worker: (suite.name, start) of every test of a file, in document order"""
+    return [(f"{test.suite}.{test.name}", -1 if test.start is None else test.start)
+            for test in iter_tests(output_xml)]
+
+
+def latest_test_positions(xml_paths, jobs=1):
+    """Positions of the latest run of every test across files
+
+    Args:
+        xml_paths (list[str]): robot output files, later files win ties
+        jobs (int): number of worker processes reading the files
+    Returns:
+        list[set[int]]: per file, the document order positions of the tests to keep
+    """
+    latest = {}
+    for file_index, keys in enumerate(map_in_pool(_test_keys, xml_paths, jobs)):
+        for position, (key, start) in enumerate(keys):
+            best = latest.get(key)
+            if best is None or start >= best[0]:
+                latest[key] = (start, file_index, position)
+    positions = [set() for _ in xml_paths]
+    for _, file_index, position in latest.values():
+        positions[file_index].add(position)
+    return positions
+
+
+def prune_output(output_xml, pruned_path, test_filter, positions=None):
+    """Write a copy of an output file holding only the selected tests
+
+    The file is streamed: one test, keyword or status is held at a time and
+    the tests not selected are dropped with their whole keyword body before
+    anything is combined. Suites left without tests are dropped too, their
+    setup is only written once a test of theirs is kept. Statistics are not
+    copied, robot computes them again when the pruned files are merged.
+
+    Args:
+        output_xml (str): robot output file, also compressed or zipped (see archive.py)
+        pruned_path (str): where to write the pruned output.xml
+        test_filter (TestFilter): tests to keep
+        positions (set[int]): document order positions of the tests that may be
+            kept (see latest_test_positions), None for all
+    Returns:
+        tuple: (kept tests, tests read); nothing valid is written when no test is kept
+    """
+    kept = total = 0
+    elements = []
+    # Per open suite: pending start tag and items, None once written out.
+    suites = []
+    # Depth of the test/keyword/status being read as a whole, if any.
+    item_depth = None
+    with open_output(output_xml) as stream, open_output_writer(pruned_path, encoding="utf-8") as out:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            depth = len(elements)
+            if event == "start":
+                elements.append(elem)
+                if item_depth is not None:
+                    continue
+                if depth == 0:
+                    out.write('<?xml version="1.0" encoding="UTF-8"?>\n' + start_tag(elem) + "\n")
+                elif elem.tag == "suite" and elements[-2].tag in ("robot", "suite"):
+                    suites.append([start_tag(elem) + "\n"])
+                else:
+                    item_depth = depth
+                continue
+
+            elements.pop()
+            depth = len(elements)
+            if item_depth is not None and depth > item_depth:
+                continue
+            if depth == 0:
+                out.write("</robot>\n")
+            elif depth == item_depth:
+                item_depth = None
+                if depth == 1:
+                    # <errors> is kept, <statistics> describes the unpruned file.
+                    if elem.tag == "errors":
+                        out.write(to_xml(elem))
+                elif elem.tag == "test":
+                    position = total
+                    total += 1
+                    status = elem.find("status")
+                    tags = [tag.text or "" for tag in elem.findall("tag") + elem.findall("tags/tag")]
+                    if (positions is None or position in positions) and test_filter.selects(
+                            tags, status.get("status") if status is not None else None):
+                        kept += 1
+                        for index, pending in enumerate(suites):
+                            if pending is not None:
+                                out.writelines(pending)
+                                suites[index] = None
+                        out.write(to_xml(elem))
+                elif suites[-1] is None:
+                    out.write(to_xml(elem))
+                else:
+                    suites[-1].append(to_xml(elem))
+            elif elem.tag == "suite":
+                if suites.pop() is None:
+                    out.write("</suite>\n")
+
+            if elements:
+                elements[-1].remove(elem)
+            elem.clear()
+    return kept, total
+
+
+def _prune_task(task):
+    """Pool worker: prune one file"""
+    output_xml, pruned_path, test_filter, positions = task
+    return prune_output(output_xml, pruned_path, test_filter, positions)
+
+
+def prune_outputs(xml_paths, folder, test_filter, jobs=1):
+    """Prune every output file into `folder`, see prune_output
+
+    Args:
+        xml_paths (list[str]): robot output files, in merge order
+        folder (str): folder receiving the pruned copies
+        test_filter (TestFilter): tests to keep
+        jobs (int): number of worker processes
+    Returns:
+        list[str]: pruned files holding at least one test, in merge order
+    """
+    with span("merge.filter"):
+        positions = latest_test_positions(xml_paths, jobs) if test_filter.latest else [None] * len(xml_paths)
+        tasks = [(path, os.path.join(folder, f"{index}_output.xml"), test_filter, file_positions)
+                 for index, (path, file_positions) in enumerate(zip(xml_paths, positions))]
+        pruned = []
+        kept_tests = read_tests = 0
+        for (_, pruned_path, _, _), (kept, total) in zip(tasks, map_in_pool(_prune_task, tasks, jobs)):
+            kept_tests += kept
+            read_tests += total
+            if kept:
+                pruned.append(pruned_path)
+            else:
+                os.remove(pruned_path)
+    count("tests.pruned", read_tests - kept_tests)
+    print(f"✅ Filter kept {kept_tests} of {read_tests} test(s) from {len(pruned)} of {len(xml_paths)} file(s).")
+    return pruned
+
+
+@contextmanager
+def filtered_outputs(xml_paths, folder, test_filter=None, jobs=1):
+    """Pruned copies of the output files, removed again on exit
+
+    Without a filter the files are used as they are.
+
+    Yields:
+        list[str]: files to merge, empty when no test is selected
+    """
+    if test_filter is None:
+        yield xml_paths
+        return
+    with tempfile.TemporaryDirectory(prefix=".rrct_filter_", dir=folder) as filter_dir:
+        yield prune_outputs(xml_paths, filter_dir, test_filter, jobs)
+
+
+def add_filter_arguments(parser):
+    """Add the --include/--status/--latest options of a filtered merge"""
+    parser.add_argument("--include", help="Only merge tests matching this tag pattern or expression, "
+                                          "e.g. 'smoke AND NOT slow'")
+    parser.add_argument("--status", action="append", choices=STATUSES[:3],
+                        help="Only merge tests with this status, can be repeated")
+    parser.add_argument("--latest", action="store_true",
+                        help="Only merge the latest run of every test (same suite and name) across files")
+
+
+def test_filter_from_args(args):
+    """TestFilter of the options added by add_filter_arguments, None when none is given"""
+    if not (args.include or args.status or args.latest):
+        return None
+    return TestFilter(args.include, args.status, args.latest)
@@ -0,0 +1,294 @@
+import os
+import sqlite3
+from pathlib import Path
+from .stream_parser import FileSummary, TagStat, TestRecord
+from .tag_totals import TOTAL_NAME, FileTagStats
+from .archive import output_stat
+from .parallel_runner import summarize_files
+from .tag_query import TagQuery
+from .result_model import RESERVED_TAG_PREFIX, tag_key
+
+INDEX_FILE_NAME = ".rrct_index.sqlite"
+# Bumped when the schema changes, older indexes are rebuilt.
+INDEX_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, status TEXT);
+CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY, file_id INTEGER, suite TEXT, name TEXT, status TEXT,
+    start INTEGER, elapsed REAL, message TEXT);
+CREATE TABLE IF NOT EXISTS test_tags (test_id INTEGER, tag_id INTEGER, position INTEGER);
+CREATE INDEX IF NOT EXISTS tests_file ON tests (file_id);
+CREATE INDEX IF NOT EXISTS tests_status ON tests (status);
+CREATE INDEX IF NOT EXISTS test_tags_tag ON test_tags (tag_id, test_id);
+CREATE INDEX IF NOT EXISTS test_tags_test ON test_tags (test_id);
+"""
+
+
+class ResultIndex:
+    """SQLite index of every test record of a results folder
+
+    One row per test (file, suite, name, status, times, message) with tags
+    in a separate table, indexed by tag and status. Tag patterns are
+    evaluated once per distinct tag, then answered with indexed lookups.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.connection.executescript(
+                "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS tags; DROP TABLE IF EXISTS tests;"
+                f" DROP TABLE IF EXISTS test_tags; PRAGMA user_version = {INDEX_VERSION};")
+        self.connection.executescript(SCHEMA)
+        self._tag_ids = dict(self.connection.execute("SELECT name, id FROM tags"))
+
+    @classmethod
+    def for_folder(cls, folder_path):
+        """Open the index stored in the given results folder"""
+        return cls(Path(folder_path) / INDEX_FILE_NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def _tag_id(self, name):
+        tag_id = self._tag_ids.get(name)
+        if tag_id is None:
+            tag_id = self.connection.execute("INSERT INTO tags (name) VALUES (?)", (name,)).lastrowid
+            self._tag_ids[name] = tag_id
+        return tag_id
+
+    def _remove_file(self, file_id):
+        self.connection.execute(
+            "DELETE FROM test_tags WHERE test_id IN (SELECT id FROM tests WHERE file_id = ?)", (file_id,))
+        self.connection.execute("DELETE FROM tests WHERE file_id = ?", (file_id,))
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _add_summary(self, summary, stat):
+        file_id = self.connection.execute(
+            "INSERT INTO files (path, size, mtime_ns, status) VALUES (?, ?, ?, ?)",
+            (summary.path, stat.st_size, stat.st_mtime_ns, summary.status)).lastrowid
+        for test in summary.tests:
+            test_id = self.connection.execute(
+                "INSERT INTO tests (file_id, suite, name, status, start, elapsed, message)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_id, test.suite, test.name, test.status, test.start, test.elapsed, test.message)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO test_tags VALUES (?, ?, ?)",
+                [(test_id, self._tag_id(tag), position) for position, tag in enumerate(test.tags)])
+
+    def update(self, output_files, jobs=1):
+        """Bring the index in line with the given files
+
+        New and changed files are parsed (in `jobs` processes) and indexed,
+        unchanged ones are kept and files not in the list are dropped.
+
+        Args:
+            output_files (list): robot output.xml files
+            jobs (int): number of worker processes used to parse files
+        Returns:
+            dict: error message of each file that failed to parse, by absolute path
+        """
+        indexed = {path: (file_id, size, mtime_ns) for file_id, path, size, mtime_ns
+                   in self.connection.execute("SELECT id, path, size, mtime_ns FROM files")}
+        stats = {}
+        changed = []
+        for file in output_files:
+            path = os.path.abspath(file)
+            stats[path] = output_stat(path)
+            entry = indexed.pop(path, None)
+            if entry and entry[1:] == (stats[path].st_size, stats[path].st_mtime_ns):
+                continue
+            if entry:
+                self._remove_file(entry[0])
+            changed.append(path)
+        for file_id, _, _ in indexed.values():
+            self._remove_file(file_id)
+
+        errors = {}
+        for summary in summarize_files(changed, jobs):
+            if summary.error is not None:
+                errors[summary.path] = summary.error
+            else:
+                self._add_summary(summary, stats[summary.path])
+        self.connection.commit()
+        return errors
+
+    def _file_id(self, output_file):
+        row = self.connection.execute(
+            "SELECT id FROM files WHERE path = ?", (os.path.abspath(output_file),)).fetchone()
+        return row[0] if row else None
+
+    def matching_tag_ids(self, tag_query):
+        """Ids of the distinct tags matching a positive operand of a tag query"""
+        tag_query = TagQuery.coerce(tag_query)
+        return [tag_id for name, tag_id in self._tag_ids.items() if tag_query.tag_mask(name) & tag_query.positive_mask]
+
+    def find_tests(self, tag_pattern=None, status=None, output_file=None):
+        """Tests matching a tag pattern and/or status
+
+        Args:
+            tag_pattern (str | re.Pattern | TagQuery): tag pattern or AND/OR/NOT expression
+            status (str): PASS, FAIL, SKIP or NOT RUN
+            output_file (str): only tests of this file
+        Returns:
+            list[tuple]: (file path, test name, matched tags) in file and test order
+        """
+        conditions = []
+        params = []
+        if output_file is not None:
+            conditions.append("tests.file_id = ?")
+            params.append(self._file_id(output_file))
+        if status is not None:
+            conditions.append("tests.status = ?")
+            params.append(status)
+        where = "".join(f" AND {condition}" for condition in conditions)
+        if tag_pattern is None:
+            rows = self.connection.execute(
+                "SELECT files.path, tests.name, tests.id FROM tests JOIN files ON files.id = tests.file_id"
+                f" WHERE 1 = 1{where} ORDER BY tests.id", params)
+            return [(path, name, self._test_tags(test_id)) for path, name, test_id in rows]
+
+        tag_query = TagQuery.coerce(tag_pattern)
+        candidates = ""
+        if tag_query.needs_positive_tag:
+            # Only tests with a tag matching a positive operand can be selected.
+            tag_ids = self.matching_tag_ids(tag_query)
+            if not tag_ids:
+                return []
+            candidates = f" AND tests.id IN (SELECT test_id FROM test_tags WHERE tag_id IN ({','.join('?' * len(tag_ids))}))"
+            params = tag_ids + params
+        rows = self.connection.execute(
+            "SELECT files.path, tests.name, tests.id, tags.name FROM tests JOIN files ON files.id = tests.file_id"
+            " LEFT JOIN test_tags ON test_tags.test_id = tests.id LEFT JOIN tags ON tags.id = test_tags.tag_id"
+            f" WHERE 1 = 1{candidates}{where} ORDER BY tests.id, test_tags.position", params)
+        tests = []
+        last_test_id = None
+        for path, name, test_id, tag in rows:
+            if test_id != last_test_id:
+                tests.append((path, name, []))
+                last_test_id = test_id
+            if tag is not None:
+                tests[-1][2].append(tag)
+        matches = []
+        for path, name, tags in tests:
+            matched_tags = tag_query.matched_tags(tags)
+            if matched_tags is not None:
+                matches.append((path, name, matched_tags))
+        return matches
+
+    def _test_tags(self, test_id):
+        return [name for name, in self.connection.execute(
+            "SELECT tags.name FROM test_tags JOIN tags ON tags.id = test_tags.tag_id"
+            " WHERE test_tags.test_id = ? ORDER BY test_tags.position", (test_id,))]
+
+    def _tag_statistics(self, file_id=None):
+        """Passed/failed/skipped counts per tag of every file, or of one file
+
+        Counted by SQLite in one GROUP BY query, then tags are grouped like
+        robot does (see stream_parser.count_statuses): the counts of every
+        spelling are added up under the first one used in the file.
+
+        Returns:
+            dict: list[stream_parser.TagStat] sorted by tag_key, by file id
+        """
+        where = ""
+        params = []
+        if file_id is not None:
+            where = "WHERE tests.file_id = ?"
+            params.append(file_id)
+        rows = self.connection.execute(
+            "SELECT tests.file_id, tags.name, MIN(tests.id),"
+            " SUM(tests.status = 'PASS'), SUM(tests.status = 'FAIL'), SUM(tests.status = 'SKIP')"
+            " FROM test_tags JOIN tests ON tests.id = test_tags.test_id JOIN tags ON tags.id = test_tags.tag_id"
+            f" {where} GROUP BY tests.file_id, tags.id ORDER BY 1, 3", params)
+        counts = {}
+        for row_file_id, name, _, passed, failed, skipped in rows:
+            key = tag_key(name)
+            if key.startswith(RESERVED_TAG_PREFIX):
+                continue
+            file_counts = counts.setdefault(row_file_id, {})
+            stat = file_counts.get(key)
+            if stat is None:
+                stat = file_counts[key] = [name, 0, 0, 0]
+            stat[1] += passed
+            stat[2] += failed
+            stat[3] += skipped
+        return {row_file_id: [TagStat(*file_counts[key]) for key in sorted(file_counts)]
+                for row_file_id, file_counts in counts.items()}
+
+    def file_tag_statistics(self, output_files):
+        """Tag statistics and totals of indexed files, without reading any test
+
+        Args:
+            output_files (list): robot output.xml files, updated in the index first
+        Yields:
+            tag_totals.FileTagStats for each file, in order
+        """
+        file_ids = dict(self.connection.execute("SELECT path, id FROM files"))
+        tag_stats = self._tag_statistics()
+        totals = {file_id: TagStat(TOTAL_NAME, passed, failed, skipped)
+                  for file_id, passed, failed, skipped in self.connection.execute(
+                      "SELECT file_id, SUM(status = 'PASS'), SUM(status = 'FAIL'), SUM(status = 'SKIP')"
+                      " FROM tests GROUP BY file_id")}
+        for file in output_files:
+            path = os.path.abspath(file)
+            file_id = file_ids.get(path)
+            if file_id is None:
+                yield FileTagStats(path, [], None, "File is not in the index")
+            else:
+                yield FileTagStats(path, tag_stats.get(file_id, []),
+                                   totals.get(file_id, TagStat(TOTAL_NAME, 0, 0, 0)), None)
+
+    def summary(self, output_file):
+        """Rebuild the stream_parser.FileSummary of an indexed file"""
+        path = os.path.abspath(output_file)
+        row = self.connection.execute("SELECT id, status FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return FileSummary(path, None, [], [], "File is not in the index")
+        file_id, status = row
+        tags = {}
+        for test_id, name in self.connection.execute(
+                "SELECT test_tags.test_id, tags.name FROM test_tags JOIN tags ON tags.id = test_tags.tag_id"
+                " WHERE test_tags.test_id IN (SELECT id FROM tests WHERE file_id = ?)"
+                " ORDER BY test_tags.test_id, test_tags.position", (file_id,)):
+            tags.setdefault(test_id, []).append(name)
+        tests = [TestRecord(name, suite, tags.get(test_id, ()), test_status, start, elapsed, message)
+                 for test_id, suite, name, test_status, start, elapsed, message
+                 in self.connection.execute(
+                     "SELECT id, suite, name, status, start, elapsed, message"
+                     " FROM tests WHERE file_id = ? ORDER BY id", (file_id,))]
+        return FileSummary(path, status, tests, self._tag_statistics(file_id).get(file_id, []), None)
+
+
+def main(argv=None):
+    """Command line entry point of the index command"""
+    import argparse
+    from .list_result import list_files
+
+    parser = argparse.ArgumentParser(description="Build and query the test index of a results folder")
+    parser.add_argument("--folder", required=True, help="Path to the folder containing robot results")
+    parser.add_argument("--pattern", help="Only tests with a tag matching this regex")
+    parser.add_argument("--status", help="Only tests with this status, e.g. FAIL")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes used to index files")
+
+    args = parser.parse_args(argv)
+
+    with ResultIndex.for_folder(args.folder) as index:
+        for path, error in index.update(list_files(args.folder) or [], args.jobs).items():
+            print(f"Something wrong with file {path}: {error}")
+        for path, name, tags in index.find_tests(args.pattern, args.status):
+            print(f"{path} | Test: {name} | Tag(s): {tags}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import sys
+from datetime import datetime, timedelta
+
+# Statuses are stored as small integers, STATUSES[code] is the name.
+STATUSES = ("PASS", "FAIL", "SKIP", "NOT RUN", "NOT SET")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+PASS, FAIL, SKIP = 0, 1, 2
+NO_STATUS = -1
+
+LEGACY_TIME_FORMAT = "%Y%m%d %H:%M:%S.%f"
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Reserved robot:* tags are left out of tag statistics, like robot does.
+RESERVED_TAG_PREFIX = "robot:"
+
+# One instance of every tag tuple seen: tests with the same tags share it.
+_shared_tags = {}
+_tag_keys = {}
+
+
+def status_code(status):
+    """Integer code of a status name (or code), NO_STATUS when unknown or None"""
+    if isinstance(status, int):
+        return status
+    return STATUS_CODES.get(status, NO_STATUS)
+
+
+def to_microseconds(moment):
+    """Microseconds since 1970-01-01 of a naive datetime"""
+    return (moment - EPOCH) // _MICROSECOND
+
+
+def from_microseconds(microseconds):
+    return EPOCH + timedelta(microseconds=microseconds)
+
+
+def format_legacy_time(moment):
+    """Format a datetime the same way robot.result does for `starttime`."""
+    return moment.strftime(LEGACY_TIME_FORMAT)[:-3]
+
+
+def parse_legacy_time(text):
+    """Microseconds since 1970 of a `20240101 12:00:00.123` time, None for N/A
+
+    Sliced by hand, strptime is about 30 times slower and runs per test.
+    """
+    if not text or text == "N/A":
+        return None
+    return to_microseconds(datetime(int(text[0:4]), int(text[4:6]), int(text[6:8]), int(text[9:11]),
+                                    int(text[12:14]), int(text[15:17]), int((text[18:24] + "000000")[:6])))
+
+
+def tag_key(tag):
+    """Name robot groups a tag by: case, spaces and underscores are ignored
+
+    Same as robot.utils.normalize(tag, ignore="_"), without importing robot.
+    """
+    key = _tag_keys.get(tag)
+    if key is None:
+        key = _tag_keys[tag] = "".join(tag.split()).casefold().replace("_", "")
+    return key
+
+
+def shared_tags(tags):
+    """Tags the way robot keeps them, as a tuple of interned strings
+
+    Like robot.model.Tags, duplicates (by tag_key), empty and NONE tags are
+    dropped and the rest sorted by tag_key. Tests with the same tags share
+    the same tuple, normalized once.
+    """
+    tags = tuple(tags)
+    shared = _shared_tags.get(tags)
+    if shared is None:
+        unique = {}
+        for tag in tags:
+            unique.setdefault(tag_key(tag), tag)
+        unique.pop("", None)
+        unique.pop("none", None)
+        shared = tuple(sys.intern(unique[key]) for key in sorted(unique))
+        _shared_tags[tags] = _shared_tags[shared] = shared
+    return shared
+
+
+class TestRecord:
+    """Compact result of one test
+
+    Attribute names follow robot.result so the printing and matching
+    helpers work with either object. Tags and suite names are shared
+    between tests, the status is an integer code and the start time an
+    integer, `status`, `starttime` and `endtime` are computed on access.
+    About half the memory of a namedtuple holding the same strings.
+    """
+
+    __slots__ = ("name", "suite", "tags", "status_code", "start", "elapsed", "message")
+
+    def __init__(self, name, suite, tags, status, start=None, elapsed=None, message=""):
+        """
+        Args:
+            name (str): test name
+            suite (str): longname of the parent suite
+            tags (iterable[str]): test tags
+            status (str | int): status name or code
+            start (int): start time in microseconds since 1970, see to_microseconds
+            elapsed (float): duration in seconds
+            message (str): status message
+        """
+        self.name = name
+        self.suite = sys.intern(suite)
+        self.tags = shared_tags(tags)
+        self.status_code = status_code(status)
+        self.start = start
+        self.elapsed = elapsed
+        self.message = message
+
+    @property
+    def status(self):
+        return STATUSES[self.status_code] if self.status_code != NO_STATUS else None
+
+    @property
+    def starttime(self):
+        if self.start is None:
+            return None
+        return format_legacy_time(from_microseconds(self.start))
+
+    @property
+    def endtime(self):
+        if self.start is None:
+            return None
+        return format_legacy_time(from_microseconds(self.start) + timedelta(seconds=self.elapsed or 0.0))
+
+    def fields(self):
+        """Constructor arguments, e.g. for JSON or pickling"""
+        return (self.name, self.suite, self.tags, self.status_code, self.start, self.elapsed, self.message)
+
+    def __reduce__(self):
+        return TestRecord, self.fields()
+
+    def __eq__(self, other):
+        return isinstance(other, TestRecord) and self.fields() == other.fields()
+
+    def __hash__(self):
+        return hash(self.fields())
+
+    def __repr__(self):
+        return (f"TestRecord(name={self.name!r}, suite={self.suite!r}, tags={list(self.tags)!r}, "
+                f"status={self.status!r}, starttime={self.starttime!r}, elapsed={self.elapsed!r})")
@@ -0,0 +1,105 @@
+import os
+from collections import namedtuple
+from fnmatch import fnmatch
+from .archive import is_zip, matches_output, split_member, zip_entries
+
+# A matching file with the stat info read while scanning.
+ScanEntry = namedtuple("ScanEntry", ["path", "size", "mtime_ns"])
+
+
+def _is_excluded(entry, exclude_dirs):
+    return any(fnmatch(entry.name, exclude) or os.path.abspath(entry.path) == os.path.abspath(exclude)
+               for exclude in exclude_dirs)
+
+
+def _walk(folder, pattern, max_depth, exclude_dirs, depth=0, archives=False):
+    """Matching files below `folder`, each directory before its subdirectories"""
+    found = []
+    stack = [(folder, depth)]
+    while stack:
+        current, current_depth = stack.pop()
+        subdirs = []
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if (max_depth is None or current_depth < max_depth) and not _is_excluded(entry, exclude_dirs):
+                        subdirs.append((entry.path, current_depth + 1))
+                elif fnmatch(entry.name, pattern) and entry.is_file():
+                    stat = entry.stat()
+                    found.append(ScanEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+                elif archives and matches_output(entry.name, pattern) and entry.is_file():
+                    stat = entry.stat()
+                    found.append(ScanEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+                elif archives and is_zip(entry.name) and entry.is_file():
+                    found.extend(zip_entries(entry.path, pattern, ScanEntry))
+            except OSError:
+                # Removed while scanning.
+                continue
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def scan_files(root, pattern="*", max_depth=None, exclude_dirs=(), jobs=1, archives=False):
+    """Find files matching a pattern below `root`, with their size and mtime
+
+    A single os.scandir pass per directory, stat info is read for matching
+    files only. Symlinked directories are not followed. The order is the
+    same as Path.rglob: the files of a directory, then its subdirectories.
+    Scan once per run and pass the entries to every function needing them.
+
+    Args:
+        root (str | Path): folder to scan
+        pattern (str): glob pattern matched against file names
+        max_depth (int): how deep to descend, 0 for `root` only, None for no limit
+        exclude_dirs (iterable): directory name patterns or paths not to descend into
+        jobs (int): walk the top level subdirectories in this many threads
+        archives (bool): also match compressed files (output.xml.gz for *.xml)
+            and the members of zip files, see archive.py
+    Returns:
+        list[ScanEntry]: matching files, paths joined onto `root`
+    """
+    root = os.fspath(root)
+    exclude_dirs = [os.fspath(exclude) for exclude in exclude_dirs]
+    if jobs <= 1 or max_depth == 0:
+        return _walk(root, pattern, max_depth, exclude_dirs, archives=archives)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    top_level = _walk(root, pattern, 0, exclude_dirs, archives=archives)
+    try:
+        subdirs = [entry.path for entry in os.scandir(root)
+                   if entry.is_dir(follow_symlinks=False) and not _is_excluded(entry, exclude_dirs)]
+    except OSError:
+        return top_level
+    # Directory listing is I/O bound (and slow on network shares), threads are enough.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for found in executor.map(lambda path: _walk(path, pattern, max_depth, exclude_dirs, 1, archives), subdirs):
+            top_level.extend(found)
+    return top_level
+
+
+def latest_entry(entries):
+    """Most recently modified entry, or None"""
+    return max(entries, key=lambda entry: entry.mtime_ns, default=None)
+
+
+def entries_by_folder(root, entries):
+    """Group entries by the direct subfolder of `root` they are in
+
+    A zip archive directly in `root` counts as the folder of its members.
+
+    Returns:
+        dict: subfolder path -> entries directly inside it, in scan order
+    """
+    root = os.path.normpath(root)
+    folders = {}
+    for entry in entries:
+        archive, member = split_member(entry.path)
+        folder = archive if member is not None else os.path.dirname(entry.path)
+        if os.path.normpath(os.path.dirname(folder)) == root:
+            folders.setdefault(folder, []).append(entry)
+    return folders
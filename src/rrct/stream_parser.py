@@ -0,0 +1,284 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+from .instrumentation import count, is_enabled, span
+from .archive import is_archived, open_output, output_stat
+from .result_model import (FAIL, PASS, RESERVED_TAG_PREFIX, SKIP, TestRecord, parse_legacy_time, tag_key,
+                          to_microseconds)
+
+# Lightweight records yielded while streaming an output.xml file, tests are
+# result_model.TestRecord objects.
+SuiteRecord = namedtuple("SuiteRecord", ["name", "longname", "status", "depth"])
+TagStat = namedtuple("TagStat", ["name", "passed", "failed", "skipped"])
+FileSummary = namedtuple("FileSummary", ["path", "status", "tests", "tag_stats", "error"])
+StatusProbe = namedtuple("StatusProbe", ["status", "passed", "failed", "skipped"])
+
+# <suite> also appears inside <statistics>, only these parents hold results.
+SUITE_PARENTS = (None, "robot", "suite")
+
+
+def _status_times(status):
+    """Return (start in microseconds since 1970, elapsed seconds) for a <status> element.
+
+    Handles both the RF 7 schema (`start` + `elapsed`) and the older one
+    (`starttime` + `endtime`).
+    """
+    start = status.get("start")
+    if start is not None:
+        return to_microseconds(datetime.fromisoformat(start)), float(status.get("elapsed", 0.0))
+    begin = parse_legacy_time(status.get("starttime"))
+    end = parse_legacy_time(status.get("endtime"))
+    if begin is None or end is None:
+        return None, None
+    # The old schema has millisecond times, like robot.result.
+    begin -= begin % 1000
+    end -= end % 1000
+    return begin, (end - begin) / 1e6
+
+
+def _is_result_suite(elements):
+    """Check that the <suite> just opened on `elements` is a result suite."""
+    parent = elements[-2].tag if len(elements) > 1 else None
+    return parent in SUITE_PARENTS
+
+
+def iter_records(output_xml):
+    """Stream suite and test records from a Robot output.xml file.
+
+    Only test names, tags and statuses are kept; keyword bodies, messages
+    and everything else are dropped as soon as their end tag is read, so
+    memory stays flat regardless of the file size.
+
+    Args:
+        output_xml (Path | str): robot output.xml file
+    Yields:
+        TestRecord for each test and SuiteRecord for each suite, in the
+        order their end tags appear (children before their parent suite)
+    """
+    # Compressed and zipped files are decompressed while they are parsed.
+    with open_output(output_xml) as stream:
+        yield from _iter_stream_records(stream)
+
+
+def _iter_stream_records(stream):
+    elements = []
+    suites = []
+    test = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            elements.append(elem)
+            if elem.tag == "suite" and _is_result_suite(elements):
+                suites.append([elem.get("name", ""), None])
+            elif elem.tag == "test" and suites:
+                test = {"name": elem.get("name", ""), "tags": [], "status": None}
+            continue
+
+        elements.pop()
+        parent = elements[-1].tag if elements else None
+        if elem.tag == "tag" and test is not None and (
+            parent == "test" or (parent == "tags" and elements[-2].tag == "test")
+        ):
+            test["tags"].append(elem.text or "")
+        elif elem.tag == "status" and parent == "test" and test is not None:
+            test["status"] = elem
+            elements[-1].remove(elem)
+            continue
+        elif elem.tag == "status" and parent == "suite":
+            suites[-1][1] = elem.get("status")
+        elif elem.tag == "test" and test is not None:
+            status = test["status"]
+            start = elapsed = None
+            if status is not None:
+                start, elapsed = _status_times(status)
+            yield TestRecord(
+                test["name"],
+                ".".join(name for name, _ in suites),
+                test["tags"],
+                status.get("status") if status is not None else None,
+                start,
+                elapsed,
+                (status.text or "") if status is not None else "",
+            )
+            test = None
+        elif elem.tag == "suite" and parent in SUITE_PARENTS:
+            longname = ".".join(name for name, _ in suites)
+            name, status = suites.pop()
+            yield SuiteRecord(name, longname, status, len(suites))
+
+        # Drop the element from its parent so nothing accumulates in memory.
+        if elements:
+            elements[-1].remove(elem)
+        elem.clear()
+
+
+def iter_tests(output_xml):
+    """Stream only the test records of a Robot output.xml file."""
+    for record in iter_records(output_xml):
+        if isinstance(record, TestRecord):
+            yield record
+
+
+def count_statuses(tests):
+    """Count passed/failed/skipped tests per tag and in total, in one pass.
+
+    Tags are grouped like robot does: by tag_key, named after the first
+    spelling seen, and reserved robot:* tags are left out.
+
+    Args:
+        tests (iterable[TestRecord]): tests to count, e.g. from iter_tests
+    Returns:
+        tuple: (list[TagStat] sorted by tag_key like result.statistics.tags,
+        (passed, failed, skipped) of all tests)
+    """
+    counts = {}
+    total = [0, 0, 0]
+    for test in tests:
+        code = test.status_code
+        column = 1 if code == PASS else 2 if code == FAIL else 3 if code == SKIP else None
+        if column is None:
+            continue
+        total[column - 1] += 1
+        for tag in test.tags:
+            key = tag_key(tag)
+            if key.startswith(RESERVED_TAG_PREFIX):
+                continue
+            stat = counts.get(key)
+            if stat is None:
+                stat = counts[key] = [tag, 0, 0, 0]
+            stat[column] += 1
+    return [TagStat(*counts[key]) for key in sorted(counts)], tuple(total)
+
+
+def tag_statistics(tests):
+    """Count passed/failed/skipped tests per tag, see count_statuses.
+
+    Returns:
+        list[TagStat]: statistics sorted by tag_key, like result.statistics.tags
+    """
+    return count_statuses(tests)[0]
+
+
+def summarize(output_xml):
+    """Build a compact, picklable summary of one output.xml file.
+
+    Errors are captured in the summary instead of raised, so a broken file
+    does not abort a whole batch running in a process pool.
+
+    Args:
+        output_xml (Path | str): robot output.xml file
+    Returns:
+        FileSummary: root suite status, test records and tag statistics
+    """
+    tests = []
+    status = None
+    try:
+        with span("parse"):
+            for record in iter_records(output_xml):
+                if isinstance(record, TestRecord):
+                    tests.append(record)
+                elif record.depth == 0:
+                    status = record.status
+    except Exception as e:
+        return FileSummary(str(output_xml), None, [], [], str(e))
+    return FileSummary(str(output_xml), status, tests, tag_statistics(tests), None)
+
+
+def count_summary(summary):
+    """Add a summarized file to the files/tests/bytes counters
+
+    Called by whoever receives the summary, so files parsed in worker
+    processes are counted in the parent too.
+    """
+    if is_enabled() and summary.error is None:
+        count("files.parsed")
+        count("tests.processed", len(summary.tests))
+        count("bytes.read", output_stat(summary.path).st_size)
+
+
+_STATUS_ATTR = re.compile(rb'\sstatus="([A-Z]+)"')
+TAIL_CHUNK_SIZE = 64 * 1024
+MAX_TAIL_SIZE = 16 * 1024 * 1024
+
+
+def _total_stat(statistics):
+    """Return (passed, failed, skipped) of the 'All Tests' total statistic."""
+    stats = statistics.findall("total/stat")
+    if not stats:
+        return None, None, None
+    stat = next((stat for stat in stats if stat.text == "All Tests"), stats[-1])
+    return int(stat.get("pass", 0)), int(stat.get("fail", 0)), int(stat.get("skip", 0))
+
+
+def _probe_tail(output_xml):
+    """Read the root suite status and totals from the end of the file.
+
+    Robot writes the root suite's <status> as its last child, followed by
+    <statistics> and <errors>, so only the tail of the file is needed. The
+    window grows until both are found; None is returned if they are not.
+    """
+    size = os.path.getsize(output_xml)
+    window = TAIL_CHUNK_SIZE
+    with open(output_xml, "rb") as f:
+        while True:
+            window = min(window, size)
+            f.seek(size - window)
+            tail = f.read(window)
+            count("bytes.read", len(tail))
+            stats_start = tail.rfind(b"<statistics>")
+            stats_end = tail.find(b"</statistics>", stats_start)
+            suite_end = tail.rfind(b"</suite>", 0, stats_start)
+            status_start = tail.rfind(b"<status ", 0, suite_end)
+            if stats_start != -1 and stats_end != -1 and status_start != -1:
+                break
+            if window >= size or window >= MAX_TAIL_SIZE:
+                return None
+            window *= 4
+    match = _STATUS_ATTR.search(tail, status_start, tail.find(b">", status_start))
+    statistics = ET.fromstring(tail[stats_start:stats_end + len(b"</statistics>")])
+    return StatusProbe(match.group(1).decode() if match else None, *_total_stat(statistics))
+
+
+def _probe_stream(output_xml):
+    """Streaming fallback of _probe_tail, holding one element at a time."""
+    if is_enabled():
+        count("bytes.read", output_stat(output_xml).st_size)
+    with open_output(output_xml) as stream:
+        elements = []
+        status = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                elements.append(elem)
+                continue
+            elements.pop()
+            if elem.tag == "status" and len(elements) == 2 and elements[-1].tag == "suite":
+                status = elem.get("status")
+            elif elem.tag == "statistics":
+                return StatusProbe(status, *_total_stat(elem))
+            if elements and elements[-1].tag in ("statistics", "total"):
+                continue
+            if elements:
+                elements[-1].remove(elem)
+            elem.clear()
+        return StatusProbe(status, None, None, None)
+
+
+def probe_status(output_xml, from_end=True):
+    """Read the root suite status and total statistics of an output.xml.
+
+    Args:
+        output_xml (Path | str): robot output.xml file
+        from_end (bool): first look for the trailing status block by seeking
+            backwards from the end of the file, stream the file if not found.
+            Compressed and zipped files are always streamed.
+    Returns:
+        StatusProbe: root suite status and passed/failed/skipped totals
+    """
+    count("files.probed")
+    with span("probe"):
+        if from_end and not is_archived(output_xml):
+            probe = _probe_tail(output_xml)
+            if probe is not None:
+                return probe
+        return _probe_stream(output_xml)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from .archive import open_output, output_exists, output_stat
+from .instrumentation import count
+from .stream_parser import FileSummary, TagStat, TestRecord, count_summary, probe_status, summarize
+from .parallel_runner import summarize_files
+
+CACHE_FILE_NAME = ".rrct_cache.sqlite"
+# Bumped when the stored summary layout changes, older caches are dropped.
+CACHE_VERSION = 3
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the blake2b digest of a file's (decompressed) content"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open_output(path) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(summary):
+    return json.dumps([summary.status, [test.fields() for test in summary.tests], summary.tag_stats],
+                      separators=(",", ":"))
+
+
+def _decode(path, data):
+    status, tests, tag_stats = json.loads(data)
+    return FileSummary(
+        path,
+        status,
+        [TestRecord(*test) for test in tests],
+        [TagStat(*stat) for stat in tag_stats],
+        None,
+    )
+
+
+class SummaryCache:
+    """On-disk cache of stream_parser.FileSummary objects
+
+    Entries are keyed by absolute path, size and mtime. With `use_hash` a
+    content hash is stored as well, so a file whose mtime changed but whose
+    content did not (e.g. copied again) is still served from the cache.
+    Summaries of files that failed to parse are never cached.
+    status() caches the probed root status of files whose tests are not
+    needed, apart from the summaries.
+    summary() and status() may be called from several threads, files are
+    parsed outside of the connection lock.
+    """
+
+    def __init__(self, db_path, use_hash=False):
+        self.db_path = str(db_path)
+        self.use_hash = use_hash
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS summaries")
+            self.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS statuses (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, status TEXT)"
+        )
+
+    @classmethod
+    def for_folder(cls, folder_path, use_hash=False):
+        """Open the cache stored in the given results folder"""
+        return cls(Path(folder_path) / CACHE_FILE_NAME, use_hash)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def _lookup(self, path, row, stat):
+        """Return the cached summary for `path` if `row` is still valid"""
+        if row is None:
+            return None
+        size, mtime_ns, digest, data = row
+        if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+            return _decode(path, data)
+        if self.use_hash and digest and size == stat.st_size and digest == file_digest(path):
+            self.connection.execute(
+                "UPDATE summaries SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, path)
+            )
+            return _decode(path, data)
+        return None
+
+    def _store(self, summary, stat):
+        if summary.error is not None:
+            return
+        digest = file_digest(summary.path) if self.use_hash else None
+        self.connection.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+            (summary.path, stat.st_size, stat.st_mtime_ns, digest, _encode(summary)),
+        )
+
+    def summary(self, output_xml):
+        """Return the summary of one file, parsing it only if needed"""
+        path = os.path.abspath(output_xml)
+        stat = output_stat(path)
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, digest, data FROM summaries WHERE path = ?", (path,)
+            ).fetchone()
+            summary = self._lookup(path, row, stat)
+        if summary is None:
+            summary = summarize(path)
+            count_summary(summary)
+            with self._lock:
+                self._store(summary, stat)
+                self.connection.commit()
+        return summary
+
+    def status(self, output_xml):
+        """Return the root suite status of one file, probing it only if needed
+
+        A valid cached summary answers it, otherwise only the status is read
+        (see stream_parser.probe_status) and cached, not a whole summary.
+        """
+        path = os.path.abspath(output_xml)
+        stat = output_stat(path)
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, digest, data FROM summaries WHERE path = ?", (path,)
+            ).fetchone()
+            summary = self._lookup(path, row, stat)
+            if summary is not None:
+                return summary.status
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, status FROM statuses WHERE path = ?", (path,)
+            ).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            count("cache.hits")
+            return row[2]
+        status = probe_status(path).status
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, status),
+            )
+            self.connection.commit()
+        return status
+
+    def summaries(self, output_files, jobs=1):
+        """Summaries of many files, in order, parsing only new or changed ones
+
+        Args:
+            output_files (list): robot output.xml files
+            jobs (int): number of worker processes used for the files to parse
+        Yields:
+            stream_parser.FileSummary for each file, in the given order
+        """
+        paths = [os.path.abspath(file) for file in output_files]
+        rows = {
+            row[0]: row[1:]
+            for row in self.connection.execute("SELECT path, size, mtime_ns, digest, data FROM summaries")
+        }
+        results = {}
+        stats = {}
+        for path in paths:
+            stats[path] = output_stat(path)
+            summary = self._lookup(path, rows.get(path), stats[path])
+            if summary is not None:
+                results[path] = summary
+        count("cache.hits", len(results))
+        missing = [path for path in paths if path not in results]
+        for summary in summarize_files(missing, jobs):
+            self._store(summary, stats[summary.path])
+            results[summary.path] = summary
+        self.evict_missing(set(rows) - set(paths))
+        self.connection.commit()
+        for path in paths:
+            yield results[path]
+
+    def evict_missing(self, candidates=None):
+        """Drop entries of files that no longer exist
+
+        Args:
+            candidates (iterable): cached paths to check, default all of them
+        """
+        if candidates is None:
+            candidates = [row[0] for row in self.connection.execute(
+                "SELECT path FROM summaries UNION SELECT path FROM statuses")]
+        gone = [(path,) for path in candidates if not output_exists(path)]
+        self.connection.executemany("DELETE FROM summaries WHERE path = ?", gone)
+        self.connection.executemany("DELETE FROM statuses WHERE path = ?", gone)
@@ -0,0 +1,182 @@
+import os
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape, quoteattr
+
+# Shape of a generated output.xml. Leaf suites (at suite_depth) hold the
+# tests, every other suite holds suites_per_suite child suites.
+OutputShape = namedtuple("OutputShape", [
+    "suite_depth", "suites_per_suite", "tests_per_suite", "tags_per_test", "distinct_tags",
+    "keywords_per_test", "keyword_depth", "messages_per_keyword", "message_size", "fail_ratio",
+])
+DEFAULT_SHAPE = OutputShape(suite_depth=2, suites_per_suite=4, tests_per_suite=25, tags_per_test=3,
+                            distinct_tags=50, keywords_per_test=3, keyword_depth=2, messages_per_keyword=1,
+                            message_size=80, fail_ratio=0.05)
+START_TIME = datetime(2025, 1, 1)
+
+
+def test_count(shape):
+    """Number of tests in one file of the given shape"""
+    return shape.suites_per_suite ** shape.suite_depth * shape.tests_per_suite
+
+
+class _Writer:
+    def __init__(self, out, shape, seed):
+        self.out = out
+        self.shape = shape
+        self.random = random.Random(seed)
+        self.clock = START_TIME
+        self.tag_stats = {}
+        self.suite_stats = []
+        self.message = ("lorem ipsum dolor sit amet " * (shape.message_size // 27 + 1))[:shape.message_size]
+
+    def _tick(self):
+        start = self.clock
+        elapsed = self.random.uniform(0.001, 0.05)
+        self.clock += timedelta(seconds=elapsed)
+        return start.isoformat(), elapsed
+
+    def _status(self, status, start, elapsed, message=""):
+        text = f">{escape(message)}</status>" if message else "/>"
+        self.out.write(f'<status status="{status}" start="{start}" elapsed="{elapsed:.6f}"{text}\n')
+
+    def keyword(self, depth, index, failed):
+        self.out.write(f'<kw name="Keyword {depth}-{index}" owner="SyntheticLibrary">\n<arg>{index}</arg>\n')
+        start, elapsed = self._tick()
+        for child in range(self.shape.keywords_per_test if depth < self.shape.keyword_depth else 0):
+            elapsed += self.keyword(depth + 1, child, failed)
+        for _ in range(self.shape.messages_per_keyword):
+            self.out.write(f'<msg time="{start}" level="INFO">{self.message}</msg>\n')
+        self._status("FAIL" if failed else "PASS", start, elapsed)
+        self.out.write("</kw>\n")
+        return elapsed
+
+    def test(self, suite_id, index):
+        failed = self.random.random() < self.shape.fail_ratio
+        self.out.write(f'<test id="{suite_id}-t{index + 1}" name="Test {index + 1}" line="{index + 1}">\n')
+        start = self.clock.isoformat()
+        elapsed = 0.0
+        for keyword in range(self.shape.keywords_per_test):
+            elapsed += self.keyword(1, keyword, failed and keyword == self.shape.keywords_per_test - 1)
+        tags = sorted(self.random.sample(range(self.shape.distinct_tags),
+                                         min(self.shape.tags_per_test, self.shape.distinct_tags)))
+        for tag in tags:
+            self.out.write(f"<tag>tag-{tag}</tag>\n")
+            counts = self.tag_stats.setdefault(f"tag-{tag}", [0, 0, 0])
+            counts[1 if failed else 0] += 1
+        self._status("FAIL" if failed else "PASS", start, elapsed, "Synthetic failure" if failed else "")
+        self.out.write("</test>\n")
+        return failed, elapsed
+
+    def suite(self, suite_id, name, longname, depth):
+        """Write a suite, returns (passed, failed, elapsed)"""
+        self.out.write(f'<suite id="{suite_id}" name={quoteattr(name)} source="/synthetic/{suite_id}.robot">\n')
+        start = self.clock.isoformat()
+        passed = failed = 0
+        elapsed = 0.0
+        stat_index = len(self.suite_stats)
+        self.suite_stats.append(None)
+        if depth < self.shape.suite_depth:
+            for index in range(self.shape.suites_per_suite):
+                child_name = f"Suite {depth + 1}-{index + 1}"
+                child_passed, child_failed, child_elapsed = self.suite(
+                    f"{suite_id}-s{index + 1}", child_name, f"{longname}.{child_name}", depth + 1)
+                passed += child_passed
+                failed += child_failed
+                elapsed += child_elapsed
+        else:
+            for index in range(self.shape.tests_per_suite):
+                test_failed, test_elapsed = self.test(suite_id, index)
+                failed += test_failed
+                passed += not test_failed
+                elapsed += test_elapsed
+        self._status("FAIL" if failed else "PASS", start, elapsed)
+        self.out.write("</suite>\n")
+        self.suite_stats[stat_index] = (suite_id, name, longname, passed, failed)
+        return passed, failed, elapsed
+
+    def statistics(self, passed, failed):
+        self.out.write("<statistics>\n<total>\n")
+        self.out.write(f'<stat pass="{passed}" fail="{failed}" skip="0">All Tests</stat>\n</total>\n<tag>\n')
+        for tag in sorted(self.tag_stats):
+            tag_passed, tag_failed, tag_skipped = self.tag_stats[tag]
+            self.out.write(f'<stat pass="{tag_passed}" fail="{tag_failed}" skip="{tag_skipped}">{tag}</stat>\n')
+        self.out.write("</tag>\n<suite>\n")
+        for suite_id, name, longname, suite_passed, suite_failed in self.suite_stats:
+            self.out.write(f'<stat name={quoteattr(name)} id="{suite_id}" pass="{suite_passed}" '
+                           f'fail="{suite_failed}" skip="0">{escape(longname)}</stat>\n')
+        self.out.write("</suite>\n</statistics>\n<errors>\n</errors>\n")
+
+
+def write_output_xml(path, shape=DEFAULT_SHAPE, seed=0, name="Synthetic"):
+    """Write a synthetic Robot Framework (schema 5) output.xml
+
+    Content is deterministic for a given shape and seed. The file is written
+    while it is generated, so any size can be produced in constant memory.
+
+    Args:
+        path (str): file to write
+        shape (OutputShape): size and nesting of suites, tests and keywords
+        seed (int): seed of the failures and tags drawn
+        name (str): name of the root suite
+    Returns:
+        int: number of tests written
+    """
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<robot generator="Robot 7.0 (synthetic)" generated="{START_TIME.isoformat()}" '
+                  'rpa="false" schemaversion="5">\n')
+        writer = _Writer(out, shape, seed)
+        passed, failed, _ = writer.suite("s1", name, name, 0)
+        writer.statistics(passed, failed)
+        out.write("</robot>\n")
+    return passed + failed
+
+
+def generate_results_folder(folder, files=10, shape=DEFAULT_SHAPE, seed=0):
+    """Write `files` result folders (run1/output.xml, ...) under `folder`
+
+    Returns:
+        list[str]: the output files written
+    """
+    paths = []
+    for index in range(files):
+        run_folder = os.path.join(folder, f"run{index + 1}")
+        os.makedirs(run_folder, exist_ok=True)
+        path = os.path.join(run_folder, "output.xml")
+        write_output_xml(path, shape, seed + index, name=f"Run {index + 1}")
+        paths.append(path)
+    return paths
+
+
+def add_shape_arguments(parser):
+    """Add one option per OutputShape field to an argparse parser"""
+    for field, default in DEFAULT_SHAPE._asdict().items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default,
+                            help=f"default {default}")
+
+
+def shape_from_args(args):
+    return OutputShape(**{field: getattr(args, field) for field in OutputShape._fields})
+
+
+def main(argv=None):
+    """Command line entry point of the generate command"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic Robot Framework output.xml files")
+    parser.add_argument("--folder", required=True, help="Folder receiving run1/output.xml, run2/output.xml, ...")
+    parser.add_argument("--files", type=int, default=10, help="Number of output files")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the failures and tags drawn")
+    add_shape_arguments(parser)
+
+    args = parser.parse_args(argv)
+    shape = shape_from_args(args)
+    paths = generate_results_folder(args.folder, args.files, shape, args.seed)
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"Wrote {len(paths)} file(s), {test_count(shape)} tests each, {size / 1e6:.1f} MB in {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import re
+import sys
+
+# Robot style operators, e.g. "smoke AND ui NOT slow". They need spaces
+# around them so regexes like "NOTE.*" are not split.
+_OR = re.compile(r"(?:^|\s+)OR(?:\s+|$)")
+_AND = re.compile(r"(?:^|\s+)AND(?:\s+|$)")
+_NOT = re.compile(r"(?:^|\s+)NOT(?:\s+|$)")
+
+
+class TagQuery:
+    """Tag pattern or boolean tag expression, evaluated once per distinct tag
+
+    Each operand is a regex matched case insensitively from the start of a
+    tag, as before. Operands can be combined with Robot's operators, split
+    in Robot's order: NOT binds loosest, then OR, then AND. `a OR b NOT c
+    AND d` means (a or b) and not (c and d), `a NOT b NOT c` means a and
+    neither b nor c, and a leading NOT means "no tag matches". Empty
+    operands are ignored, so `a AND NOT b` reads as `a NOT b`. Several
+    patterns given as a list are OR-ed.
+
+    Every distinct tag is matched against all operands the first time it is
+    seen and the result (a bitmask of operands) is kept, so the cost of
+    matching scales with distinct tags, not with tag occurrences.
+    """
+
+    def __init__(self, patterns):
+        if isinstance(patterns, (str, re.Pattern)):
+            patterns = [patterns]
+        self.operands = []
+        # Expression in disjunctive form: list of (required, excluded) where
+        # required is a bitmask of operands that must all match and excluded
+        # the bitmasks of AND-ed operands that must not all match.
+        self.clauses = []
+        for pattern in patterns:
+            if isinstance(pattern, re.Pattern):
+                self.clauses.append((self._operand(pattern), ()))
+                continue
+            positive, *negatives = _NOT.split(pattern.strip())
+            excluded = tuple(mask for negative in negatives for mask in self._alternatives(negative))
+            for required in self._alternatives(positive) if positive else [0]:
+                self.clauses.append((required, excluded))
+        self.positive_mask = 0
+        for required, _ in self.clauses:
+            self.positive_mask |= required
+        # Only then a test without any tag matching a positive operand can be selected.
+        self.needs_positive_tag = all(required for required, _ in self.clauses)
+        self._masks = {}
+
+    def _alternatives(self, expression):
+        """Bitmask of the AND-ed operands of every OR-ed alternative"""
+        alternatives = []
+        for alternative in _OR.split(expression):
+            required = 0
+            for term in _AND.split(alternative):
+                if term:
+                    required |= self._operand(term)
+            if required:
+                alternatives.append(required)
+        return alternatives
+
+    @classmethod
+    def coerce(cls, query):
+        """Return `query` if it already is a TagQuery, else build one from it"""
+        return query if isinstance(query, cls) else cls(query)
+
+    def _operand(self, pattern):
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern, re.IGNORECASE)
+        self.operands.append(pattern)
+        return 1 << (len(self.operands) - 1)
+
+    def tag_mask(self, tag):
+        """Bitmask of the operands matching `tag`, computed once per tag"""
+        mask = self._masks.get(tag)
+        if mask is None:
+            mask = 0
+            for bit, pattern in enumerate(self.operands):
+                if pattern.match(tag):
+                    mask |= 1 << bit
+            self._masks[sys.intern(tag)] = mask
+        return mask
+
+    def matches_mask(self, mask):
+        """Whether a test whose tags match the operands in `mask` is selected"""
+        return any(mask & required == required and not any(mask & term == term for term in excluded)
+                   for required, excluded in self.clauses)
+
+    def matched_tags(self, tags):
+        """Tags selecting a test, or None if the test is not selected
+
+        Args:
+            tags (iterable): tags of one test
+        Returns:
+            list | None: the tags matching a positive operand, in order
+        """
+        masks = [self.tag_mask(tag) for tag in tags]
+        test_mask = 0
+        for mask in masks:
+            test_mask |= mask
+        if not self.matches_mask(test_mask):
+            return None
+        return [tag for tag, mask in zip(tags, masks) if mask & self.positive_mask]
+
+
+def iter_suite_tests(suite):
+    """Yield (test, suite) for every test of a robot suite tree, depth first
+
+    Walks the tree with an explicit stack, so deep trees cannot hit the
+    recursion limit.
+
+    Args:
+        suite(Object): robot.model.testsuite.TestSuite
+    """
+    stack = [suite]
+    while stack:
+        current = stack.pop()
+        for test in current.tests:
+            yield test, current
+        stack.extend(reversed(current.suites))
+
+
+def iter_matching_tests(tests, query, statuses=None):
+    """Yield (test name, matched tags) for the tests selected by a query
+
+    Args:
+        tests(iterable): objects with `name`, `tags` and `status`
+        query(TagQuery | str | re.Pattern): tag pattern or expression
+        statuses(iterable): only select tests with one of these statuses, e.g. ["FAIL"]
+    """
+    query = TagQuery.coerce(query)
+    statuses = frozenset(statuses) if statuses else None
+    for test in tests:
+        if statuses is not None and test.status not in statuses:
+            continue
+        matched_tags = query.matched_tags(test.tags)
+        if matched_tags is not None:
+            yield test.name, matched_tags
@@ -0,0 +1,83 @@
+from collections import namedtuple
+from .archive import load_result
+from .result_model import tag_key
+from .stream_parser import TagStat, count_statuses, iter_tests
+
+# Tag statistics of one file plus the counts of all its tests, small enough
+# to be returned by a worker process instead of the test records.
+FileTagStats = namedtuple("FileTagStats", ["path", "tag_stats", "total", "error"])
+TOTAL_NAME = "All Tests"
+
+
+def file_tag_statistics(output_xml):
+    """Tag statistics of one output.xml, counted while it streams in
+
+    Only the counters are kept, never the test records, and errors are
+    captured like in stream_parser.summarize so a pool keeps going.
+
+    Returns:
+        FileTagStats
+    """
+    try:
+        tag_stats, total = count_statuses(iter_tests(output_xml))
+    except Exception as e:
+        return FileTagStats(str(output_xml), [], None, str(e))
+    return FileTagStats(str(output_xml), tag_stats, TagStat(TOTAL_NAME, *total), None)
+
+
+def summary_tag_statistics(summary):
+    """FileTagStats of a stream_parser.FileSummary (e.g. from the cache or the index)"""
+    if summary.error is not None:
+        return FileTagStats(summary.path, [], None, summary.error)
+    _, total = count_statuses(summary.tests)
+    return FileTagStats(summary.path, summary.tag_stats, TagStat(TOTAL_NAME, *total), None)
+
+
+def robot_tag_statistics(output_xml):
+    """FileTagStats from Robot Framework's own statistics model"""
+    try:
+        statistics = load_result(output_xml).statistics
+    except Exception as e:
+        return FileTagStats(str(output_xml), [], None, str(e))
+    total = statistics.total
+    return FileTagStats(str(output_xml), list(statistics.tags),
+                        TagStat(TOTAL_NAME, total.passed, total.failed, total.skipped), None)
+
+
+class TagTotals:
+    """Passed/failed/skipped counts per tag, added up across files
+
+    Per-file statistics are added as they arrive, from this process or from
+    workers, so a whole archive is consolidated in one pass without keeping
+    any test. Tags are grouped like robot does, under their first spelling.
+    """
+
+    def __init__(self):
+        # tag_key: [first spelling seen, passed, failed, skipped]
+        self.counts = {}
+        self.total = [0, 0, 0]
+        self.files = 0
+
+    def add(self, file_stats):
+        """Add the FileTagStats of one file, files that failed to parse are skipped"""
+        if file_stats.error is not None:
+            return
+        self.files += 1
+        for tag_stat in file_stats.tag_stats:
+            key = tag_key(tag_stat.name)
+            stat = self.counts.get(key)
+            if stat is None:
+                stat = self.counts[key] = [tag_stat.name, 0, 0, 0]
+            stat[1] += tag_stat.passed
+            stat[2] += tag_stat.failed
+            stat[3] += tag_stat.skipped
+        self.total[0] += file_stats.total.passed
+        self.total[1] += file_stats.total.failed
+        self.total[2] += file_stats.total.skipped
+
+    def tag_stats(self):
+        """list[TagStat]: consolidated statistics sorted by tag_key"""
+        return [TagStat(*self.counts[key]) for key in sorted(self.counts)]
+
+    def total_stat(self):
+        return TagStat(TOTAL_NAME, *self.total)
@@ -0,0 +1,79 @@
+import os
+import shutil
+from fnmatch import fnmatch
+
+STRATEGIES = ("copy", "reflink", "hardlink", "symlink")
+# Files the merge actually reads, used when only outputs are transferred.
+OUTPUT_PATTERNS = ("*output.xml", "*output.xml.gz", "*output.xml.zst")
+# ioctl request cloning a whole file on btrfs/XFS (linux/fs.h)
+FICLONE = 0x40049409
+
+
+def _reflink(src, dst):
+    """Clone src to dst sharing its blocks, or do an in-kernel copy"""
+    import fcntl
+
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            # copy_file_range still avoids user space and reflinks on some filesystems.
+            remaining = os.fstat(src_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src_file.fileno(), dst_file.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    shutil.copystat(src, dst)
+
+
+def transfer_file(src, dst, strategy="copy"):
+    """Make `dst` hold the content of `src` using the given strategy
+
+    hardlink and symlink share the source file, so neither side may be
+    modified in place afterwards. reflink shares blocks copy-on-write where
+    the filesystem supports it. Every strategy falls back to a plain copy
+    when it is not possible (other device, unsupported filesystem or OS).
+
+    Args:
+        src (str): file to transfer
+        dst (str): destination file path
+        strategy (str): one of STRATEGIES
+    Returns:
+        str: dst
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    try:
+        if strategy == "hardlink":
+            os.link(src, dst)
+            return dst
+        if strategy == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+            return dst
+        if strategy == "reflink" and hasattr(os, "copy_file_range"):
+            _reflink(src, dst)
+            return dst
+    except OSError:
+        if os.path.lexists(dst):
+            os.remove(dst)
+    return shutil.copy2(src, dst)
+
+
+def transfer_tree(src_dir, dst_dir, strategy="copy", patterns=None):
+    """copytree using transfer_file, optionally only for matching files
+
+    Args:
+        src_dir (str): folder to transfer
+        dst_dir (str): destination folder, must not exist
+        strategy (str): one of STRATEGIES
+        patterns (tuple): only transfer files whose name matches one of these
+    """
+    ignore = None
+    if patterns:
+        def ignore(folder, names):
+            return [name for name in names
+                    if not os.path.isdir(os.path.join(folder, name))
+                    and not any(fnmatch(name, pattern) for pattern in patterns)]
+    shutil.copytree(src_dir, dst_dir, ignore=ignore,
+                    copy_function=lambda src, dst: transfer_file(src, dst, strategy))
@@ -0,0 +1,258 @@
+import os
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+from .archive import open_output, open_output_writer, output_stat
+from .parallel_runner import map_in_pool
+from .instrumentation import span
+from .result_model import tag_key
+
+# Robot's in-memory model of a result takes roughly this many times the
+# size of the output.xml it was read from.
+ROBOT_MEMORY_FACTOR = 6
+_CHILD_ID = re.compile(r"^s1-s(\d+)")
+
+
+def plan_groups(xml_paths, fan_in=16, memory_budget_mb=None):
+    """Split input files into groups merged by one worker each
+
+    A group is closed when it holds `fan_in` files or when adding the next
+    file would make the estimated memory of the group exceed the budget.
+
+    Args:
+        xml_paths (list[str]): robot output files, in merge order
+        fan_in (int): maximum number of files per group
+        memory_budget_mb (int): approximate memory one worker may use, in MB
+    Returns:
+        list[list[str]]: groups of consecutive input files
+    """
+    budget = memory_budget_mb * 1024 * 1024 / ROBOT_MEMORY_FACTOR if memory_budget_mb else None
+    groups = []
+    group = []
+    group_size = 0
+    for path in xml_paths:
+        size = output_stat(path).st_size
+        if group and (len(group) >= fan_in or (budget is not None and group_size + size > budget)):
+            groups.append(group)
+            group = []
+            group_size = 0
+        group.append(path)
+        group_size += size
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _merge_group(task):
+    """Pool worker: merge one group of files into an intermediate output"""
+    from .merge_results import merge_in_process
+
+    xml_paths, merged_xml_path = task
+    merge_in_process(xml_paths, merged_xml_path)
+    return merged_xml_path
+
+
+def to_xml(elem):
+    """Serialize an element read by iterparse, as robot writes it"""
+    # The tail may not be parsed yet when iterparse reports the end event.
+    elem.tail = "\n"
+    # ElementTree escapes '>' in text, so ' />' only occurs in empty tags.
+    return ET.tostring(elem, encoding="unicode").replace(" />", "/>")
+
+
+def start_tag(elem, attributes=None):
+    """Start tag of an element, optionally with other attributes"""
+    attributes = elem.attrib if attributes is None else attributes
+    return "<{}{}>".format(elem.tag, "".join(f" {name}={quoteattr(value)}" for name, value in attributes.items()))
+
+
+class _Splicer:
+    """Stream the child suites of combined outputs into one combined output
+
+    Every intermediate output has a combined root suite. Its child suites
+    are copied, renumbered, under a single new root, exactly as if all the
+    original files had been merged at once. Only one top level test or
+    keyword is held in memory at a time.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.child_count = 0
+        self.child_names = []
+        self.child_elapsed = 0.0
+        self.totals = [0, 0, 0]
+        # Normalized tag: [first spelling seen, pass, fail, skip], like robot.
+        self.tag_stats = {}
+        self.suite_stats = []
+        self.errors = []
+        self.robot_attributes = None
+
+    def _remap_id(self, value, offset):
+        return _CHILD_ID.sub(lambda match: f"s1-s{int(match.group(1)) + offset}", value)
+
+    def add(self, merged_xml_path):
+        offset = self.child_count
+        with open_output(merged_xml_path) as stream:
+            self._copy(ET.iterparse(stream, events=("start", "end")), offset)
+
+    def _copy(self, events, offset):
+        elements = []
+        root_name = ""
+        # Depth of the test/keyword/status being copied as a whole, if any.
+        item_depth = None
+        for event, elem in events:
+            depth = len(elements)
+            if event == "start":
+                elements.append(elem)
+                if item_depth is not None:
+                    continue
+                if depth == 0 and self.robot_attributes is None:
+                    self.robot_attributes = dict(elem.attrib)
+                elif depth == 1 and elem.tag == "suite":
+                    root_name = elem.get("name", "")
+                elif elem.tag == "suite" and depth >= 2 and elements[1].tag == "suite":
+                    attributes = dict(elem.attrib)
+                    attributes["id"] = self._remap_id(attributes.get("id", ""), offset)
+                    if depth == 2:
+                        self.child_count += 1
+                        self.child_names.append(attributes.get("name", ""))
+                    self.out.write(start_tag(elem, attributes) + "\n")
+                elif depth >= 3 and elements[1].tag == "suite" and elements[-2].tag == "suite":
+                    item_depth = depth
+                continue
+
+            elements.pop()
+            depth = len(elements)
+            if item_depth is not None and depth > item_depth:
+                continue
+            in_results = depth >= 2 and elements[1].tag == "suite"
+            if elem.tag == "suite" and in_results:
+                self.out.write("</suite>\n")
+            elif depth == item_depth:
+                # A test, keyword, doc or status of a copied suite.
+                item_depth = None
+                if elem.tag == "status" and depth == 3:
+                    self.child_elapsed += float(elem.get("elapsed", 0) or 0)
+                if "id" in elem.attrib:
+                    elem.set("id", self._remap_id(elem.get("id"), offset))
+                self.out.write(to_xml(elem))
+            elif elem.tag == "statistics":
+                self._add_statistics(elem, root_name, offset)
+            elif elem.tag == "msg" and depth >= 1 and elements[-1].tag == "errors":
+                self.errors.append(to_xml(elem))
+            elif depth >= 1 and elements[-1].tag in ("statistics", "total", "tag"):
+                continue
+            elif depth >= 2 and elements[-2].tag == "statistics":
+                continue
+
+            if elements:
+                elements[-1].remove(elem)
+            elem.clear()
+
+    def _add_statistics(self, statistics, root_name, offset):
+        for stat in statistics.findall("total/stat"):
+            if stat.text == "All Tests":
+                self.totals[0] += int(stat.get("pass", 0))
+                self.totals[1] += int(stat.get("fail", 0))
+                self.totals[2] += int(stat.get("skip", 0))
+        for stat in statistics.findall("tag/stat"):
+            counts = self.tag_stats.setdefault(tag_key(stat.text or ""), [stat.text or "", 0, 0, 0])
+            counts[1] += int(stat.get("pass", 0))
+            counts[2] += int(stat.get("fail", 0))
+            counts[3] += int(stat.get("skip", 0))
+        for stat in statistics.findall("suite/stat"):
+            if stat.get("id") == "s1":
+                continue
+            stat.set("id", self._remap_id(stat.get("id", ""), offset))
+            # The text is the full name, re-rooted under the new root later.
+            stat.text = (stat.text or "")[len(root_name):]
+            self.suite_stats.append(stat)
+
+    def close(self):
+        passed, failed, skipped = self.totals
+        status = "FAIL" if failed else "PASS" if passed else "SKIP"
+        self.out.write(f'<status status="{status}" elapsed="{self.child_elapsed:.6f}"/>\n</suite>\n')
+        root_name = " & ".join(self.child_names)
+        self.out.write("<statistics>\n<total>\n")
+        self.out.write(f'<stat pass="{passed}" fail="{failed}" skip="{skipped}">All Tests</stat>\n')
+        self.out.write("</total>\n<tag>\n")
+        for key in sorted(self.tag_stats):
+            name, tag_passed, tag_failed, tag_skipped = self.tag_stats[key]
+            self.out.write(f'<stat pass="{tag_passed}" fail="{tag_failed}" skip="{tag_skipped}">'
+                           f'{escape(name)}</stat>\n')
+        self.out.write("</tag>\n<suite>\n")
+        self.out.write(f'<stat name={quoteattr(root_name)} id="s1" pass="{passed}" fail="{failed}" '
+                       f'skip="{skipped}">{escape(root_name)}</stat>\n')
+        for stat in self.suite_stats:
+            stat.text = root_name + stat.text
+            self.out.write(to_xml(stat))
+        self.out.write("</suite>\n</statistics>\n<errors>\n")
+        self.out.writelines(self.errors)
+        self.out.write("</errors>\n</robot>\n")
+
+
+def splice_merged_outputs(merged_xml_paths, output_path):
+    """Combine already merged outputs into one, with constant memory
+
+    The result is the same as merging all original files at once: the
+    child suites of every input become children of one new root suite.
+
+    Args:
+        merged_xml_paths (list[str]): outputs written by merge_in_process or by a
+            splice, also compressed (see archive.py)
+        output_path (str): where to write the combined output.xml, may end in .gz or .zst
+    """
+    # A .gz/.zst output_path is compressed while it is written.
+    with open_output_writer(output_path, encoding="utf-8") as out:
+        # The root suite start tag needs every child name, write it last.
+        body = tempfile.TemporaryFile("w+", encoding="utf-8")
+        with body:
+            splicer = _Splicer(body)
+            for path in merged_xml_paths:
+                splicer.add(path)
+            attributes = dict(splicer.robot_attributes or {})
+            attributes["generated"] = datetime.now().isoformat()
+            out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            out.write(start_tag(ET.Element("robot"), attributes) + "\n")
+            out.write(f'<suite id="s1" name={quoteattr(" & ".join(splicer.child_names))}>\n')
+            splicer.close()
+            body.seek(0)
+            shutil.copyfileobj(body, out)
+
+
+def tree_merge(xml_paths, output_path, fan_in=16, memory_budget_mb=None, jobs=1,
+               log_html_path=None, report_html_path=None):
+    """Merge many output files in bounded memory
+
+    Inputs are merged in groups of at most `fan_in` files (in parallel with
+    `jobs` workers), then the intermediate outputs are spliced together by
+    streaming, so peak memory depends on the group size, not on the number
+    of files. Writing log/report needs the whole result in memory, leave
+    them out to keep memory bounded.
+
+    Args:
+        xml_paths (list[str]): robot output files to merge
+        output_path (str): merged output.xml to write, compressed if it ends in .gz or .zst
+        fan_in (int): maximum number of files merged by one worker
+        memory_budget_mb (int): approximate memory per worker, limits group size
+        jobs (int): number of worker processes
+        log_html_path (str): optional log.html to write from the merged output
+        report_html_path (str): optional report.html to write from the merged output
+    """
+    from .merge_results import merge_in_process, write_html
+
+    groups = plan_groups(xml_paths, fan_in, memory_budget_mb)
+    if len(groups) == 1:
+        merge_in_process(groups[0], output_path)
+    else:
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as tmp_dir:
+            tasks = [(group, os.path.join(tmp_dir, f"group_{index}.xml")) for index, group in enumerate(groups)]
+            with span("merge.groups"):
+                intermediates = list(map_in_pool(_merge_group, tasks, jobs))
+            with span("merge.splice"):
+                splice_merged_outputs(intermediates, output_path)
+    if log_html_path or report_html_path:
+        write_html(output_path, log_html_path, report_html_path)
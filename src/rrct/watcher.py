@@ -0,0 +1,167 @@
+import os
+import time
+import threading
+from fnmatch import fnmatch
+from pathlib import Path
+from .archive import is_zip, matches_output, split_member
+from .scanner import scan_files
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog is optional, fall back to polling
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def file_signature(path):
+    """Return (size, mtime_ns) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _OutputFileHandler(FileSystemEventHandler):
+    """Forward created/modified/moved files matching the pattern to the watcher."""
+
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+
+class OutputFileWatcher:
+    """
+    Watch a results folder for new or rewritten Robot output files.
+
+    Uses filesystem notifications (inotify & co. through watchdog) when
+    available, else compares a snapshot of the matching files every
+    `poll_interval` seconds. Files are only reported once they have not
+    changed for `settle_seconds`, and arrivals close together are reported
+    as one batch. A batch is not held back longer than `max_batch_seconds`
+    by files that keep arriving: the files settled by then are reported
+    and the others wait for the next batch.
+    """
+
+    def __init__(self, folder, pattern="*output.xml", settle_seconds=5.0, poll_interval=None,
+                 exclude_dirs=(), max_batch_seconds=60.0):
+        self.folder = Path(folder)
+        self.pattern = pattern
+        self.settle_seconds = settle_seconds
+        self.max_batch_seconds = max_batch_seconds
+        # Same meaning as for scanner.scan_files: directory name patterns or paths.
+        self.exclude_dirs = tuple(os.fspath(exclude) for exclude in exclude_dirs)
+        self.use_polling = Observer is None
+        if poll_interval is None:
+            poll_interval = 5.0 if self.use_polling else 1.0
+        self.poll_interval = poll_interval
+        self._pending = {}
+        self._batch_started = None
+        self._lock = threading.Lock()
+        self._snapshot = {}
+        self._observer = None
+
+    def start(self):
+        if self.use_polling:
+            self._snapshot = self._scan()
+            print(f"[WATCH] watchdog not installed, polling every {self.poll_interval}s")
+        else:
+            self._observer = Observer()
+            self._observer.schedule(_OutputFileHandler(self), str(self.folder), recursive=True)
+            self._observer.start()
+        print(f"[WATCH] Watching {self.folder} for {self.pattern}")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _is_excluded(self, path):
+        """Whether `path` is below one of the excluded directories."""
+        try:
+            parents = Path(os.path.abspath(path)).relative_to(os.path.abspath(self.folder)).parents
+        except ValueError:
+            return False
+        for parent in list(parents)[:-1]:
+            directory = self.folder / parent
+            if any(fnmatch(directory.name, exclude) or os.path.abspath(directory) == os.path.abspath(exclude)
+                   for exclude in self.exclude_dirs):
+                return True
+        return False
+
+    def notify(self, path):
+        """Record a change of `path`, restarting its settle timer."""
+        name = os.path.basename(path)
+        # Compressed outputs and zip archives of result folders count too.
+        if (matches_output(name, self.pattern) or is_zip(name)) and not self._is_excluded(path):
+            with self._lock:
+                now = time.monotonic()
+                if not self._pending:
+                    self._batch_started = now
+                self._pending[path] = (now, file_signature(path))
+
+    def _scan(self):
+        snapshot = {}
+        for entry in scan_files(self.folder, self.pattern, exclude_dirs=self.exclude_dirs, archives=True):
+            archive, member = split_member(entry.path)
+            # A zip archive is tracked as one file, whatever its matching members.
+            snapshot[archive] = file_signature(archive) if member is not None else (entry.size, entry.mtime_ns)
+        return snapshot
+
+    def _poll(self):
+        snapshot = self._scan()
+        for path, signature in snapshot.items():
+            if self._snapshot.get(path) != signature:
+                self.notify(path)
+        self._snapshot = snapshot
+
+    def wait_for_batch(self):
+        """
+        Block until new output files arrived and none of them changed for
+        `settle_seconds`, or until the oldest of them waited `max_batch_seconds`
+        and some of them are settled. Returns the settled files, sorted.
+        """
+        while True:
+            time.sleep(self.poll_interval)
+            if self.use_polling:
+                self._poll()
+            with self._lock:
+                if not self._pending:
+                    continue
+                now = time.monotonic()
+                settled = []
+                for path, (changed_at, signature) in list(self._pending.items()):
+                    current = file_signature(path)
+                    if current != signature:
+                        # Still being written, restart its timer.
+                        self._pending[path] = (now, current)
+                    elif now - changed_at >= self.settle_seconds:
+                        settled.append(path)
+                overdue = self.max_batch_seconds is not None and now - self._batch_started >= self.max_batch_seconds
+                if not settled or (len(settled) < len(self._pending) and not overdue):
+                    continue
+                batch = sorted(path for path in settled if self._pending.pop(path)[1])
+                self._batch_started = now
+            if batch:
+                return batch
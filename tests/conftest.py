@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+# Two runs whose tags differ in case, spaces and underscores only, plus
+# tags robot leaves out of statistics (robot:*, NONE).
+FIRST_SUITE = """*** Test Cases ***
+Login
+    [Tags]    Smoke    slow
+    No Operation
+
+Logout
+    [Tags]    smoke    robot:flaky    NONE
+    Fail    broken
+"""
+
+SECOND_SUITE = """*** Test Cases ***
+Search
+    [Tags]    SMOKE    smoke_test
+    No Operation
+
+Browse
+    [Tags]    smoke test    Slow
+    Skip    not ready
+"""
+
+
+@pytest.fixture
+def run_robot(tmp_path):
+    """Run a robot suite given as text, returns the path of its output.xml"""
+    from robot import run
+
+    def run_suite(name, text, folder=None):
+        suite_dir = (folder or tmp_path) / name
+        suite_dir.mkdir(parents=True)
+        source = suite_dir / f"{name}.robot"
+        source.write_text(text, encoding="utf-8")
+        output = suite_dir / "output.xml"
+        run(str(source), output=str(output), log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+        return str(output)
+
+    return run_suite
+
+
+@pytest.fixture
+def tagged_outputs(run_robot):
+    """output.xml of FIRST_SUITE and SECOND_SUITE, in that order"""
+    return [run_robot("first", FIRST_SUITE), run_robot("second", SECOND_SUITE)]
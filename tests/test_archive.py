@@ -0,0 +1,47 @@
+import os
+import zipfile
+
+import pytest
+
+from rrct.archive import compress_file, load_result, member_path, open_output, output_exists, output_stat
+from rrct.scanner import scan_files
+from rrct.stream_parser import probe_status, summarize
+
+
+def _check_readable(path, plain):
+    with open(plain, "rb") as f:
+        content = f.read()
+    with open_output(path) as stream:
+        assert stream.read() == content
+    assert probe_status(path).status == "FAIL"
+    assert [test.name for test in summarize(path).tests] == ["Login", "Logout"]
+    assert len(list(load_result(path).suite.all_tests)) == 2
+
+
+@pytest.mark.parametrize("compression", ["gz", "zst"])
+def test_reads_compressed_outputs(tagged_outputs, compression):
+    if compression == "zst":
+        pytest.importorskip("zstandard")
+    plain = tagged_outputs[0]
+    compressed = compress_file(plain, compression, remove_source=False)
+    assert compressed == f"{plain}.{compression}"
+    _check_readable(compressed, plain)
+
+
+@pytest.mark.parametrize("member", ["run1/output.xml", "run1/output.xml.gz"])
+def test_reads_zip_members(tagged_outputs, tmp_path, member):
+    plain = tagged_outputs[0]
+    source = compress_file(plain, "gz", remove_source=False) if member.endswith(".gz") else plain
+    archive = tmp_path / "results.zip"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.write(source, member)
+        zip_file.writestr("run1/log.html", "<html/>")
+    path = member_path(archive, member)
+
+    assert [entry.path for entry in scan_files(tmp_path, "*.xml", archives=True)
+            if "!/" in entry.path] == [path]
+    assert output_exists(path)
+    # A member is sized as stored in the archive, dated like the archive.
+    assert output_stat(path) == (os.path.getsize(source), os.stat(archive).st_mtime_ns)
+    assert not output_exists(member_path(archive, "run2/output.xml"))
+    _check_readable(path, plain)
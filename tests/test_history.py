@@ -0,0 +1,59 @@
+import os
+import re
+
+from rrct.history import HistoryStore, print_trend_report
+
+STEADY = """*** Test Cases ***
+Steady
+    No Operation
+"""
+FLAKY = {"PASS": "No Operation", "FAIL": "Fail    flaky"}
+
+
+def _run(run_robot, tmp_path, name, flaky_status, hour):
+    """A run of the same "Suite" with a Steady test and a Flaky one, dated `hour`"""
+    text = f"{STEADY}\nFlaky\n    {FLAKY[flaky_status]}\n"
+    output = run_robot("suite", text, tmp_path / name)
+    os.utime(output, ns=(hour * 3600 * 10**9, hour * 3600 * 10**9))
+    return output
+
+
+def _flips(history):
+    return {trend.name: (trend.runs, trend.flips) for trend in history.trends()}
+
+
+def test_flips_count_status_changes_in_time_order(run_robot, tmp_path):
+    runs = [_run(run_robot, tmp_path, f"run{hour}", status, hour)
+            for hour, status in enumerate(["PASS", "FAIL", "FAIL", "PASS"], start=1)]
+    with HistoryStore(tmp_path / "history.sqlite") as history:
+        # Recorded out of order, flips follow the run times.
+        assert history.record_files([runs[3], runs[1]]) == {}
+        assert _flips(history) == {"Suite.Flaky": (2, 1), "Suite.Steady": (2, 0)}
+        history.record_files(runs)
+        assert history.run_count() == 4
+        assert _flips(history) == {"Suite.Flaky": (4, 2), "Suite.Steady": (4, 0)}
+        assert [trend.name for trend in history.flaky_tests()] == ["Suite.Flaky"]
+
+
+def test_rewritten_run_replaces_its_results(run_robot, tmp_path):
+    first = _run(run_robot, tmp_path, "run1", "PASS", 1)
+    second = _run(run_robot, tmp_path, "run2", "FAIL", 2)
+    with HistoryStore(tmp_path / "history.sqlite") as history:
+        history.record_files([first, second])
+        assert _flips(history)["Suite.Flaky"] == (2, 1)
+        os.utime(second, ns=(0, 0))  # now the oldest run
+        history.record_files([first, second])
+        assert _flips(history)["Suite.Flaky"] == (2, 1)
+        assert history.run_count() == 2
+
+
+def test_report_of_results_without_times(run_robot, tmp_path, capsys):
+    output = _run(run_robot, tmp_path, "run1", "PASS", 1)
+    with open(output, encoding="utf-8") as f:
+        content = re.sub(r' (start|elapsed)="[^"]*"', "", f.read())
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(content)
+    with HistoryStore(tmp_path / "history.sqlite") as history:
+        history.record_files([output])
+        print_trend_report(history)
+    assert "Suite.Steady | Mean duration: n/a, Runs: 1" in capsys.readouterr().out
@@ -0,0 +1,38 @@
+import argparse
+import io
+import json
+
+from rrct import instrumentation
+from rrct.instrumentation import add_profile_arguments, profiling_from_args, span
+
+
+def test_spans_are_aggregated_and_trace_events_bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(instrumentation, "MAX_TRACE_EVENTS", 10)
+    instrumentation.enable(trace=True)
+    try:
+        for _ in range(25):
+            with span("probe"):
+                pass
+        with span("copy"):
+            pass
+    finally:
+        instrumentation.disable()
+    assert {name: calls for name, (calls, _, _) in instrumentation.stage_totals().items()} == \
+           {"probe": 25, "copy": 1}
+
+    instrumentation.write_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["probe"] * 9 + ["copy", "counters"]
+
+
+def test_trace_implies_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.stderr", io.StringIO())
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    prefix = tmp_path / "run"
+    with profiling_from_args(parser.parse_args(["--trace", "--profile-output", str(prefix)])):
+        with span("merge"):
+            pass
+    assert (tmp_path / "run.pstats").exists()
+    assert [event["name"] for event in json.loads((tmp_path / "run.trace.json").read_text())["traceEvents"]] == \
+           ["merge", "counters"]
@@ -0,0 +1,65 @@
+import json
+
+from rrct.archive import load_result
+from rrct.listener import MANIFEST_FILE, ListenerOptions, run_cycle
+
+from conftest import FIRST_SUITE
+
+PASSING_SUITE = """*** Test Cases ***
+Open
+    No Operation
+
+Close
+    No Operation
+"""
+
+
+def _merged_tests(merge_dir):
+    return len(list(load_result(str(merge_dir / "merge.xml")).suite.all_tests))
+
+
+def test_incremental_listener_only_appends_new_results(run_robot, tmp_path):
+    src, merge_dir = tmp_path / "src", tmp_path / "merge"
+    run_robot("run1", PASSING_SUITE, src)
+    run_robot("run2", FIRST_SUITE, src)
+    options = ListenerOptions(incremental=True)
+
+    run_cycle(src, merge_dir, options, exclude_latest=False)
+    manifest = json.loads((merge_dir / MANIFEST_FILE).read_text())
+    assert sorted(entry["passed"] for entry in manifest["files"].values()) == [False, True]
+    assert manifest["merged"] == ["run1/output.xml"]
+    assert _merged_tests(merge_dir) == 2
+    assert not (merge_dir / "merge_log.html").exists()
+
+    # Log and report of an earlier cycle no longer match the appended XML.
+    (merge_dir / "merge_log.html").write_text("old")
+    run_robot("run3", PASSING_SUITE, src)
+    run_cycle(src, merge_dir, options, exclude_latest=False)
+    manifest = json.loads((merge_dir / MANIFEST_FILE).read_text())
+    assert len(manifest["files"]) == 3
+    assert manifest["merged"] == ["run1/output.xml", "run3/output.xml"]
+    assert _merged_tests(merge_dir) == 4
+    assert not (merge_dir / "merge_log.html").exists()
+
+    merged_mtime = (merge_dir / "merge.xml").stat().st_mtime_ns
+    run_cycle(src, merge_dir, options, exclude_latest=False)
+    assert (merge_dir / "merge.xml").stat().st_mtime_ns == merged_mtime
+
+
+def test_incremental_listener_writes_html_on_request(run_robot, tmp_path):
+    src, merge_dir = tmp_path / "src", tmp_path / "merge"
+    run_robot("run1", PASSING_SUITE, src)
+    run_cycle(src, merge_dir, ListenerOptions(incremental=True, html=True), exclude_latest=False)
+    assert (merge_dir / "merge_log.html").exists()
+    assert (merge_dir / "merge_report.html").exists()
+
+
+def test_classic_listener_does_not_merge_the_previous_merge(run_robot, tmp_path):
+    src, merge_dir = tmp_path / "src", tmp_path / "merge"
+    run_robot("run1", PASSING_SUITE, src)
+    run_cycle(src, merge_dir, exclude_latest=False)
+    assert _merged_tests(merge_dir) == 2
+
+    run_robot("run2", PASSING_SUITE, src)
+    run_cycle(src, merge_dir, exclude_latest=False)
+    assert _merged_tests(merge_dir) == 4
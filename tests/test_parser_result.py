@@ -0,0 +1,15 @@
+import pytest
+
+from rrct.parser_result import print_test_results_in_folder
+from rrct.synthetic_output import DEFAULT_SHAPE, generate_results_folder
+
+
+@pytest.mark.parametrize("mode", [dict(streaming=True), dict(jobs=2), dict(cache=True), dict(index=True)])
+def test_tests_are_printed_the_same_in_every_mode(tmp_path, capsys, mode):
+    generate_results_folder(tmp_path, files=2, shape=DEFAULT_SHAPE._replace(tests_per_suite=2, suites_per_suite=2))
+    print_test_results_in_folder(tmp_path)
+    expected = capsys.readouterr().out
+    assert "Suite name  : Run 1.Suite 1-1.Suite 2-1\n" in expected
+
+    print_test_results_in_folder(tmp_path, **mode)
+    assert capsys.readouterr().out == expected
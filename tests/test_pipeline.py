@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from rrct.pipeline import Stage, run_pipeline
+
+
+def test_items_pass_through_every_stage():
+    stages = [Stage("double", lambda item: item * 2, 4),
+              Stage("drop", lambda item: item if item % 4 == 0 else None, 3)]
+    assert sorted(run_pipeline(range(100), stages)) == list(range(0, 200, 4))
+    assert run_pipeline([], stages) == []
+
+
+def test_queues_bound_how_far_the_input_is_read():
+    read = []
+    release = threading.Event()
+
+    def items():
+        for item in range(100):
+            read.append(item)
+            yield item
+
+    def slow(item):
+        release.wait()
+        return item
+
+    stages = [Stage("fast", lambda item: item, 1), Stage("slow", slow, 1)]
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(run_pipeline(items(), stages, queue_size=2)))
+    runner.start()
+    try:
+        time.sleep(0.2)
+        # Two full queues, one item per worker and one waiting to be queued.
+        assert len(read) <= 7
+    finally:
+        release.set()
+        runner.join(5)
+    assert sorted(results) == list(range(100))
+
+
+def test_first_error_is_raised_and_stops_reading():
+    read = []
+
+    def items():
+        for item in range(10_000):
+            read.append(item)
+            yield item
+
+    def probe(item):
+        if item == 5:
+            raise ValueError("broken output")
+        return item
+
+    with pytest.raises(ValueError, match="broken output"):
+        run_pipeline(items(), [Stage("probe", probe, 2), Stage("copy", lambda item: item, 2)], queue_size=4)
+    assert len(read) < 10_000
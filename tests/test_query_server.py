@@ -0,0 +1,58 @@
+import json
+import shutil
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from rrct.list_result import main as list_main
+from rrct.merge_results import merge_in_process
+from rrct.query_server import DEFAULT_HOST, QueryServer, WarmIndex
+
+
+def test_warm_index_skips_merged_output(tagged_outputs, tmp_path):
+    merge_dir = tmp_path / "merge"
+    shutil.copytree(tmp_path / "first", merge_dir / "first")
+    merge_in_process(tagged_outputs[:1], str(merge_dir / "merge.xml.gz"))
+
+    index = WarmIndex(merge_dir)
+    assert index.refresh() == 1
+    assert index.status()["tests"] == 2
+    assert [record["tests"] for record in index.records("list")] == [2]
+
+    everything = WarmIndex(merge_dir, exclude_files=())
+    everything.refresh()
+    assert everything.status()["tests"] == 4
+
+
+def test_list_command_writes_the_records_of_the_server(tagged_outputs, tmp_path, capsys):
+    (tmp_path / "broken.xml").write_text("<robot>")
+    index = WarmIndex(tmp_path)
+    index.refresh()
+
+    list_main(["--folder", str(tmp_path), "--format", "jsonl"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    key = lambda record: record["file"]
+    assert sorted(records, key=key) == sorted(index.records("list"), key=key)
+    assert sorted(record["type"] for record in records) == ["error", "file", "file"]
+
+
+def test_invalid_pattern_is_a_bad_request(tagged_outputs, tmp_path):
+    index = WarmIndex(tmp_path)
+    index.refresh()
+    server = QueryServer(index, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://{DEFAULT_HOST}:{server.server_address[1]}"
+    try:
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{url}/match?pattern=(")
+        assert error.value.code == 400
+        assert "invalid query" in json.loads(error.value.read())["error"]
+
+        # The server is still answering.
+        with urlopen(f"{url}/match?pattern=smoke") as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,59 @@
+import os
+
+from rrct import result_filter
+from rrct.archive import load_result
+from rrct.merge_results import merge_robot_results
+from rrct.result_filter import prune_output, prune_outputs
+from rrct.synthetic_output import DEFAULT_SHAPE, write_output_xml
+
+from conftest import FIRST_SUITE
+
+
+def _test_names(path):
+    return [test.name for test in load_result(str(path)).suite.all_tests]
+
+
+def test_prune_output_keeps_the_selected_tests(tagged_outputs, tmp_path):
+    pruned = tmp_path / "pruned.xml"
+    assert prune_output(tagged_outputs[0], str(pruned), result_filter.TestFilter("slow")) == (1, 2)
+    assert _test_names(pruned) == ["Login"]
+
+
+def test_suites_without_selected_tests_are_dropped(tmp_path):
+    output = tmp_path / "output.xml"
+    write_output_xml(output, DEFAULT_SHAPE._replace(tests_per_suite=5, fail_ratio=0.2), seed=3)
+    failed = [test for test in load_result(str(output)).suite.all_tests if test.status == "FAIL"]
+    assert failed
+
+    pruned = tmp_path / "pruned.xml"
+    kept, total = prune_output(str(output), str(pruned), result_filter.TestFilter(statuses=["fail"]))
+    assert (kept, total) == (len(failed), 5 * 4 * 4)
+    suite = load_result(str(pruned)).suite
+    assert [test.full_name for test in suite.all_tests] == [test.full_name for test in failed]
+    leaves = [child for top in suite.suites for child in top.suites]
+    assert all(leaf.tests for leaf in leaves)
+    assert len(leaves) == len({test.parent.full_name for test in failed})
+
+
+def test_files_without_selected_tests_are_left_out(tagged_outputs, tmp_path):
+    pruned = prune_outputs(tagged_outputs, str(tmp_path), result_filter.TestFilter(statuses=["SKIP"]))
+    assert [_test_names(path) for path in pruned] == [["Browse"]]
+    assert sorted(os.listdir(tmp_path)) == ["1_output.xml", "first", "second"]
+
+
+def test_filtered_merge_keeps_the_latest_run_of_each_test(run_robot, tmp_path):
+    for name in ("run1", "run2"):
+        run_robot("suite", FIRST_SUITE, tmp_path / name)
+    merge_robot_results(str(tmp_path), "merged", in_process=True, outputs=("xml",),
+                        test_filter=result_filter.TestFilter(latest=True))
+    suite = load_result(str(tmp_path / "merged.xml")).suite
+    assert [test.name for test in suite.all_tests] == ["Login", "Logout"]
+    latest = load_result(str(tmp_path / "run2" / "suite" / "output.xml")).suite
+    assert [test.start_time for test in suite.all_tests] == [test.start_time for test in latest.all_tests]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".rrct_")]
+
+
+def test_filtered_merge_with_a_tag_expression(tagged_outputs, tmp_path):
+    merge_robot_results(str(tmp_path), "merged", in_process=True, outputs=("xml",),
+                        test_filter=result_filter.TestFilter("smoke AND NOT slow"))
+    assert _test_names(tmp_path / "merged.xml") == ["Logout", "Search"]
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from rrct.result_index import ResultIndex
+from rrct.stream_parser import iter_tests
+from rrct.tag_query import TagQuery
+from rrct.tag_totals import file_tag_statistics
+
+def test_index_tag_statistics_match_streamed_ones(tagged_outputs, tmp_path):
+    with ResultIndex(tmp_path / "index.sqlite") as index:
+        assert index.update(tagged_outputs) == {}
+        indexed = list(index.file_tag_statistics(tagged_outputs))
+    streamed = [file_tag_statistics(output) for output in tagged_outputs]
+    assert [(stats.tag_stats, stats.total, stats.error) for stats in indexed] == \
+           [(stats.tag_stats, stats.total, stats.error) for stats in streamed]
+
+
+@pytest.mark.parametrize("expression", ["smoke", "slow OR NOT smoke", "NOT slow", "smoke NOT slow AND Smoke",
+                                        "slow OR smoke_test NOT robot:flaky"])
+def test_find_tests_matches_unindexed_query(tagged_outputs, tmp_path, expression):
+    expected = [(os.path.abspath(output), test.name, test.tags)
+                for output in tagged_outputs for test in iter_tests(output)]
+    query = TagQuery(expression)
+    expected = [(path, name, query.matched_tags(tags)) for path, name, tags in expected
+                if query.matched_tags(tags) is not None]
+    with ResultIndex(tmp_path / "index.sqlite") as index:
+        index.update(tagged_outputs)
+        assert index.find_tests(expression) == expected
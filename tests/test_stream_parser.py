@@ -0,0 +1,53 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from rrct import stream_parser
+from rrct.stream_parser import StatusProbe, _probe_stream, _probe_tail, probe_status
+
+FIRST_PROBE = StatusProbe("FAIL", 1, 1, 0)
+
+
+def _with_errors(output, count):
+    """Rewrite the output with `count` execution errors after the statistics"""
+    with open(output, encoding="utf-8") as f:
+        content = f.read()
+    errors = "".join(f'<msg time="2025-01-01T00:00:00" level="WARN">warning {index}</msg>\n'
+                     for index in range(count))
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(content.replace("<errors>\n", f"<errors>\n{errors}"))
+    return output
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 300, 1 << 16])
+def test_tail_window_grows_until_status_and_statistics_are_found(tagged_outputs, monkeypatch, chunk_size):
+    output = _with_errors(tagged_outputs[0], 20)
+    monkeypatch.setattr(stream_parser, "TAIL_CHUNK_SIZE", chunk_size)
+    assert _probe_tail(output) == FIRST_PROBE
+    assert _probe_stream(output) == FIRST_PROBE
+
+
+def test_tail_window_is_bounded_then_the_file_is_streamed(tagged_outputs, monkeypatch):
+    output = _with_errors(tagged_outputs[0], 200)
+    monkeypatch.setattr(stream_parser, "TAIL_CHUNK_SIZE", 64)
+    monkeypatch.setattr(stream_parser, "MAX_TAIL_SIZE", 1024)
+    assert _probe_tail(output) is None
+    assert probe_status(output) == FIRST_PROBE
+
+
+def test_output_still_being_written(tagged_outputs):
+    output = tagged_outputs[0]
+    with open(output, "rb") as f:
+        content = f.read()
+    with open(output, "wb") as f:
+        f.write(content[:content.index(b"<statistics>")])
+    # The root suite is done but its statistics are not written yet.
+    assert _probe_tail(output) is None
+    with pytest.raises(ET.ParseError):
+        probe_status(output)
+
+
+def test_statuses_of_every_outcome(tagged_outputs):
+    assert [probe_status(output) for output in tagged_outputs] == [FIRST_PROBE, StatusProbe("PASS", 1, 0, 1)]
+    assert [probe_status(output, from_end=False) for output in tagged_outputs] == \
+           [FIRST_PROBE, StatusProbe("PASS", 1, 0, 1)]
@@ -0,0 +1,45 @@
+import os
+
+from rrct.summary_cache import SummaryCache
+
+
+def _cached_paths(cache, table):
+    return sorted(row[0] for row in cache.connection.execute(f"SELECT path FROM {table}"))
+
+
+def test_evicts_entries_of_removed_files(tagged_outputs, tmp_path):
+    first, second = tagged_outputs
+    with SummaryCache.for_folder(tmp_path) as cache:
+        assert [summary.status for summary in cache.summaries([first, second])] == ["FAIL", "PASS"]
+        assert cache.status(second) == "PASS"
+        os.remove(second)
+        cache.evict_missing()
+        assert _cached_paths(cache, "summaries") == [first]
+
+
+def test_summaries_evict_removed_files_not_asked_for(tagged_outputs, tmp_path):
+    first, second = tagged_outputs
+    with SummaryCache.for_folder(tmp_path) as cache:
+        list(cache.summaries([first, second]))
+        os.remove(first)
+        list(cache.summaries([second]))
+        assert _cached_paths(cache, "summaries") == [second]
+
+
+def test_status_caches_the_probe_only(tagged_outputs, tmp_path):
+    first, second = tagged_outputs
+    with SummaryCache.for_folder(tmp_path) as cache:
+        assert (cache.status(first), cache.status(second)) == ("FAIL", "PASS")
+        assert _cached_paths(cache, "summaries") == []
+        assert _cached_paths(cache, "statuses") == [first, second]
+
+        # A changed file is probed again.
+        with open(first, "rb") as f:
+            content = f.read().replace(b'status="FAIL"', b'status="PASS"')
+        with open(first, "wb") as f:
+            f.write(content)
+        assert cache.status(first) == "PASS"
+
+        os.remove(second)
+        cache.evict_missing()
+        assert _cached_paths(cache, "statuses") == [first]
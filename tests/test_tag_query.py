@@ -0,0 +1,80 @@
+import itertools
+import re
+
+import pytest
+from robot.model.tags import TagPatterns
+
+from rrct.tag_query import TagQuery
+
+TAGS = ["alpha", "beta", "gamma", "delta"]
+EXPRESSIONS = [
+    "alpha",
+    "alpha AND beta",
+    "alpha OR beta",
+    "alpha OR beta NOT gamma",
+    "alpha NOT beta AND gamma",
+    "alpha NOT beta NOT gamma",
+    "alpha AND beta OR gamma NOT delta",
+    "alpha OR beta AND gamma NOT delta OR beta AND delta",
+    "NOT alpha",
+    "NOT alpha OR beta",
+    "NOT alpha AND beta",
+]
+TAG_SETS = [list(tags) for size in range(len(TAGS) + 1) for tags in itertools.combinations(TAGS, size)]
+
+
+def _selects(query, tags):
+    return query.matched_tags(tags) is not None
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_precedence_matches_robot(expression):
+    query = TagQuery(expression)
+    patterns = TagPatterns([expression])
+    for tags in TAG_SETS:
+        assert _selects(query, tags) == patterns.match(tags), tags
+
+
+def test_not_binds_loosest():
+    assert not _selects(TagQuery("alpha OR beta NOT gamma"), ["alpha", "gamma"])
+    assert not _selects(TagQuery("alpha NOT beta AND gamma"), ["alpha", "beta", "gamma"])
+    assert _selects(TagQuery("alpha NOT beta AND gamma"), ["alpha", "beta"])
+
+
+def test_leading_not_selects_tests_without_matching_tag():
+    query = TagQuery("NOT alpha")
+    assert query.matched_tags([]) == []
+    assert query.matched_tags(["beta"]) == []
+    assert query.matched_tags(["alpha"]) is None
+    assert not query.needs_positive_tag
+
+
+def test_operator_before_not_is_ignored():
+    for tags in TAG_SETS:
+        assert _selects(TagQuery("alpha AND NOT beta"), tags) == _selects(TagQuery("alpha NOT beta"), tags)
+        assert _selects(TagQuery("alpha OR NOT beta"), tags) == _selects(TagQuery("alpha NOT beta"), tags)
+
+
+def test_list_of_patterns_is_ored():
+    query = TagQuery(["alpha AND beta", "gamma NOT delta"])
+    patterns = TagPatterns(["alpha AND beta", "gamma NOT delta"])
+    for tags in TAG_SETS:
+        assert _selects(query, tags) == patterns.match(tags), tags
+
+
+def test_operands_are_case_insensitive_regexes():
+    query = TagQuery(["sm.*", re.compile("^ui$")])
+    assert query.matched_tags(["Smoke", "api"]) == ["Smoke"]
+    assert query.matched_tags(["ui"]) == ["ui"]
+    assert query.matched_tags(["UI"]) is None
+
+
+def test_matched_tags_are_the_positive_ones():
+    assert TagQuery("alpha OR beta NOT gamma").matched_tags(["delta", "beta", "alpha"]) == ["beta", "alpha"]
+
+
+def test_tag_masks_are_computed_once_per_tag():
+    query = TagQuery("alpha OR beta")
+    query.matched_tags(["alpha", "delta"])
+    query.operands.clear()
+    assert query.matched_tags(["delta", "alpha"]) == ["alpha"]
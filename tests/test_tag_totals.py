@@ -0,0 +1,23 @@
+from rrct.archive import load_result
+from rrct.stream_parser import count_statuses, iter_tests
+from rrct.tag_totals import TagTotals, file_tag_statistics
+
+def _stats(tag_stats):
+    return [(stat.name, stat.passed, stat.failed, stat.skipped) for stat in tag_stats]
+
+
+def test_count_statuses_matches_robot(tagged_outputs):
+    for output in tagged_outputs:
+        statistics = load_result(output).statistics
+        tag_stats, total = count_statuses(iter_tests(output))
+        assert _stats(tag_stats) == _stats(statistics.tags)
+        assert total == (statistics.total.passed, statistics.total.failed, statistics.total.skipped)
+
+
+def test_tag_totals_group_tags_across_files(tagged_outputs):
+    totals = TagTotals()
+    for output in tagged_outputs:
+        totals.add(file_tag_statistics(output))
+    assert _stats(totals.tag_stats()) == [("slow", 1, 0, 1), ("Smoke", 2, 1, 0), ("smoke_test", 1, 0, 1)]
+    assert totals.files == 2
+    assert tuple(totals.total_stat())[1:] == (2, 1, 1)
@@ -0,0 +1,80 @@
+import errno
+import os
+
+import pytest
+
+from rrct.transfer import OUTPUT_PATTERNS, STRATEGIES, transfer_file, transfer_tree
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "output.xml"
+    path.write_bytes(b"<robot/>\n" * 1000)
+    os.utime(path, ns=(10**18, 10**18))
+    return path
+
+
+def _fail(*args):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+def _is_plain_copy(source, target):
+    return (not os.path.islink(target) and os.stat(target).st_ino != os.stat(source).st_ino
+            and target.read_bytes() == source.read_bytes()
+            and os.stat(target).st_mtime_ns == os.stat(source).st_mtime_ns)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_every_strategy_transfers_the_content(source, tmp_path, strategy):
+    target = tmp_path / "copy"
+    target.mkdir()
+    assert transfer_file(source, target, strategy) == str(target / "output.xml")
+    assert (target / "output.xml").read_bytes() == source.read_bytes()
+    if strategy == "hardlink":
+        assert os.stat(target / "output.xml").st_ino == os.stat(source).st_ino
+    if strategy == "symlink":
+        assert os.readlink(target / "output.xml") == str(source)
+
+
+@pytest.mark.parametrize("strategy, function", [("hardlink", "link"), ("symlink", "symlink")])
+def test_links_fall_back_to_a_copy(source, tmp_path, monkeypatch, strategy, function):
+    monkeypatch.setattr(os, function, _fail)
+    target = tmp_path / "target.xml"
+    transfer_file(source, target, strategy)
+    assert _is_plain_copy(source, target)
+
+
+needs_copy_file_range = pytest.mark.skipif(not hasattr(os, "copy_file_range"),
+                                           reason="reflink is only tried where os.copy_file_range exists")
+
+
+@needs_copy_file_range
+def test_reflink_falls_back_to_copy_file_range(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pytest.importorskip("fcntl"), "ioctl", _fail)
+    ranges = []
+    copy_file_range = os.copy_file_range
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: ranges.append(args) or copy_file_range(*args))
+    target = tmp_path / "target.xml"
+    transfer_file(source, target, "reflink")
+    assert ranges
+    assert _is_plain_copy(source, target)
+
+
+@needs_copy_file_range
+def test_reflink_falls_back_to_a_copy(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pytest.importorskip("fcntl"), "ioctl", _fail)
+    monkeypatch.setattr(os, "copy_file_range", _fail)
+    target = tmp_path / "target.xml"
+    transfer_file(source, target, "reflink")
+    assert _is_plain_copy(source, target)
+
+
+def test_only_outputs_are_transferred(tmp_path):
+    run = tmp_path / "run1"
+    (run / "screenshots").mkdir(parents=True)
+    for name in ("output.xml", "rerun_output.xml.gz", "log.html", "screenshots/page.png"):
+        (run / name).write_text(name)
+    transfer_tree(run, tmp_path / "merged", "hardlink", OUTPUT_PATTERNS)
+    copied = sorted(os.path.relpath(os.path.join(folder, name), tmp_path / "merged")
+                    for folder, _, names in os.walk(tmp_path / "merged") for name in names)
+    assert copied == ["output.xml", "rerun_output.xml.gz"]
@@ -0,0 +1,65 @@
+import json
+import xml.etree.ElementTree as ET
+
+from rrct.archive import load_result
+from rrct.merge_results import merge_in_process, merge_robot_results, merge_robot_results_to_new_folder
+from rrct.tree_merge import tree_merge
+
+
+def _written_statistics(path):
+    """The <statistics> of the file, robot computes them again when loading it"""
+    statistics = ET.parse(path).getroot().find("statistics")
+    return {section.tag: [(stat.text, dict(stat.attrib)) for stat in section] for section in statistics}
+
+
+def _summary(path):
+    result = load_result(path)
+    return {
+        "suite": result.suite.name,
+        "status": result.suite.status,
+        "tests": [(test.full_name, test.id, test.status, list(test.tags)) for test in result.suite.all_tests],
+        "errors": [message.message for message in result.errors],
+        "statistics": _written_statistics(path),
+    }
+
+
+def test_tree_merge_matches_flat_merge(tagged_outputs, tmp_path):
+    flat = tmp_path / "flat.xml"
+    tree = tmp_path / "tree.xml"
+    merge_in_process(tagged_outputs, str(flat))
+    # One file per group, so the groups are spliced together.
+    tree_merge(tagged_outputs, str(tree), fan_in=1)
+    assert _summary(str(tree)) == _summary(str(flat))
+
+
+def test_tree_merge_groups_tags_like_robot(tagged_outputs, tmp_path):
+    tree = tmp_path / "tree.xml"
+    tree_merge(tagged_outputs, str(tree), fan_in=1)
+    tags = {name: (stat["pass"], stat["fail"], stat["skip"])
+            for name, stat in _written_statistics(str(tree))["tag"]}
+    assert tags == {"Smoke": ("2", "1", "0"), "slow": ("1", "0", "1"), "smoke_test": ("1", "0", "1")}
+
+
+def test_hierarchical_merge_only_writes_xml_by_default(tagged_outputs, tmp_path):
+    merge_robot_results(str(tmp_path), "merged", fan_in=1)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["first", "merged.xml", "second"]
+    flat = tmp_path / "flat.xml"
+    merge_in_process(tagged_outputs, str(flat))
+    assert _summary(str(tmp_path / "merged.xml")) == _summary(str(flat))
+
+
+def test_hierarchical_merge_honors_outputs(tagged_outputs, tmp_path):
+    merge_robot_results(str(tmp_path), "merged", outputs=("report", "summary"), fan_in=1)
+    # No XML asked for, the one the other outputs are written from is gone.
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+           ["first", "merged_report.html", "merged_summary.json", "second"]
+    summary = json.loads((tmp_path / "merged_summary.json").read_text())
+    assert summary["total"] == {"passed": 2, "failed": 1, "skipped": 1}
+
+
+def test_hierarchical_merge_to_new_folder(tagged_outputs, tmp_path):
+    new_folder = tmp_path / "new"
+    merge_robot_results_to_new_folder(str(tmp_path), str(new_folder), "merged", fan_in=1)
+    assert "merged.xml" in {path.name for path in new_folder.iterdir()}
+    assert not {"merged_log.html", "merged_report.html"} & {path.name for path in new_folder.iterdir()}
+    assert len(list(load_result(str(new_folder / "merged.xml")).suite.all_tests)) == 4